@@ -0,0 +1,3 @@
+"""
+CodeViewX benchmarks (not part of the installed package)
+"""
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite over synthetic repositories
+
+Generates repositories of increasing size, then times the agent tools,
+the documentation server's file tree and Markdown rendering, and a
+replayed generation loop (see `codeviewx.benchmark`) against each of
+them. Results are written as JSON and can be compared with a stored
+baseline to catch regressions.
+
+Usage:
+    python -m benchmarks.suite                                  # 10, 1k, 10k and 100k files
+    python -m benchmarks.suite --sizes 10,1000 --repeat 3
+    python -m benchmarks.suite --output results.json            # store a baseline
+    python -m benchmarks.suite --baseline results.json          # exit 1 on regressions
+
+Generated repositories are kept in --workdir and reused by later runs.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+
+from codeviewx.__version__ import __version__
+from codeviewx.tools import (
+    FileIndex, list_real_directory, list_real_tree, read_real_file, read_real_files, ripgrep_search, execute_command
+)
+from codeviewx.server import generate_file_tree, render_markdown
+from codeviewx.replay import TranscriptRecorder
+from codeviewx.benchmark import run_benchmark
+
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [10, 1000, 10000, 100000]
+FILES_PER_DIRECTORY = 100
+# Marker found in every NEEDLE_INTERVAL-th source file
+NEEDLE = "CODEVIEWX_BENCHMARK_NEEDLE"
+NEEDLE_INTERVAL = 97
+REPOSITORY_MARKER = ".codeviewx-benchmark"
+LARGE_FILE_LINES = 5000
+
+SOURCE_TEMPLATE = '''"""
+Synthetic module {index}
+"""
+
+import os
+from typing import List
+
+
+class Handler{index}:
+    """Handles requests of kind {index}"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items: List[str] = []
+
+    def handle_{index}(self, value: int) -> int:
+        # TODO: replace the placeholder computation
+        total = 0
+        for step in range(value):
+            total += step * {index}
+        return total
+
+    def describe(self) -> str:
+        return os.path.join(self.name, "handler_{index}")
+'''
+
+
+def make_repository(root: str, file_count: int) -> str:
+    """
+    Create (or reuse) a synthetic Python repository with `file_count` source files
+
+    Sources are spread over `src/pkg_<n>/` directories of FILES_PER_DIRECTORY
+    files. The repository also gets a README, a pyproject.toml, one large
+    module and a `docs/` directory of Markdown pages.
+
+    Args:
+        root: Directory under which the repository is created
+        file_count: Number of generated source files
+
+    Returns:
+        Repository path
+    """
+    repository = os.path.join(root, f"repo-{file_count}")
+    marker = os.path.join(repository, REPOSITORY_MARKER)
+    if os.path.exists(marker):
+        return repository
+    shutil.rmtree(repository, ignore_errors=True)
+
+    for index in range(file_count):
+        directory = os.path.join(repository, "src", f"pkg_{index // FILES_PER_DIRECTORY}")
+        if index % FILES_PER_DIRECTORY == 0:
+            os.makedirs(directory, exist_ok=True)
+        content = SOURCE_TEMPLATE.format(index=index)
+        if index % NEEDLE_INTERVAL == 0:
+            content += f"\n{NEEDLE} = {index}\n"
+        with open(os.path.join(directory, f"module_{index}.py"), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    with open(os.path.join(repository, "README.md"), 'w', encoding='utf-8') as f:
+        f.write(f"# Synthetic repository\n\n{file_count} generated modules under `src/`.\n")
+    with open(os.path.join(repository, "pyproject.toml"), 'w', encoding='utf-8') as f:
+        f.write('[project]\nname = "synthetic"\nversion = "0.1.0"\n')
+    with open(os.path.join(repository, "large_module.py"), 'w', encoding='utf-8') as f:
+        f.write("".join(f"value_{line} = {line}  # line {line}\n" for line in range(LARGE_FILE_LINES)))
+
+    docs = os.path.join(repository, "docs")
+    os.makedirs(docs, exist_ok=True)
+    for index in range(max(1, min(file_count // 100, 200))):
+        with open(os.path.join(docs, f"{index:03d}-chapter.md"), 'w', encoding='utf-8') as f:
+            f.write(_markdown_page(index, sections=5))
+
+    with open(marker, 'w', encoding='utf-8') as f:
+        f.write(str(file_count))
+    return repository
+
+
+def _markdown_page(index: int, sections: int) -> str:
+    """
+    Markdown page with headings, a table and code blocks
+    """
+    parts = [f"# Chapter {index}\n"]
+    for section in range(sections):
+        parts.append(f"## Section {index}.{section}\n\nSome text about `handle_{section}` and **its** behaviour.\n")
+        parts.append("| Name | Value |\n|------|-------|\n" + "".join(f"| item {row} | {row} |\n" for row in range(10)))
+        parts.append(f"```python\ndef handle_{section}(value):\n    return value * {section}\n```\n")
+    return "\n".join(parts)
+
+
+def _write_transcript(repository: str, path: str) -> None:
+    """
+    Write a transcript of a short exploration and writing session over a repository
+    """
+    output = os.path.join(repository, "generated-docs")
+    recorder = TranscriptRecorder(repository, output, doc_language="English", parallel=1)
+    responses = [
+        [("list_real_directory", {"directory": repository})],
+        [("read_real_file", {"file_path": os.path.join(repository, "README.md")}),
+         ("read_real_file", {"file_path": os.path.join(repository, "pyproject.toml")})],
+        [("ripgrep_search", {"pattern": "class Handler", "path": repository, "max_count": 20})],
+        [("list_real_directory", {"directory": os.path.join(repository, "src", "pkg_0")})],
+        [("read_real_file", {"file_path": os.path.join(repository, "src", "pkg_0", f"module_{index}.py")})
+         for index in range(min(3, FILES_PER_DIRECTORY))],
+        [("write_real_file", {"file_path": os.path.join(output, "README.md"), "content": _markdown_page(0, 3)})],
+    ]
+    for turn, calls in enumerate(responses):
+        recorder.responses.append(("main", AIMessage(content="", tool_calls=[
+            {"name": name, "args": args, "id": f"call_{turn}_{index}"} for index, (name, args) in enumerate(calls)
+        ])))
+    recorder.responses.append(("main", AIMessage(content="Documentation complete.")))
+    recorder.save(path)
+
+
+def _time(function: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Median, minimum and maximum wall-clock time of `function` in milliseconds, after one warm-up call
+    """
+    function()
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(durations), 3),
+        "min_ms": round(min(durations), 3),
+        "max_ms": round(max(durations), 3),
+        "runs": repeat,
+    }
+
+
+def benchmark_repository(repository: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Time every benchmark case against one repository
+
+    Args:
+        repository: Repository created by `make_repository`
+        repeat: Timed runs per case
+
+    Returns:
+        Timings by case name; cases that cannot run here have a "skipped" reason instead
+    """
+    source_directory = os.path.join(repository, "src", "pkg_0")
+    docs = os.path.join(repository, "docs")
+    with open(os.path.join(docs, sorted(os.listdir(docs))[0]), 'r', encoding='utf-8') as f:
+        page = f.read()
+
+    cases: Dict[str, Optional[Callable[[], Any]]] = {
+        "list_real_directory[root]": lambda: list_real_directory.invoke({"directory": repository}),
+        "list_real_directory[package]": lambda: list_real_directory.invoke({"directory": source_directory}),
+        "file_index.build": lambda: FileIndex.build(repository),
+        "list_real_tree[root]": lambda: list_real_tree.invoke({"directory": repository}),
+        "read_real_file[readme]": lambda: read_real_file.invoke({"file_path": os.path.join(repository, "README.md")}),
+        "read_real_file[large]": lambda: read_real_file.invoke({"file_path": os.path.join(repository, "large_module.py")}),
+        "read_real_files[package]": lambda: read_real_files.invoke({"paths": [os.path.join(source_directory, "*.py")]}),
+        "ripgrep_search[literal]": lambda: ripgrep_search.invoke({"pattern": NEEDLE, "path": repository}),
+        "ripgrep_search[regex]": lambda: ripgrep_search.invoke({"pattern": r"def handle_\d+", "path": repository}),
+        "execute_command[find]": lambda: execute_command.invoke({
+            "command": "find . -name '*.py' | wc -l", "working_dir": repository
+        }),
+        "server.generate_file_tree": lambda: generate_file_tree(docs),
+        "server.render_markdown": lambda: render_markdown(page),
+    }
+    skipped = {}
+    if shutil.which("rg") is None:
+        skipped.update({name: "ripgrep (rg) is not installed" for name in cases if name.startswith("ripgrep_search")})
+    if os.name == 'nt':
+        skipped["execute_command[find]"] = "needs a POSIX shell"
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, function in cases.items():
+        results[name] = {"skipped": skipped[name]} if name in skipped else _time(function, repeat)
+
+    with tempfile.TemporaryDirectory(prefix="codeviewx-transcript-") as scratch:
+        transcript = os.path.join(scratch, "session.transcript.jsonl")
+        _write_transcript(repository, transcript)
+        with contextlib.redirect_stderr(io.StringIO()):
+            report = run_benchmark(transcript, repository, runs=repeat + 1)
+    # The first run is the warm-up
+    runs = report.runs[1:]
+    elapsed = [run["elapsed"] * 1000 for run in runs]
+    results["generation_loop[replay]"] = {
+        "median_ms": round(statistics.median(elapsed), 3),
+        "min_ms": round(min(elapsed), 3),
+        "max_ms": round(max(elapsed), 3),
+        "runs": repeat,
+        "steps_per_second": round(statistics.median(run["steps_per_second"] for run in runs), 2),
+    }
+    return results
+
+
+def run_suite(sizes: List[int], repeat: int, workdir: str, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Run every benchmark case against a repository of each size
+
+    Args:
+        sizes: Source file counts of the synthetic repositories
+        repeat: Timed runs per case
+        workdir: Directory holding (and caching) the synthetic repositories
+        log: Callable receiving progress lines
+
+    Returns:
+        JSON-serializable results, see `compare_results`
+    """
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "environment": {
+            "codeviewx": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "sizes": {},
+    }
+    for size in sizes:
+        started = time.perf_counter()
+        repository = make_repository(workdir, size)
+        log(f"[{size} files] repository ready in {time.perf_counter() - started:.1f}s: {repository}")
+        cases = benchmark_repository(repository, repeat)
+        results["sizes"][str(size)] = cases
+        for name, timing in cases.items():
+            figure = timing.get("skipped") or f"{timing['median_ms']:.2f} ms"
+            log(f"[{size} files] {name}: {figure}")
+    return results
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.25,
+    min_delta_ms: float = 1.0
+) -> List[Dict[str, Any]]:
+    """
+    Compare the median timings of two result files
+
+    A case regresses when its median grew by more than `tolerance` (a
+    fraction of the baseline) and by more than `min_delta_ms`, which keeps
+    sub-millisecond noise from failing a comparison. Cases missing or
+    skipped on either side are ignored.
+
+    Args:
+        current: Results of `run_suite`
+        baseline: Stored results to compare against
+        tolerance: Allowed relative slowdown
+        min_delta_ms: Allowed absolute slowdown in milliseconds
+
+    Returns:
+        One entry per compared case with size, case, baseline_ms, current_ms,
+        ratio and regressed
+    """
+    comparison = []
+    for size, cases in current.get("sizes", {}).items():
+        baseline_cases = baseline.get("sizes", {}).get(size, {})
+        for name, timing in cases.items():
+            previous = baseline_cases.get(name, {})
+            if "median_ms" not in timing or "median_ms" not in previous:
+                continue
+            before, after = previous["median_ms"], timing["median_ms"]
+            comparison.append({
+                "size": int(size),
+                "case": name,
+                "baseline_ms": before,
+                "current_ms": after,
+                "ratio": round(after / before, 3) if before else None,
+                "regressed": after > before * (1 + tolerance) and after - before > min_delta_ms,
+            })
+    return comparison
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated source file counts of the synthetic repositories (default: 10,1000,10000,100000)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, metavar="N", help="Timed runs per case (default: 5)")
+    parser.add_argument(
+        "--workdir",
+        default=os.path.join(tempfile.gettempdir(), "codeviewx-benchmark-repos"),
+        help="Directory keeping the generated repositories between runs"
+    )
+    parser.add_argument("--output", default="benchmark-results.json", metavar="FILE", help="Results file (default: benchmark-results.json)")
+    parser.add_argument("--baseline", default=None, metavar="FILE", help="Compare against a stored results file; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline as a fraction (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    os.makedirs(args.workdir, exist_ok=True)
+    results = run_suite(sizes, args.repeat, args.workdir)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    comparison = compare_results(results, baseline, args.tolerance)
+    for entry in comparison:
+        flag = "REGRESSION" if entry["regressed"] else "ok"
+        print(
+            f"{flag:>10}  {entry['size']:>6} files  {entry['case']:<32} "
+            f"{entry['baseline_ms']:>10.2f} -> {entry['current_ms']:>10.2f} ms"
+        )
+    regressions = sum(1 for entry in comparison if entry["regressed"])
+    print(f"{regressions} regressions in {len(comparison)} compared cases")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,47 @@ CodeViewX - AI-Driven Code Documentation Generator
 Intelligent documentation generation tool based on DeepAgents and LangChain.
 """
 
+import importlib
+
 from .__version__ import __version__, __author__, __description__
-from .core import load_prompt, generate_docs, detect_system_language
-from .i18n import get_i18n, t, set_locale, detect_ui_language
+
+# Public names and the module defining them. They are imported on first
+# access, so importing a submodule (e.g. in a search worker process) does
+# not load the agent stack.
+_EXPORTS = {
+    "load_prompt": ".core",
+    "generate_docs": ".core",
+    "agenerate_docs": ".core",
+    "GenerationResult": ".core",
+    "run_batch": ".core",
+    "arun_batch": ".core",
+    "detect_system_language": ".core",
+    "ProgressEvent": ".events",
+    "ToolStarted": ".events",
+    "ToolFinished": ".events",
+    "DocWritten": ".events",
+    "TodosUpdated": ".events",
+    "ModelTokens": ".events",
+    "AgentMessage": ".events",
+    "JsonLinesWriter": ".events",
+    "get_i18n": ".i18n",
+    "t": ".i18n",
+    "set_locale": ".i18n",
+    "detect_ui_language": ".i18n",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
 
 __all__ = [
     "__version__",
@@ -14,7 +52,19 @@ __all__ = [
     "__description__",
     "load_prompt",
     "generate_docs",
+    "agenerate_docs",
+    "GenerationResult",
+    "run_batch",
+    "arun_batch",
     "detect_system_language",
+    "ProgressEvent",
+    "ToolStarted",
+    "ToolFinished",
+    "DocWritten",
+    "TodosUpdated",
+    "ModelTokens",
+    "AgentMessage",
+    "JsonLinesWriter",
     "get_i18n",
     "t",
     "set_locale",
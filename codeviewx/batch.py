@@ -0,0 +1,267 @@
+"""
+Batch generation module
+
+Documents many repositories from one process: runs are scheduled on a
+single event loop with a bounded number in flight, so they share the
+process-wide HTTP connection pool of the Anthropic client and the loaded
+prompt template.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import contextvars
+from typing import List, Optional, TextIO
+
+from .generator import GenerationResult, agenerate_docs, validate_api_key
+from .manifest import get_state_directory
+from .i18n import t
+
+
+BATCH_LOG_FILENAME = "generate.log"
+
+# Stream that the console output of the current batch task is written to
+_task_output: contextvars.ContextVar = contextvars.ContextVar("codeviewx_batch_output", default=None)
+
+
+class _TaskStdout:
+    """
+    Stand-in for sys.stdout that writes to the current task's log, if any
+
+    Context variables follow tasks and LangChain's executor calls, so each
+    concurrent run's progress ends up in its own log file.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        return (_task_output.get() or self.stream).write(text)
+
+    def flush(self) -> None:
+        (_task_output.get() or self.stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class BatchEntry:
+    """
+    One repository of a batch and the outcome of its run
+
+    Attributes:
+        repository: Repository path as listed
+        output_directory: Documentation output directory of the repository
+        log_path: File receiving the run's console output
+        result: GenerationResult, None if the run failed
+        error: Error message if the run failed
+        elapsed: Wall-clock duration in seconds
+    """
+
+    def __init__(self, repository: str, output_directory: str):
+        self.repository = repository
+        self.output_directory = output_directory
+        self.log_path = os.path.join(get_state_directory(output_directory), BATCH_LOG_FILENAME)
+        self.result: Optional[GenerationResult] = None
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+
+    @property
+    def status(self) -> str:
+        if self.error is not None:
+            return t('batch_status_failed')
+        if self.result is not None and self.result.run_id is None:
+            return t('batch_status_up_to_date')
+        return t('batch_status_generated')
+
+
+def read_repository_list(path: str) -> List[str]:
+    """
+    Read a batch file listing one repository path per line
+
+    Blank lines and lines starting with `#` are skipped; relative paths are
+    resolved against the directory of the batch file.
+
+    Args:
+        path: Batch file path
+
+    Returns:
+        Absolute repository paths, in file order
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    repositories = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            repositories.append(os.path.normpath(os.path.join(base, os.path.expanduser(line))))
+    return repositories
+
+
+def _output_directories(repositories: List[str], output_directory: str, output_root: Optional[str]) -> List[str]:
+    if not output_root:
+        return [os.path.join(repository, output_directory) for repository in repositories]
+
+    directories = []
+    used = set()
+    for repository in repositories:
+        name = os.path.basename(repository.rstrip(os.sep)) or "repository"
+        candidate, suffix = name, 2
+        while candidate in used:
+            candidate, suffix = f"{name}-{suffix}", suffix + 1
+        used.add(candidate)
+        directories.append(os.path.join(output_root, candidate))
+    return directories
+
+
+async def arun_batch(
+    repositories: List[str],
+    workers: int = 4,
+    output_directory: str = "docs",
+    output_root: Optional[str] = None,
+    **options
+) -> List[BatchEntry]:
+    """
+    Generate documentation for several repositories concurrently
+
+    At most `workers` runs are in flight. A failing repository is recorded
+    and does not stop the others. Each run's console output goes to
+    `<output>/.codeviewx/generate.log`; only one line per started and
+    finished repository is printed.
+
+    Args:
+        repositories: Repository paths
+        workers: Maximum number of concurrent runs
+        output_directory: Output directory inside each repository
+        output_root: If given, write each repository's docs to `<output_root>/<name>` instead
+        **options: Further `agenerate_docs` arguments (doc_language, parallel, use_cache, ...)
+
+    Returns:
+        One BatchEntry per repository, in input order
+
+    Examples:
+        entries = asyncio.run(arun_batch(["/repos/a", "/repos/b"], workers=2))
+        print(format_batch_summary(entries))
+    """
+    validate_api_key()
+
+    entries = [
+        BatchEntry(repository, directory)
+        for repository, directory in zip(
+            repositories, _output_directories(repositories, output_directory, output_root)
+        )
+    ]
+    semaphore = asyncio.Semaphore(max(1, workers))
+    console = sys.stdout
+    count = len(entries)
+
+    async def run_entry(index: int, entry: BatchEntry) -> None:
+        if not os.path.isdir(entry.repository):
+            entry.error = t('error_directory_not_exist', path=entry.repository)
+            console.write(t('batch_failed', index=index, count=count, repository=entry.repository, error=entry.error) + "\n")
+            return
+        async with semaphore:
+            os.makedirs(os.path.dirname(entry.log_path), exist_ok=True)
+            console.write(t('batch_started', index=index, count=count, repository=entry.repository, log=entry.log_path) + "\n")
+            started = time.perf_counter()
+            with open(entry.log_path, 'w', encoding='utf-8') as log:
+                token = _task_output.set(log)
+                try:
+                    entry.result = await agenerate_docs(
+                        working_directory=entry.repository,
+                        output_directory=entry.output_directory,
+                        **options
+                    )
+                except Exception as e:
+                    entry.error = str(e) or e.__class__.__name__
+                finally:
+                    _task_output.reset(token)
+            entry.elapsed = time.perf_counter() - started
+
+            if entry.error is None:
+                console.write(t(
+                    'batch_finished', index=index, count=count, repository=entry.repository,
+                    status=entry.status, seconds=f"{entry.elapsed:.1f}"
+                ) + "\n")
+            else:
+                console.write(t('batch_failed', index=index, count=count, repository=entry.repository, error=entry.error) + "\n")
+
+    sys.stdout = _TaskStdout(console)
+    try:
+        await asyncio.gather(*(run_entry(index, entry) for index, entry in enumerate(entries, 1)))
+    finally:
+        sys.stdout = console
+    return entries
+
+
+def run_batch(repositories: List[str], workers: int = 4, **options) -> List[BatchEntry]:
+    """
+    Synchronous wrapper around `arun_batch`
+
+    Examples:
+        entries = run_batch(read_repository_list("repos.txt"), workers=8, doc_language="English")
+    """
+    return asyncio.run(arun_batch(repositories, workers, **options))
+
+
+def format_batch_summary(entries: List[BatchEntry]) -> str:
+    """
+    Render the outcome of a batch as a plain-text table
+
+    Args:
+        entries: Output of `run_batch`
+
+    Returns:
+        Table with one row per repository and a totals row, followed by
+        the error message of each failed repository
+    """
+    headers = [
+        t('batch_column_repository'),
+        t('batch_column_status'),
+        t('batch_column_docs'),
+        t('batch_column_steps'),
+        t('batch_column_input_tokens'),
+        t('batch_column_output_tokens'),
+        t('batch_column_time'),
+    ]
+    rows = []
+    for entry in entries:
+        result = entry.result or GenerationResult(entry.repository, entry.output_directory)
+        rows.append([
+            entry.repository,
+            entry.status,
+            str(result.docs_generated),
+            str(result.steps),
+            str(result.input_tokens),
+            str(result.output_tokens),
+            f"{entry.elapsed:.1f}",
+        ])
+    results = [entry.result for entry in entries if entry.result]
+    rows.append([
+        "",
+        f"{len(results)}/{len(entries)}",
+        str(sum(result.docs_generated for result in results)),
+        str(sum(result.steps for result in results)),
+        str(sum(result.input_tokens for result in results)),
+        str(sum(result.output_tokens for result in results)),
+        f"{sum(entry.elapsed for entry in entries):.1f}",
+    ])
+
+    widths = [max(len(row[column]) for row in [headers] + rows) for column in range(len(headers))]
+
+    def format_row(row):
+        # Left-align the text columns, right-align the numbers
+        return "  ".join(
+            cell.ljust(width) if column < 2 else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip()
+
+    lines = [format_row(headers), "  ".join("-" * width for width in widths)]
+    lines += [format_row(row) for row in rows[:-1]]
+    lines += ["  ".join("-" * width for width in widths), format_row(rows[-1])]
+    for entry in entries:
+        if entry.error is not None:
+            lines.append(f"❌ {entry.repository}: {entry.error}")
+    return "\n".join(lines)
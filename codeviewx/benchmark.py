@@ -0,0 +1,235 @@
+"""
+Orchestration benchmark module
+
+Replays a recorded transcript (see `codeviewx.replay`) several times and
+measures what the generator itself costs: agent steps per second, tool
+call latency and memory. Model latency is taken out of the picture, so
+changes to tools, checkpointing or the agent loop show up undiluted and
+without API costs.
+"""
+
+import io
+import os
+import math
+import sys
+import json
+import shutil
+import tempfile
+import contextlib
+from typing import Any, Dict, List, Optional
+
+from .generator import generate_docs
+from .replay import load_transcript
+from .i18n import t
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of values (0.0 for an empty list)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_memory_mb() -> float:
+    """
+    Peak resident set size of the process so far, in MiB (0.0 where unavailable)
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class BenchmarkReport:
+    """
+    Measurements of the replayed runs of a transcript
+
+    Attributes:
+        transcript: Transcript file
+        working_directory: Project the transcript was replayed against
+        runs: One dict per run with steps, docs_generated, elapsed and steps_per_second
+        tool_latency: Durations in milliseconds of every tool call of every run, by tool name
+        peak_memory_mb: Peak resident set size of the process after the last run
+
+    Examples:
+        report = run_benchmark("run.transcript.jsonl", runs=5)
+        print(format_benchmark_report(report))
+        json.dumps(report.to_dict())
+    """
+
+    def __init__(self, transcript: str, working_directory: str):
+        self.transcript = transcript
+        self.working_directory = working_directory
+        self.runs: List[Dict[str, Any]] = []
+        self.tool_latency: Dict[str, List[float]] = {}
+        self.peak_memory_mb = 0.0
+
+    @property
+    def steps_per_second(self) -> float:
+        """
+        Median steps per second over the runs
+        """
+        return _percentile([run["steps_per_second"] for run in self.runs], 0.5)
+
+    def tool_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Call count and mean, p50, p95 and max latency (ms) of each tool
+        """
+        stats = {}
+        for tool, durations in sorted(self.tool_latency.items()):
+            stats[tool] = {
+                "calls": len(durations),
+                "mean_ms": round(sum(durations) / len(durations), 3),
+                "p50_ms": round(_percentile(durations, 0.5), 3),
+                "p95_ms": round(_percentile(durations, 0.95), 3),
+                "max_ms": round(max(durations), 3),
+            }
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the report as a JSON-serializable dict
+        """
+        return {
+            "transcript": self.transcript,
+            "working_directory": self.working_directory,
+            "runs": self.runs,
+            "steps_per_second": round(self.steps_per_second, 2),
+            "tools": self.tool_stats(),
+            "peak_memory_mb": round(self.peak_memory_mb, 1),
+        }
+
+
+def _tool_durations(trace_path: str) -> Dict[str, List[float]]:
+    """
+    Tool call durations in milliseconds, by tool name, from a saved trace
+    """
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        events = json.load(f)["traceEvents"]
+    durations: Dict[str, List[float]] = {}
+    for event in events:
+        if event.get("cat") == "tool":
+            durations.setdefault(event["name"], []).append(event["dur"] / 1000)
+    return durations
+
+
+def run_benchmark(
+    transcript_path: str,
+    working_directory: Optional[str] = None,
+    runs: int = 3
+) -> BenchmarkReport:
+    """
+    Replay a transcript several times and measure the generator's overhead
+
+    Every run writes into a fresh scratch output directory with the
+    incremental manifest and response cache disabled, so all runs do the
+    same work. Relative paths in recorded tool calls resolve against the
+    working directory, as they did when the CLI was run from the project.
+
+    Args:
+        transcript_path: Transcript saved with `generate_docs(record_path=...)`
+        working_directory: Project to replay against (default: the recorded one)
+        runs: Number of replayed runs
+
+    Returns:
+        BenchmarkReport of the runs
+
+    Raises:
+        ValueError: If the file is not a transcript or the project does not exist
+
+    Examples:
+        report = run_benchmark("run.transcript.jsonl")
+        print(report.steps_per_second)
+    """
+    header, _ = load_transcript(transcript_path)
+    transcript_path = os.path.abspath(transcript_path)
+    working_directory = os.path.abspath(working_directory or header["working_directory"])
+    if not os.path.isdir(working_directory):
+        raise ValueError(t('error_directory_not_exist', path=working_directory))
+
+    report = BenchmarkReport(transcript_path, working_directory)
+    previous_directory = os.getcwd()
+    for _ in range(runs):
+        scratch = tempfile.mkdtemp(prefix="codeviewx-benchmark-")
+        trace_path = os.path.join(scratch, "trace.json")
+        try:
+            os.chdir(working_directory)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = generate_docs(
+                    working_directory=working_directory,
+                    output_directory=os.path.join(scratch, "docs"),
+                    doc_language=header.get("doc_language"),
+                    parallel=header.get("parallel") or 1,
+                    incremental=False,
+                    use_cache=False,
+                    trace_path=trace_path,
+                    replay_path=transcript_path
+                )
+            for tool, durations in _tool_durations(trace_path).items():
+                report.tool_latency.setdefault(tool, []).extend(durations)
+        finally:
+            os.chdir(previous_directory)
+            shutil.rmtree(scratch, ignore_errors=True)
+        report.runs.append({
+            "steps": result.steps,
+            "docs_generated": result.docs_generated,
+            "elapsed": round(result.elapsed, 3),
+            "steps_per_second": round(result.steps / result.elapsed, 2) if result.elapsed else 0.0,
+        })
+    report.peak_memory_mb = peak_memory_mb()
+    return report
+
+
+def format_benchmark_report(report: BenchmarkReport) -> str:
+    """
+    Render a benchmark report as plain text
+
+    Args:
+        report: Output of `run_benchmark`
+
+    Returns:
+        Per-run figures followed by a table of tool latencies
+    """
+    lines = [t('benchmark_transcript', path=report.transcript, runs=len(report.runs))]
+    for index, run in enumerate(report.runs, 1):
+        lines.append(t(
+            'benchmark_run',
+            index=index,
+            steps=run["steps"],
+            docs=run["docs_generated"],
+            seconds=f"{run['elapsed']:.2f}",
+            rate=f"{run['steps_per_second']:.1f}"
+        ))
+    lines.append(t('benchmark_steps_per_second', rate=f"{report.steps_per_second:.1f}"))
+    lines.append(t('benchmark_peak_memory', mb=f"{report.peak_memory_mb:.1f}"))
+
+    stats = report.tool_stats()
+    if stats:
+        headers = [
+            t('benchmark_column_tool'), t('benchmark_column_calls'),
+            "mean (ms)", "p50 (ms)", "p95 (ms)", "max (ms)",
+        ]
+        rows = [
+            [tool, str(values["calls"])] + [
+                f"{values[key]:.2f}" for key in ("mean_ms", "p50_ms", "p95_ms", "max_ms")
+            ]
+            for tool, values in stats.items()
+        ]
+        widths = [max(len(row[column]) for row in [headers] + rows) for column in range(len(headers))]
+        lines.append("")
+        for row in [headers] + rows:
+            lines.append("  ".join(
+                cell.ljust(width) if column == 0 else cell.rjust(width)
+                for column, (cell, width) in enumerate(zip(row, widths))
+            ).rstrip())
+    return "\n".join(lines)
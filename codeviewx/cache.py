@@ -0,0 +1,158 @@
+"""
+Model response cache module
+
+Persistent, content-addressed cache of chat model responses, so replayed
+runs (CI retries, prompt tweaks, crashed runs) are served locally.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import warnings
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def get_default_cache_directory() -> str:
+    """
+    Get the default response cache directory
+
+    Returns:
+        `$XDG_CACHE_HOME/codeviewx`, falling back to `~/.cache/codeviewx`
+    """
+    cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'codeviewx')
+
+
+class ResponseCache(BaseCache):
+    """
+    SQLite-backed LLM response cache with size-bounded LRU eviction
+
+    LangChain calls `lookup`/`update` with the serialized message history
+    (system prompt included) as `prompt` and the model parameters plus bound
+    tool schemas as `llm_string`; both are hashed into the entry key.
+
+    Examples:
+        cache = ResponseCache("~/.cache/codeviewx")
+        model = ChatAnthropic(model_name="...", cache=cache)
+        print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, cache_directory: Optional[str] = None, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initialize the cache, creating the database if needed
+
+        Args:
+            cache_directory: Directory holding `responses.sqlite3` (default: user cache dir)
+            max_bytes: Total payload size above which least recently used entries are evicted
+        """
+        self.cache_directory = os.path.expanduser(cache_directory or get_default_cache_directory())
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(self.cache_directory, 'responses.sqlite3'),
+            check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _normalize_prompt(prompt: str) -> str:
+        # Message ids are random and usage/response metadata differ between a live
+        # and a cached response; drop them so identical conversations match
+        try:
+            messages = json.loads(prompt)
+        except ValueError:
+            return prompt
+        if not isinstance(messages, list):
+            return prompt
+        for message in messages:
+            if isinstance(message, dict) and isinstance(message.get('kwargs'), dict):
+                for field in ('id', 'usage_metadata', 'response_metadata'):
+                    message['kwargs'].pop(field, None)
+        return json.dumps(messages, sort_keys=True)
+
+    @classmethod
+    def _key(cls, prompt: str, llm_string: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(cls._normalize_prompt(prompt).encode('utf-8'))
+        return digest.hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        value = dumps(list(return_val))
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC")
+        stale_keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,168 @@
+"""
+Run checkpoint module
+
+Persists agent progress in SQLite so interrupted generation runs can be
+resumed from the last completed step.
+"""
+
+import os
+import re
+import shutil
+import sqlite3
+import uuid
+from datetime import datetime
+
+import aiosqlite
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from .manifest import get_state_directory
+
+
+CHECKPOINT_FILENAME = "checkpoints.sqlite3"
+RUNS_DIRNAME = "runs"
+RUN_ID_PATTERN = re.compile(r"\d{8}-\d{6}-[0-9a-f]{6}")
+
+
+def new_run_id() -> str:
+    """
+    Generate a unique, sortable run identifier
+
+    Returns:
+        Run id such as `20250101-120000-1a2b3c`
+    """
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def is_run_id(value: str) -> bool:
+    """
+    Check whether a string has the format of `new_run_id` (e.g. a `--resume` argument)
+    """
+    return RUN_ID_PATTERN.fullmatch(value) is not None
+
+
+def get_run_directory(output_directory: str, run_id: str) -> str:
+    """
+    Get the directory holding per-run bookkeeping (e.g. manifest recorder state)
+
+    Args:
+        output_directory: Documentation output directory
+        run_id: Run identifier
+
+    Returns:
+        Absolute path of the run directory
+    """
+    return os.path.join(get_state_directory(output_directory), RUNS_DIRNAME, run_id)
+
+
+def open_checkpointer(output_directory: str) -> SqliteSaver:
+    """
+    Open the SQLite checkpointer stored in the output state directory
+
+    The connection is shared between threads, which SqliteSaver serializes
+    with its own lock, so parallel chapter writers can use one saver.
+
+    Args:
+        output_directory: Documentation output directory
+
+    Returns:
+        Ready-to-use SqliteSaver
+    """
+    state_directory = get_state_directory(output_directory)
+    os.makedirs(state_directory, exist_ok=True)
+    conn = sqlite3.connect(
+        os.path.join(state_directory, CHECKPOINT_FILENAME),
+        check_same_thread=False
+    )
+    saver = SqliteSaver(conn)
+    saver.setup()
+    return saver
+
+
+async def aopen_checkpointer(output_directory: str) -> AsyncSqliteSaver:
+    """
+    Async counterpart of `open_checkpointer`, for runs driven by `agent.astream`
+
+    The caller owns the connection and must `await saver.conn.close()` when done.
+
+    Args:
+        output_directory: Documentation output directory
+
+    Returns:
+        Ready-to-use AsyncSqliteSaver on the same database file
+    """
+    state_directory = get_state_directory(output_directory)
+    os.makedirs(state_directory, exist_ok=True)
+    conn = await aiosqlite.connect(os.path.join(state_directory, CHECKPOINT_FILENAME))
+    saver = AsyncSqliteSaver(conn)
+    try:
+        await saver.setup()
+    except BaseException:
+        await conn.close()
+        raise
+    return saver
+
+
+# Threads named `run_id` or `run_id:<part>`, compared as text (no LIKE wildcards)
+RUN_THREADS_QUERY = "SELECT DISTINCT thread_id FROM checkpoints WHERE thread_id = ? OR substr(thread_id, 1, ?) = ?"
+
+
+def _run_threads_parameters(run_id: str) -> tuple:
+    return (run_id, len(run_id) + 1, f"{run_id}:")
+
+
+def _run_thread_ids(checkpointer: SqliteSaver, run_id: str) -> list:
+    with checkpointer.cursor(transaction=False) as cur:
+        cur.execute(RUN_THREADS_QUERY, _run_threads_parameters(run_id))
+        return [row[0] for row in cur.fetchall()]
+
+
+async def _arun_thread_ids(checkpointer: AsyncSqliteSaver, run_id: str) -> list:
+    async with checkpointer.lock, checkpointer.conn.execute(RUN_THREADS_QUERY, _run_threads_parameters(run_id)) as cur:
+        return [row[0] for row in await cur.fetchall()]
+
+
+def has_run(checkpointer: SqliteSaver, run_id: str) -> bool:
+    """
+    Check whether any checkpoint was recorded for a run
+
+    Args:
+        checkpointer: Checkpointer to look in
+        run_id: Run identifier
+
+    Returns:
+        True if the run can be resumed
+    """
+    return bool(_run_thread_ids(checkpointer, run_id))
+
+
+async def ahas_run(checkpointer: AsyncSqliteSaver, run_id: str) -> bool:
+    """
+    Async counterpart of `has_run`
+    """
+    return bool(await _arun_thread_ids(checkpointer, run_id))
+
+
+def discard_run(checkpointer: SqliteSaver, output_directory: str, run_id: str) -> None:
+    """
+    Delete the checkpoints and bookkeeping of a finished run
+
+    Args:
+        checkpointer: Checkpointer the run was recorded with
+        output_directory: Documentation output directory
+        run_id: Run identifier; every thread named `run_id` or `run_id:<part>` is removed
+    """
+    for thread_id in _run_thread_ids(checkpointer, run_id):
+        checkpointer.delete_thread(thread_id)
+
+    shutil.rmtree(get_run_directory(output_directory, run_id), ignore_errors=True)
+
+
+async def adiscard_run(checkpointer: AsyncSqliteSaver, output_directory: str, run_id: str) -> None:
+    """
+    Async counterpart of `discard_run`
+    """
+    for thread_id in await _arun_thread_ids(checkpointer, run_id):
+        await checkpointer.adelete_thread(thread_id)
+
+    shutil.rmtree(get_run_directory(output_directory, run_id), ignore_errors=True)
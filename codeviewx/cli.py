@@ -4,13 +4,376 @@ CodeViewX Command Line Interface
 """
 
 import argparse
+import json
 import os
 import sys
+import time
 from pathlib import Path
 
 from .core import generate_docs, start_document_web_server
+from .batch import read_repository_list, run_batch, format_batch_summary
+from .benchmark import run_benchmark, format_benchmark_report
+from .events import JsonLinesWriter
 from .__version__ import __version__
 from .i18n import get_i18n, t, detect_ui_language
+from .compaction import DEFAULT_COMPACTION_THRESHOLD
+from .ratelimit import DEFAULT_MAX_CONCURRENCY, is_rate_limited
+from .tools import DEFAULT_TOOL_CONCURRENCY
+
+
+def _add_generation_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the generation options shared by single-repository and batch runs
+    """
+    parser.add_argument(
+        "-l", "--language",
+        dest="doc_language",
+        default=None,
+        choices=['Chinese', 'English', 'Japanese', 'Korean', 'French', 'German', 'Spanish', 'Russian'],
+        help=t('cli_language_help')
+    )
+    
+    parser.add_argument(
+        "--ui-lang",
+        dest="ui_language",
+        default=None,
+        choices=['en', 'zh'],
+        help=t('cli_ui_language_help')
+    )
+    
+    parser.add_argument(
+        "--recursion-limit",
+        type=int,
+        default=1000,
+        help="Agent recursion limit (default: 1000)"
+    )
+    
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help=t('cli_verbose_help')
+    )
+    
+    parser.add_argument(
+        "--base-url",
+        dest="base_url",
+        default=None,
+        help=t('cli_base_url_help')
+    )
+    
+    parser.add_argument(
+        "--no-incremental",
+        dest="incremental",
+        action="store_false",
+        help=t('cli_no_incremental_help')
+    )
+    
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        metavar="N",
+        help=t('cli_parallel_help')
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_directory",
+        default=None,
+        help=t('cli_cache_dir_help')
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help=t('cli_no_cache_help')
+    )
+    
+    parser.add_argument(
+        "--no-prompt-cache",
+        dest="prompt_caching",
+        action="store_false",
+        help=t('cli_no_prompt_cache_help')
+    )
+    
+    parser.add_argument(
+        "--no-tool-memo",
+        dest="memoize_tools",
+        action="store_false",
+        help=t('cli_no_tool_memo_help')
+    )
+    
+    parser.add_argument(
+        "--tool-concurrency",
+        type=int,
+        default=DEFAULT_TOOL_CONCURRENCY,
+        metavar="N",
+        help=t('cli_tool_concurrency_help')
+    )
+    
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help=t('cli_search_index_help')
+    )
+    
+    parser.add_argument(
+        "--shell-session",
+        action="store_true",
+        help=t('cli_shell_session_help')
+    )
+    
+    parser.add_argument(
+        "--explore-model",
+        default=None,
+        metavar="MODEL",
+        help=t('cli_explore_model_help')
+    )
+    
+    parser.add_argument(
+        "--write-model",
+        default=None,
+        metavar="MODEL",
+        help=t('cli_write_model_help')
+    )
+    
+    parser.add_argument(
+        "--compact-threshold",
+        dest="compaction_threshold",
+        type=int,
+        default=DEFAULT_COMPACTION_THRESHOLD,
+        metavar="TOKENS",
+        help=t('cli_compact_threshold_help', default=DEFAULT_COMPACTION_THRESHOLD)
+    )
+    
+    parser.add_argument(
+        "--max-rpm",
+        dest="requests_per_minute",
+        type=int,
+        default=0,
+        metavar="N",
+        help=t('cli_max_rpm_help')
+    )
+    
+    parser.add_argument(
+        "--max-tpm",
+        dest="tokens_per_minute",
+        type=int,
+        default=0,
+        metavar="N",
+        help=t('cli_max_tpm_help')
+    )
+    
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        metavar="N",
+        help=t('cli_max_concurrency_help')
+    )
+
+
+def _report_error(error: Exception, verbose: bool) -> None:
+    """
+    Print a generation error, with targeted advice for authentication failures
+    """
+    error_msg = str(error)
+
+    if is_rate_limited(error):
+        print(f"\n❌ {t('error_rate_limited')}", file=sys.stderr)
+        print(f"\n🔧 {t('error_rate_limited_hint')}", file=sys.stderr)
+        if verbose:
+            print(f"\n🔍 {t('error_details', default='Technical Details:')} {error_msg}", file=sys.stderr)
+        return
+
+    # Handle common authentication errors with better messages
+    if any(auth_error in error_msg.lower() for auth_error in [
+        "could not resolve authentication method",
+        "expected either api_key or auth_token to be set",
+        "x-api-key",
+        "authorization header",
+        "401",
+        "unauthorized",
+        "authentication"
+    ]):
+        print(f"\n❌ {t('error_authentication_failed', default='Authentication Failed')}", file=sys.stderr)
+        print(f"\n{t('error_auth_cause', default='This error occurs when your Anthropic API key is not properly configured.')}", file=sys.stderr)
+        print(f"\n🔧 {t('error_auth_solution', default='Quick Fix:')}", file=sys.stderr)
+        print(f"   export ANTHROPIC_AUTH_TOKEN='your-api-key-here'", file=sys.stderr)
+        print(f"\n📚 {t('error_auth_help', default='For detailed help, visit:')} https://console.anthropic.com", file=sys.stderr)
+
+        if verbose:
+            print(f"\n🔍 {t('error_details', default='Technical Details:')} {error_msg}", file=sys.stderr)
+            import traceback
+            traceback.print_exc()
+    else:
+        print(f"\n❌ Error: {error}", file=sys.stderr)
+        if verbose:
+            import traceback
+            traceback.print_exc()
+
+
+def batch_main(argv):
+    """
+    Entry point of `codeviewx batch`
+    
+    Args:
+        argv: Command line arguments following `batch`
+    """
+    parser = argparse.ArgumentParser(
+        prog="codeviewx batch",
+        description=t('cli_batch_description')
+    )
+    
+    parser.add_argument(
+        "repository_list",
+        metavar="REPOS_FILE",
+        help=t('cli_batch_file_help')
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        metavar="N",
+        help=t('cli_batch_workers_help')
+    )
+    
+    parser.add_argument(
+        "-o", "--output-dir",
+        dest="output_directory",
+        default="docs",
+        help=t('cli_batch_output_dir_help')
+    )
+    
+    parser.add_argument(
+        "--output-root",
+        default=None,
+        metavar="DIR",
+        help=t('cli_batch_output_root_help')
+    )
+    
+    _add_generation_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        print(f"CodeViewX v{__version__}")
+        print()
+        
+        if args.ui_language:
+            get_i18n().set_locale(args.ui_language)
+        
+        repositories = read_repository_list(args.repository_list)
+        if not repositories:
+            print(t('error_batch_empty', path=args.repository_list), file=sys.stderr)
+            sys.exit(1)
+        
+        print(t('batch_plan', count=len(repositories), workers=args.workers))
+        started = time.perf_counter()
+        entries = run_batch(
+            repositories,
+            args.workers,
+            output_directory=args.output_directory,
+            output_root=args.output_root,
+            doc_language=args.doc_language,
+            ui_language=args.ui_language,
+            recursion_limit=args.recursion_limit,
+            verbose=args.verbose,
+            base_url=args.base_url,
+            incremental=args.incremental,
+            parallel=args.parallel,
+            use_cache=args.use_cache,
+            cache_directory=args.cache_directory,
+            compaction_threshold=args.compaction_threshold,
+            requests_per_minute=args.requests_per_minute,
+            tokens_per_minute=args.tokens_per_minute,
+            max_concurrency=args.max_concurrency,
+            prompt_caching=args.prompt_caching,
+            memoize_tools=args.memoize_tools,
+            tool_concurrency=args.tool_concurrency,
+            search_index=args.search_index,
+            shell_session=args.shell_session,
+            explore_model=args.explore_model,
+            write_model=args.write_model
+        )
+        
+        failed = sum(1 for entry in entries if entry.error is not None)
+        print()
+        print(format_batch_summary(entries))
+        print()
+        print(t(
+            'batch_summary',
+            succeeded=len(entries) - failed,
+            failed=failed,
+            seconds=f"{time.perf_counter() - started:.1f}"
+        ))
+        if failed:
+            sys.exit(1)
+        
+    except KeyboardInterrupt:
+        print("\n\n⚠️  User interrupted", file=sys.stderr)
+        sys.exit(130)
+    except Exception as e:
+        _report_error(e, args.verbose)
+        sys.exit(1)
+
+
+def benchmark_main(argv):
+    """
+    Entry point of `codeviewx benchmark`
+    
+    Args:
+        argv: Command line arguments following `benchmark`
+    """
+    parser = argparse.ArgumentParser(
+        prog="codeviewx benchmark",
+        description=t('cli_benchmark_description')
+    )
+    
+    parser.add_argument(
+        "transcript",
+        metavar="TRANSCRIPT",
+        help=t('cli_benchmark_transcript_help')
+    )
+    
+    parser.add_argument(
+        "-w", "--working-dir",
+        dest="working_directory",
+        default=None,
+        help=t('cli_benchmark_working_dir_help')
+    )
+    
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        metavar="N",
+        help=t('cli_benchmark_runs_help')
+    )
+    
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help=t('cli_benchmark_json_help')
+    )
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        report = run_benchmark(args.transcript, args.working_directory, args.runs)
+        if args.json:
+            print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+        else:
+            print(format_benchmark_report(report))
+        
+    except KeyboardInterrupt:
+        print("\n\n⚠️  User interrupted", file=sys.stderr)
+        sys.exit(130)
+    except Exception as e:
+        print(f"\n❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 def main():
@@ -20,6 +383,13 @@ def main():
     ui_lang = detect_ui_language()
     get_i18n().set_locale(ui_lang)
     
+    if sys.argv[1:2] == ["batch"]:
+        batch_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["benchmark"]:
+        benchmark_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         prog="codeviewx",
         description=t('cli_description'),
@@ -47,40 +417,44 @@ def main():
         help=t('cli_output_dir_help')
     )
     
+    _add_generation_arguments(parser)
+    
     parser.add_argument(
-        "-l", "--language",
-        dest="doc_language",
+        "--resume",
+        metavar="RUN_ID",
         default=None,
-        choices=['Chinese', 'English', 'Japanese', 'Korean', 'French', 'German', 'Spanish', 'Russian'],
-        help=t('cli_language_help')
+        help=t('cli_resume_help')
     )
     
     parser.add_argument(
-        "--ui-lang",
-        dest="ui_language",
+        "--trace",
+        dest="trace_path",
         default=None,
-        choices=['en', 'zh'],
-        help=t('cli_ui_language_help')
+        metavar="FILE",
+        help=t('cli_trace_help')
     )
     
     parser.add_argument(
-        "--recursion-limit",
-        type=int,
-        default=1000,
-        help="Agent recursion limit (default: 1000)"
+        "--progress",
+        choices=['text', 'json'],
+        default='text',
+        help=t('cli_progress_help')
     )
     
-    parser.add_argument(
-        "--verbose",
-        action="store_true",
-        help=t('cli_verbose_help')
+    replay_group = parser.add_mutually_exclusive_group()
+    replay_group.add_argument(
+        "--record",
+        dest="record_path",
+        default=None,
+        metavar="FILE",
+        help=t('cli_record_help')
     )
-    
-    parser.add_argument(
-        "--base-url",
-        dest="base_url",
+    replay_group.add_argument(
+        "--replay",
+        dest="replay_path",
         default=None,
-        help=t('cli_base_url_help')
+        metavar="FILE",
+        help=t('cli_replay_help')
     )
     
     parser.add_argument(
@@ -91,6 +465,12 @@ def main():
     
     args = parser.parse_args()
     
+    # In JSON mode stdout carries only the event stream
+    events = None
+    if args.progress == 'json' and not args.serve:
+        events = JsonLinesWriter(sys.stdout)
+        sys.stdout = sys.stderr
+    
     try:
         print(f"CodeViewX v{__version__}")
         print()
@@ -115,48 +495,45 @@ def main():
             
             start_document_web_server(args.output_directory)
         else:
-            generate_docs(
+            result = generate_docs(
                 working_directory=args.working_directory,
                 output_directory=args.output_directory,
                 doc_language=args.doc_language,
                 ui_language=getattr(args, 'ui_language', None),
                 recursion_limit=args.recursion_limit,
                 verbose=args.verbose,
-                base_url=getattr(args, 'base_url', None)
+                base_url=getattr(args, 'base_url', None),
+                incremental=args.incremental,
+                parallel=args.parallel,
+                use_cache=args.use_cache,
+                cache_directory=args.cache_directory,
+                resume=args.resume,
+                compaction_threshold=args.compaction_threshold,
+                requests_per_minute=args.requests_per_minute,
+                tokens_per_minute=args.tokens_per_minute,
+                max_concurrency=args.max_concurrency,
+                trace_path=args.trace_path,
+                on_progress=events,
+                prompt_caching=args.prompt_caching,
+                memoize_tools=args.memoize_tools,
+                tool_concurrency=args.tool_concurrency,
+                search_index=args.search_index,
+                shell_session=args.shell_session,
+                explore_model=args.explore_model,
+                write_model=args.write_model,
+                record_path=args.record_path,
+                replay_path=args.replay_path
             )
+            if events:
+                events.write({"event": "run_finished", **result.to_dict()})
         
     except KeyboardInterrupt:
         print("\n\n⚠️  User interrupted", file=sys.stderr)
         sys.exit(130)
     except Exception as e:
-        error_msg = str(e)
-
-        # Handle common authentication errors with better messages
-        if any(auth_error in error_msg.lower() for auth_error in [
-            "could not resolve authentication method",
-            "expected either api_key or auth_token to be set",
-            "x-api-key",
-            "authorization header",
-            "401",
-            "unauthorized",
-            "authentication"
-        ]):
-            print(f"\n❌ {t('error_authentication_failed', default='Authentication Failed')}", file=sys.stderr)
-            print(f"\n{t('error_auth_cause', default='This error occurs when your Anthropic API key is not properly configured.')}", file=sys.stderr)
-            print(f"\n🔧 {t('error_auth_solution', default='Quick Fix:')}", file=sys.stderr)
-            print(f"   export ANTHROPIC_AUTH_TOKEN='your-api-key-here'", file=sys.stderr)
-            print(f"\n📚 {t('error_auth_help', default='For detailed help, visit:')} https://console.anthropic.com", file=sys.stderr)
-
-            if args.verbose:
-                print(f"\n🔍 {t('error_details', default='Technical Details:')} {error_msg}", file=sys.stderr)
-                import traceback
-                traceback.print_exc()
-        else:
-            print(f"\n❌ Error: {e}", file=sys.stderr)
-            if args.verbose:
-                import traceback
-                traceback.print_exc()
-
+        if events:
+            events.write({"event": "run_failed", "error": str(e) or e.__class__.__name__})
+        _report_error(e, args.verbose)
         sys.exit(1)
 
 
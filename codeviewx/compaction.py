@@ -0,0 +1,154 @@
+"""
+Context compaction module
+
+Keeps per-call model input bounded on long agent runs by replacing old tool
+payloads with short references while recent turns stay verbatim.
+"""
+
+import json
+import threading
+from typing import List, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+
+DEFAULT_COMPACTION_THRESHOLD = 60000
+DEFAULT_KEEP_RECENT = 12
+CHARS_PER_TOKEN = 4
+PREVIEW_CHARS = 160
+
+# Tool call arguments that carry bulk content (e.g. whole documents being written)
+BULK_ARGUMENTS = ("content", "contents")
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    """
+    Estimate the token count of a message list (about 4 characters per token)
+
+    Args:
+        messages: Chat messages
+
+    Returns:
+        Estimated number of tokens
+    """
+    chars = 0
+    for message in messages:
+        content = message.content
+        chars += len(content) if isinstance(content, str) else len(json.dumps(content, default=str))
+        for tool_call in getattr(message, 'tool_calls', None) or []:
+            chars += len(json.dumps(tool_call.get('args', {}), default=str))
+    return chars // CHARS_PER_TOKEN
+
+
+def _content_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return '\n'.join(
+        block.get('text', '') if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+class ContextCompactor:
+    """
+    Compacts old tool results and bulky tool-call arguments in model input
+
+    Once the estimated size of a conversation exceeds `threshold_tokens`,
+    tool results older than the recent window are replaced by a one-line
+    reference (tool name, first line, size) and bulky `write_real_file`
+    arguments by their length. The compaction boundary advances in steps
+    of `keep_recent` messages so the compacted prefix stays identical across
+    consecutive calls. System and human messages are never touched.
+
+    Examples:
+        compactor = ContextCompactor(threshold_tokens=60000)
+        messages = compactor.compact(messages)
+        print(compactor.tokens_saved)
+    """
+
+    def __init__(self, threshold_tokens: int = DEFAULT_COMPACTION_THRESHOLD, keep_recent: int = DEFAULT_KEEP_RECENT):
+        """
+        Args:
+            threshold_tokens: Estimated conversation size above which compaction starts
+            keep_recent: Number of most recent messages always sent verbatim
+        """
+        self.threshold_tokens = threshold_tokens
+        self.keep_recent = max(1, keep_recent)
+        self.calls = 0
+        self.compacted_calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def _compact_tool_message(self, message: ToolMessage) -> ToolMessage:
+        text = _content_text(message.content)
+        if len(text) <= PREVIEW_CHARS:
+            return message
+        first_line = text.strip().split('\n', 1)[0][:PREVIEW_CHARS]
+        lines = text.count('\n') + 1
+        reference = (
+            f"[Compacted {message.name or 'tool'} result: {first_line} ... "
+            f"({lines} lines, ~{len(text) // CHARS_PER_TOKEN} tokens). "
+            f"Call the tool again if the full content is needed.]"
+        )
+        return message.model_copy(update={'content': reference})
+
+    def _compact_ai_message(self, message: AIMessage) -> AIMessage:
+        changed = False
+        tool_calls = []
+        for tool_call in message.tool_calls:
+            args = dict(tool_call.get('args', {}))
+            for key in BULK_ARGUMENTS:
+                value = args.get(key)
+                if isinstance(value, str) and len(value) > PREVIEW_CHARS:
+                    args[key] = f"[{len(value)} characters, compacted]"
+                    changed = True
+            tool_calls.append({**tool_call, 'args': args})
+        if not changed:
+            return message
+
+        content = message.content
+        if isinstance(content, list):
+            # Anthropic keeps tool_use blocks in content; compact their inputs too
+            by_id = {tool_call['id']: tool_call['args'] for tool_call in tool_calls}
+            content = [
+                {**block, 'input': by_id.get(block.get('id'), block.get('input'))}
+                if isinstance(block, dict) and block.get('type') == 'tool_use' else block
+                for block in content
+            ]
+        return message.model_copy(update={'tool_calls': tool_calls, 'content': content})
+
+    def compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        Return the messages to send to the model, compacted if over the threshold
+
+        Args:
+            messages: Full conversation (left unmodified)
+
+        Returns:
+            The same list if under the threshold, else a compacted copy
+        """
+        before = estimate_tokens(messages)
+        result = messages
+        if before > self.threshold_tokens:
+            boundary = (max(0, len(messages) - self.keep_recent) // self.keep_recent) * self.keep_recent
+            result = list(messages)
+            for index in range(boundary):
+                message = result[index]
+                if isinstance(message, ToolMessage):
+                    result[index] = self._compact_tool_message(message)
+                elif isinstance(message, AIMessage) and message.tool_calls:
+                    result[index] = self._compact_ai_message(message)
+        after = estimate_tokens(result) if result is not messages else before
+
+        with self._lock:
+            self.calls += 1
+            self.tokens_before += before
+            self.tokens_after += after
+            if after < before:
+                self.compacted_calls += 1
+        return result
@@ -5,7 +5,13 @@ CodeViewX core module - Public API entry point
 from .language import detect_system_language
 from .prompt import load_prompt
 from .server import start_document_web_server
-from .generator import generate_docs
+from .generator import generate_docs, agenerate_docs, GenerationResult
+from .batch import run_batch, arun_batch
+from .benchmark import run_benchmark
+from .events import (
+    ProgressEvent, ToolStarted, ToolFinished, DocWritten, TodosUpdated, ModelTokens, AgentMessage,
+    JsonLinesWriter
+)
 
 
 __all__ = [
@@ -13,6 +19,19 @@ __all__ = [
     'load_prompt',
     'start_document_web_server',
     'generate_docs',
+    'agenerate_docs',
+    'GenerationResult',
+    'run_batch',
+    'arun_batch',
+    'run_benchmark',
+    'ProgressEvent',
+    'ToolStarted',
+    'ToolFinished',
+    'DocWritten',
+    'TodosUpdated',
+    'ModelTokens',
+    'AgentMessage',
+    'JsonLinesWriter',
 ]
 
 
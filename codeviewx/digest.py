@@ -0,0 +1,226 @@
+"""
+Repository digest module
+
+Fast local pre-scan of the working directory whose compact summary is
+injected into the system prompt, sparing the agent most exploratory
+listing and `find` round trips.
+"""
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .tools.fileindex import FileIndex
+
+
+MANIFEST_FILES = {
+    "package.json", "pyproject.toml", "setup.py", "setup.cfg", "requirements.txt",
+    "Pipfile", "environment.yml", "go.mod", "Cargo.toml", "pom.xml", "build.gradle",
+    "build.gradle.kts", "settings.gradle", "Gemfile", "composer.json", "mix.exs",
+    "pubspec.yaml", "CMakeLists.txt", "Makefile", "Dockerfile", "docker-compose.yml",
+    "docker-compose.yaml", "tsconfig.json", "deno.json",
+}
+
+ENTRY_POINT_FILES = {
+    "main.py", "__main__.py", "app.py", "manage.py", "wsgi.py", "asgi.py", "cli.py",
+    "server.py", "index.js", "index.ts", "main.js", "main.ts", "server.js", "app.js",
+    "main.go", "main.rs", "Main.java", "Application.java", "Program.cs", "main.c",
+    "main.cpp", "main.swift", "main.kt",
+}
+
+MAX_LOC_FILE_SIZE = 5 * 1024 * 1024
+MAX_TREE_DEPTH = 2
+MAX_TREE_LINES = 60
+MAX_LANGUAGES = 15
+MAX_LARGEST_FILES = 10
+
+
+class FileRecord:
+    """
+    One scanned file
+    """
+
+    __slots__ = ("path", "size", "language", "lines")
+
+    def __init__(self, path: str, size: int, language: Optional[str], lines: int):
+        self.path = path
+        self.size = size
+        self.language = language
+        self.lines = lines
+
+
+def _count_lines(abs_path: str, size: int) -> int:
+    if size == 0 or size > MAX_LOC_FILE_SIZE:
+        return 0
+    lines = 0
+    last = b"\n"
+    try:
+        with open(abs_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                if b"\0" in block:
+                    return 0
+                lines += block.count(b"\n")
+                last = block[-1:]
+    except OSError:
+        return 0
+    return lines + (0 if last == b"\n" else 1)
+
+
+def _scan_file(root: str, rel_path: str, size: int, language: Optional[str]) -> FileRecord:
+    lines = _count_lines(os.path.join(root, rel_path), size) if language else 0
+    return FileRecord(rel_path, size, language, lines)
+
+
+def scan_repository(
+    working_directory: str,
+    exclude: Sequence[str] = (),
+    max_workers: int = 8,
+    index: Optional[FileIndex] = None
+) -> List[FileRecord]:
+    """
+    Walk a repository in parallel, honoring the default ignore list and .gitignore files
+
+    The walk is a FileIndex build; lines of code are then counted concurrently.
+
+    Args:
+        working_directory: Repository root
+        exclude: Extra directories to skip, relative to the root (e.g. the docs output)
+        max_workers: Number of walker threads
+        index: Index of the repository already built, instead of walking it again
+
+    Returns:
+        Records of all non-ignored files, sorted by path
+    """
+    if index is None:
+        index = FileIndex.build(working_directory, exclude, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        records = list(pool.map(
+            lambda file: _scan_file(index.root, file[0], file[1], file[3]), index.files()
+        ))
+    records.sort(key=lambda record: record.path)
+    return records
+
+
+def _format_size(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def _package_json_entry_points(root: str, rel_path: str) -> List[str]:
+    try:
+        with open(os.path.join(root, rel_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    base = os.path.dirname(rel_path)
+    targets = []
+    if isinstance(data.get("main"), str):
+        targets.append(data["main"])
+    bin_field = data.get("bin")
+    if isinstance(bin_field, str):
+        targets.append(bin_field)
+    elif isinstance(bin_field, dict):
+        targets.extend(value for value in bin_field.values() if isinstance(value, str))
+    return [os.path.normpath(os.path.join(base, target)) for target in targets]
+
+
+def format_digest(working_directory: str, records: List[FileRecord]) -> str:
+    """
+    Render scanned file records as a compact Markdown digest
+
+    Args:
+        working_directory: Repository root the records were scanned from
+        records: Output of `scan_repository`
+
+    Returns:
+        Markdown with summary, lines of code per language, manifests,
+        entry points, directory tree with file counts and largest files
+    """
+    root = os.path.abspath(working_directory)
+    total_size = sum(record.size for record in records)
+    total_lines = sum(record.lines for record in records)
+
+    languages: Dict[str, Tuple[int, int]] = {}
+    dir_counts: Dict[str, int] = {}
+    manifests = []
+    entry_points = []
+    for record in records:
+        if record.language:
+            files, lines = languages.get(record.language, (0, 0))
+            languages[record.language] = (files + 1, lines + record.lines)
+
+        parts = record.path.split("/")
+        for depth in range(1, min(len(parts), MAX_TREE_DEPTH + 1)):
+            directory = "/".join(parts[:depth])
+            dir_counts[directory] = dir_counts.get(directory, 0) + 1
+
+        name = parts[-1]
+        if name in MANIFEST_FILES or name.endswith((".csproj", ".sln", ".gemspec")):
+            manifests.append(record.path)
+            if name == "package.json":
+                entry_points.extend(_package_json_entry_points(root, record.path))
+        if name in ENTRY_POINT_FILES:
+            entry_points.append(record.path)
+
+    sections = [
+        "### Summary",
+        f"- {len(records)} files, {_format_size(total_size)}, {total_lines} lines of code",
+        "",
+        "### Lines of Code by Language",
+    ]
+    ranked_languages = sorted(languages.items(), key=lambda item: (-item[1][1], item[0]))
+    for language, (files, lines) in ranked_languages[:MAX_LANGUAGES]:
+        sections.append(f"- {language}: {lines} lines in {files} files")
+    if len(ranked_languages) > MAX_LANGUAGES:
+        sections.append(f"- ... (+{len(ranked_languages) - MAX_LANGUAGES} more languages)")
+
+    sections += ["", "### Manifests"]
+    sections += [f"- {path}" for path in manifests] or ["- (none detected)"]
+
+    sections += ["", "### Entry Points"]
+    sections += [f"- {path}" for path in sorted(set(entry_points))] or ["- (none detected)"]
+
+    sections += ["", "### Directory Tree (recursive file counts)"]
+    tree_lines = []
+    for directory in sorted(dir_counts, key=lambda path: path.split("/")):
+        depth = directory.count("/")
+        tree_lines.append(f"{'  ' * depth}{directory.rsplit('/', 1)[-1]}/ ({dir_counts[directory]} files)")
+    sections += tree_lines[:MAX_TREE_LINES]
+    if len(tree_lines) > MAX_TREE_LINES:
+        sections.append(f"... (+{len(tree_lines) - MAX_TREE_LINES} more directories)")
+
+    sections += ["", "### Largest Files"]
+    largest = sorted(records, key=lambda record: -record.size)[:MAX_LARGEST_FILES]
+    sections += [f"- {record.path} ({_format_size(record.size)})" for record in largest]
+
+    return "\n".join(sections)
+
+
+def build_repository_digest(
+    working_directory: str,
+    exclude: Sequence[str] = (),
+    max_workers: int = 8,
+    index: Optional[FileIndex] = None
+) -> Tuple[str, List[FileRecord]]:
+    """
+    Scan a repository and render its digest
+
+    Args:
+        working_directory: Repository root
+        exclude: Extra directories to skip, relative to the root
+        max_workers: Number of walker threads
+        index: Index of the repository already built, instead of walking it again
+
+    Returns:
+        Tuple of (Markdown digest, scanned file records)
+
+    Examples:
+        digest, records = build_repository_digest("/path/to/project")
+        prompt = load_prompt("document_engineer", ..., repository_digest=digest)
+    """
+    records = scan_repository(working_directory, exclude, max_workers, index)
+    return format_digest(working_directory, records), records
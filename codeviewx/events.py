@@ -0,0 +1,344 @@
+"""
+Progress events module
+
+Typed events describing what an agent conversation is doing, derived from
+the incremental updates of `agent.stream(..., stream_mode="updates")`.
+Each update carries only the messages a graph step added, so producing
+events costs the same at step 500 as at step 5.
+"""
+
+import sys
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .usage import cache_read_tokens, cache_write_tokens
+
+
+ProgressListener = Callable[["ProgressEvent"], None]
+
+MAX_ARGUMENT_CHARS = 200
+
+
+class ProgressEvent:
+    """
+    Base class of progress events
+
+    Attributes:
+        part: Conversation the event belongs to: None for a run's main
+              conversation, "analysis" or a chapter file in parallel mode
+        step: Number of the graph step that produced the event, counted per conversation
+    """
+
+    kind = "event"
+    __slots__ = ("part", "step")
+
+    def __init__(self, part: Optional[str], step: int):
+        self.part = part
+        self.step = step
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable form, with the event type under "event"
+        """
+        data = {"event": self.kind}
+        for cls in reversed(type(self).__mro__):
+            for name in getattr(cls, '__slots__', ()):
+                data[name] = getattr(self, name)
+        return data
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={value!r}" for key, value in self.to_dict().items() if key != "event")
+        return f"{self.__class__.__name__}({fields})"
+
+
+class ModelTokens(ProgressEvent):
+    """
+    A model response and the tokens it used
+
+    Attributes:
+        input_tokens: Prompt tokens
+        output_tokens: Completion tokens
+        cached: Whether the response was replayed from the response cache
+        cache_read_tokens: Prompt tokens read from the provider's prompt cache
+        cache_write_tokens: Prompt tokens written to the provider's prompt cache
+    """
+
+    kind = "model_tokens"
+    __slots__ = ("input_tokens", "output_tokens", "cached", "cache_read_tokens", "cache_write_tokens")
+
+    def __init__(
+        self, part, step, input_tokens: int, output_tokens: int, cached: bool,
+        cache_read_tokens: int = 0, cache_write_tokens: int = 0
+    ):
+        super().__init__(part, step)
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cached = cached
+        self.cache_read_tokens = cache_read_tokens
+        self.cache_write_tokens = cache_write_tokens
+
+
+class AgentMessage(ProgressEvent):
+    """
+    Text written by the model
+
+    Attributes:
+        text: Message text
+        tool_calls: Number of tool calls requested along with the text
+    """
+
+    kind = "agent_message"
+    __slots__ = ("text", "tool_calls")
+
+    def __init__(self, part, step, text: str, tool_calls: int):
+        super().__init__(part, step)
+        self.text = text
+        self.tool_calls = tool_calls
+
+
+class ToolStarted(ProgressEvent):
+    """
+    A tool call requested by the model
+
+    `to_dict` truncates long text arguments (e.g. the content of a written file).
+
+    Attributes:
+        tool: Tool name
+        call_id: Tool call id, shared with the matching ToolFinished
+        args: Tool arguments
+    """
+
+    kind = "tool_started"
+    __slots__ = ("tool", "call_id", "args")
+
+    def __init__(self, part, step, tool: str, call_id: str, args: Dict[str, Any]):
+        super().__init__(part, step)
+        self.tool = tool
+        self.call_id = call_id
+        self.args = args
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["args"] = {
+            key: f"{value[:MAX_ARGUMENT_CHARS]}... ({len(value)} chars)"
+            if isinstance(value, str) and len(value) > MAX_ARGUMENT_CHARS else value
+            for key, value in (self.args if isinstance(self.args, dict) else {}).items()
+        }
+        return data
+
+
+class ToolFinished(ProgressEvent):
+    """
+    The result of a tool call
+
+    `to_dict` reports the size of the result instead of its content.
+
+    Attributes:
+        tool: Tool name
+        call_id: Tool call id
+        content: Tool result text
+        failed: Whether the tool raised or reported an error
+    """
+
+    kind = "tool_finished"
+    __slots__ = ("tool", "call_id", "content", "failed")
+
+    def __init__(self, part, step, tool: str, call_id: str, content: str, failed: bool):
+        super().__init__(part, step)
+        self.tool = tool
+        self.call_id = call_id
+        self.content = content
+        self.failed = failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        content = data.pop("content")
+        data["chars"] = len(content)
+        data["lines"] = content.count('\n') + 1 if content else 0
+        return data
+
+
+class DocWritten(ProgressEvent):
+    """
+    A documentation file written to the output directory
+
+    Attributes:
+        path: File path as passed to the tool
+        filename: File name
+        index: Number of documents written so far in the conversation, this one included
+    """
+
+    kind = "doc_written"
+    __slots__ = ("path", "filename", "index")
+
+    def __init__(self, part, step, path: str, filename: str, index: int):
+        super().__init__(part, step)
+        self.path = path
+        self.filename = filename
+        self.index = index
+
+
+class TodosUpdated(ProgressEvent):
+    """
+    The agent's task list after a `write_todos` call
+
+    Attributes:
+        todos: Items with "content" and "status" (pending, in_progress, completed)
+        completed: Number of completed items
+        total: Number of items
+    """
+
+    kind = "todos_updated"
+    __slots__ = ("todos", "completed", "total")
+
+    def __init__(self, part, step, todos: List[Dict[str, Any]]):
+        super().__init__(part, step)
+        self.todos = todos
+        self.completed = sum(1 for todo in todos if isinstance(todo, dict) and todo.get('status') == 'completed')
+        self.total = len(todos)
+
+
+def message_text(message) -> str:
+    """
+    Extract the plain text of a chat message whose content may be a list of blocks
+    """
+    content = getattr(message, 'content', '')
+    if isinstance(content, list):
+        return '\n'.join(
+            block.get('text', '') if isinstance(block, dict) else str(block)
+            for block in content
+        ).strip()
+    return str(content).strip()
+
+
+def _tool_call(tool_call) -> Tuple[str, str, Dict[str, Any]]:
+    if isinstance(tool_call, dict):
+        return tool_call.get('name', 'unknown'), tool_call.get('id') or '', tool_call.get('args') or {}
+    return getattr(tool_call, 'name', 'unknown'), getattr(tool_call, 'id', '') or '', getattr(tool_call, 'args', {}) or {}
+
+
+class ProgressTracker:
+    """
+    Turns the updates of one agent conversation into progress events
+
+    Only the messages added by each step are inspected; tool calls are
+    matched with their results through a table of calls still running.
+
+    Examples:
+        tracker = ProgressTracker("docs", listeners=[print])
+        for update in agent.stream(inputs, stream_mode="updates"):
+            tracker.handle(update)
+        print(tracker.step_count, tracker.docs_generated)
+    """
+
+    def __init__(
+        self,
+        output_directory: str,
+        part: Optional[str] = None,
+        docs_generated: int = 0,
+        listeners: Iterable[ProgressListener] = ()
+    ):
+        """
+        Args:
+            output_directory: Documentation output directory, used to detect doc writes
+            part: Conversation name set on every event
+            docs_generated: Documents already written (when resuming a conversation)
+            listeners: Callables receiving every event, in order
+        """
+        self.output_directory = output_directory
+        self.part = part
+        self.docs_generated = docs_generated
+        self.listeners = list(listeners)
+        self.step_count = 0
+        self._running: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+    def translate(self, update: Dict[str, Any]) -> List[ProgressEvent]:
+        """
+        Events for one streamed update
+
+        Args:
+            update: Mapping of graph node name to the state update it returned
+
+        Returns:
+            Events in the order they happened
+        """
+        events: List[ProgressEvent] = []
+        for node_update in update.values():
+            if not isinstance(node_update, dict):
+                continue
+            self.step_count += 1
+            for message in node_update.get("messages") or []:
+                events.extend(self._message_events(message))
+            if node_update.get("todos") is not None:
+                events.append(TodosUpdated(self.part, self.step_count, list(node_update["todos"])))
+        return events
+
+    def handle(self, update: Dict[str, Any]) -> None:
+        """
+        Translate one streamed update and pass its events to the listeners
+        """
+        for event in self.translate(update):
+            for listener in self.listeners:
+                listener(event)
+
+    def _message_events(self, message) -> Iterable[ProgressEvent]:
+        step = self.step_count
+        message_type = getattr(message, 'type', None)
+
+        if message_type == 'ai':
+            usage = getattr(message, 'usage_metadata', None)
+            if usage:
+                # LangChain zeroes the cost of responses replayed from the cache
+                yield ModelTokens(
+                    self.part, step, usage.get('input_tokens', 0), usage.get('output_tokens', 0),
+                    'total_cost' in usage, cache_read_tokens(usage), cache_write_tokens(usage)
+                )
+            tool_calls = getattr(message, 'tool_calls', None) or []
+            text = message_text(message)
+            if text:
+                yield AgentMessage(self.part, step, text, len(tool_calls))
+            for tool_call in tool_calls:
+                name, call_id, args = _tool_call(tool_call)
+                self._running[call_id] = (name, args)
+                yield ToolStarted(self.part, step, name, call_id, args)
+
+        elif message_type == 'tool':
+            call_id = getattr(message, 'tool_call_id', '') or ''
+            name, args = self._running.pop(call_id, (getattr(message, 'name', None) or 'unknown', {}))
+            content = str(getattr(message, 'content', '')).strip()
+            failed = getattr(message, 'status', None) == 'error' or content.startswith('❌')
+            yield ToolFinished(self.part, step, name, call_id, content, failed)
+
+            file_path = args.get('file_path', '') if isinstance(args, dict) else ''
+            if name == 'write_real_file' and not failed and file_path and self.output_directory in file_path:
+                self.docs_generated += 1
+                yield DocWritten(self.part, step, file_path, file_path.split('/')[-1], self.docs_generated)
+
+
+class JsonLinesWriter:
+    """
+    Progress listener writing each event as one line of JSON
+
+    Safe to share between the concurrent conversations of a run.
+
+    Examples:
+        generate_docs(on_progress=JsonLinesWriter(sys.stdout))
+        # {"event": "tool_started", "part": null, "step": 3, "tool": "read_real_file", ...}
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ProgressEvent) -> None:
+        self.write(event.to_dict())
+
+    def write(self, data: Dict[str, Any]) -> None:
+        """
+        Write one JSON object as a line and flush
+        """
+        line = json.dumps(data, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
@@ -3,25 +3,111 @@ Document generation module
 """
 
 import os
+import re
+import time
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from deepagents import create_deep_agent
-from langchain_anthropic import ChatAnthropic
+from deepagents import async_create_deep_agent, create_deep_agent
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import run_in_executor
 
 from .tools import (
     execute_command,
     ripgrep_search,
     write_real_file,
     read_real_file,
+    read_real_files,
     list_real_directory,
+    list_real_tree,
+    FileIndex,
+    ShellSessions,
+    ToolMemo,
+    ToolExecutor,
+    DEFAULT_TOOL_CONCURRENCY,
 )
+from .cache import ResponseCache
+from .digest import build_repository_digest
+from .tools.fileindex import register_index, unregister_index
+from .tools.shell import register_sessions, unregister_sessions
+from .tools.trigram import SEARCH_INDEX_FILENAME, TrigramIndex
+from .checkpoint import (
+    new_run_id,
+    is_run_id,
+    get_run_directory,
+    open_checkpointer,
+    aopen_checkpointer,
+    has_run,
+    ahas_run,
+    discard_run,
+    adiscard_run,
+)
+from .compaction import ContextCompactor, DEFAULT_COMPACTION_THRESHOLD
 from .language import detect_system_language
+from .manifest import DocManifest, ManifestRecorder, get_state_directory
+from .model import CodeViewXChatModel
+from .routing import ModelRouter
+from .replay import ReplayChatModel, TranscriptRecorder
+from .events import ProgressListener, ProgressTracker, message_text
+from .progress import ProgressDisplay
+from .trace import TraceRecorder, thread_lane
+from .ratelimit import DEFAULT_MAX_CONCURRENCY, get_shared_rate_limiter
+from .usage import TokenUsageCounter
 from .prompt import load_prompt
 from .i18n import get_i18n, t, detect_ui_language
 
 
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+DEFAULT_MAX_TOKENS = 64000
+# Exploration turns only emit tool calls and short notes, never whole documents
+EXPLORE_MAX_TOKENS = 8192
+
+DOC_CHAPTERS = [
+    'README.md',
+    '01-overview.md',
+    '02-quickstart.md',
+    '03-architecture.md',
+    '04-core-mechanisms.md',
+    '05-data-models.md',
+    '06-api-reference.md',
+    '07-development-guide.md',
+    '08-testing.md',
+]
+# Line of the analysis report naming the chapters to write, e.g. "Chapters: README.md, 01-overview.md"
+CHAPTERS_LINE = re.compile(r'^\W*chapters\W*[:：]\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+CHAPTER_NAME = re.compile(r'^[\w.-]+\.md$')
+
+
+def _parse_chapters(analysis: str) -> List[str]:
+    """
+    Extract the chapter list from the last "Chapters:" line of an analysis report
+
+    Args:
+        analysis: Final message of the analysis conversation
+
+    Returns:
+        Document file names in report order, empty if the report names none
+
+    Examples:
+        >>> _parse_chapters("...\\nChapters: README.md, 01-overview.md, `02-cli.md`")
+        ['README.md', '01-overview.md', '02-cli.md']
+    """
+    lines = CHAPTERS_LINE.findall(analysis)
+    if not lines:
+        return []
+    chapters = []
+    for name in re.split(r'[,，、]', lines[-1]):
+        name = name.strip().strip('`*"\'').strip()
+        if CHAPTER_NAME.match(name) and name not in chapters:
+            chapters.append(name)
+    return chapters
+
+
 def validate_api_key():
     """
     Validate that the Anthropic API key is properly configured.
@@ -47,6 +133,675 @@ def validate_api_key():
         )
 
 
+def _run_config(
+    run_id: str,
+    part: Optional[str],
+    recursion_limit: int,
+    callbacks: List[BaseCallbackHandler],
+    tool_concurrency: Optional[int] = None
+) -> dict:
+    """
+    Build the runnable config of one agent conversation within a run
+    
+    Args:
+        run_id: Run identifier
+        part: Conversation name within the run (e.g. a chapter), None for the main one
+        recursion_limit: Agent recursion limit
+        callbacks: Handlers receiving model and tool callbacks (manifest recorder, usage counter)
+        tool_concurrency: Tool calls of one turn run at the same time (default: None, LangChain's default)
+    """
+    config = {
+        "recursion_limit": recursion_limit,
+        "callbacks": callbacks,
+        "configurable": {"thread_id": f"{run_id}:{part}" if part else run_id},
+    }
+    if tool_concurrency:
+        config["max_concurrency"] = tool_concurrency
+    return config
+
+
+def _traced(tracer: Optional[TraceRecorder], name: str, lane: Optional[str] = None):
+    """
+    Span of the generator's own work in the run trace, if tracing
+    """
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name, thread_lane(lane))
+
+
+def _stream_agent(
+    agent,
+    task_instruction: str,
+    config: dict,
+    tracker: ProgressTracker,
+    tracer: Optional[TraceRecorder] = None
+) -> dict:
+    """
+    Run one agent conversation to completion, continuing from its checkpoint if any
+    
+    A conversation with no checkpoint starts from `task_instruction`; an
+    interrupted one resumes from its last completed step; a finished one is
+    not run again and its final state is returned as is. The graph is
+    streamed in "updates" mode, so each step only hands over what it added
+    to the state; the full state is read once, at the end.
+    
+    Args:
+        agent: Compiled deep agent with a checkpointer
+        task_instruction: User message that starts the conversation
+        config: Runnable config from `_run_config`
+        tracker: Progress tracker fed with every streamed update
+        tracer: Trace recorder timing the progress handling of each update
+    
+    Returns:
+        The final state of the conversation
+    """
+    inputs = {"messages": [{"role": "user", "content": task_instruction}]}
+    snapshot = agent.get_state(config)
+    if snapshot.values:
+        if not snapshot.next:
+            return snapshot.values
+        inputs = None
+    
+    lane = config["configurable"]["thread_id"]
+    for update in agent.stream(inputs, stream_mode="updates", config=config):
+        with _traced(tracer, "progress", lane):
+            tracker.handle(update)
+    return agent.get_state(config).values
+
+
+async def _astream_agent(
+    agent,
+    task_instruction: str,
+    config: dict,
+    tracker: ProgressTracker,
+    tracer: Optional[TraceRecorder] = None
+) -> dict:
+    """
+    Async counterpart of `_stream_agent`, driving the graph with `astream`
+    """
+    inputs = {"messages": [{"role": "user", "content": task_instruction}]}
+    snapshot = await agent.aget_state(config)
+    if snapshot.values:
+        if not snapshot.next:
+            return snapshot.values
+        inputs = None
+    
+    lane = config["configurable"]["thread_id"]
+    async for update in agent.astream(inputs, stream_mode="updates", config=config):
+        with _traced(tracer, "progress", lane):
+            tracker.handle(update)
+    return (await agent.aget_state(config)).values
+
+
+class GenerationResult:
+    """
+    Outcome of a documentation run, returned by `generate_docs` and `agenerate_docs`
+    
+    Attributes:
+        working_directory: Project working directory
+        output_directory: Documentation output directory
+        run_id: Run identifier (None if every document was already up to date)
+        docs_generated: Number of documents written during the run
+        steps: Number of agent steps across all conversations
+        reused: Documents kept from the previous run
+        regenerated: Documents written in this run
+        files: Files left in the agent's virtual filesystem
+        cache_hits: Model calls served from the response cache
+        cache_misses: Model calls sent to the API
+        tokens_saved: Estimated input tokens removed by context compaction
+        input_tokens: Input tokens sent to the API
+        output_tokens: Output tokens received from the API
+        cache_read_tokens: Input tokens read from the provider's prompt cache
+        cache_write_tokens: Input tokens written to the provider's prompt cache
+        tool_memo_hits: Tool calls answered from the run's tool memo
+        tool_memo_misses: Memoizable tool calls that ran the tool
+        elapsed: Wall-clock duration in seconds
+    
+    Examples:
+        result = generate_docs()
+        print(result.docs_generated, result.elapsed)
+        json.dumps(result.to_dict())
+    """
+    
+    def __init__(self, working_directory: str, output_directory: str):
+        self.working_directory = working_directory
+        self.output_directory = output_directory
+        self.run_id: Optional[str] = None
+        self.docs_generated = 0
+        self.steps = 0
+        self.reused: List[str] = []
+        self.regenerated: List[str] = []
+        self.files: List[str] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tokens_saved = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.tool_memo_hits = 0
+        self.tool_memo_misses = 0
+        self.elapsed = 0.0
+    
+    def to_dict(self) -> dict:
+        """
+        Get the result as a JSON-serializable dict
+        """
+        return dict(vars(self))
+    
+    def __repr__(self) -> str:
+        return (
+            f"GenerationResult(run_id={self.run_id!r}, docs_generated={self.docs_generated}, "
+            f"steps={self.steps}, elapsed={self.elapsed:.1f})"
+        )
+
+
+class _GenerationRun:
+    """
+    Everything about a run that does not depend on how the agent is driven
+    
+    Shared by `generate_docs` and `agenerate_docs`: logging and header output,
+    the incremental plan, recorder, repository digest, prompt and model, the
+    final manifest update and the summary. The blocking steps (`__init__`,
+    `prepare`, `update_manifest`) are plain methods so the async entry point
+    can run them in an executor.
+    """
+    
+    def __init__(
+        self,
+        working_directory: Optional[str],
+        output_directory: str,
+        doc_language: Optional[str],
+        ui_language: Optional[str],
+        recursion_limit: int,
+        verbose: bool,
+        base_url: Optional[str],
+        incremental: bool,
+        parallel: int,
+        use_cache: bool,
+        cache_directory: Optional[str],
+        resume: Optional[str],
+        compaction_threshold: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        trace_path: Optional[str],
+        on_progress: Optional[ProgressListener],
+        prompt_caching: bool,
+        explore_model: Optional[str],
+        write_model: Optional[str],
+        record_path: Optional[str],
+        replay_path: Optional[str],
+        memoize_tools: bool,
+        tool_concurrency: int,
+        search_index: bool,
+        shell_session: bool
+    ):
+        self.started = time.perf_counter()
+        
+        if ui_language is None:
+            ui_language = detect_ui_language()
+            ui_language_source = t('auto_detected')
+        else:
+            ui_language_source = t('user_specified')
+        
+        get_i18n().set_locale(ui_language)
+        
+        log_level = logging.DEBUG if verbose else logging.INFO
+        logging.basicConfig(
+            level=log_level,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%H:%M:%S'
+        )
+        
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        logging.getLogger("httpcore").setLevel(logging.WARNING)
+        
+        if verbose:
+            logging.getLogger("langchain").setLevel(logging.DEBUG)
+            logging.getLogger("langgraph").setLevel(logging.DEBUG)
+        
+        if working_directory is None:
+            working_directory = os.getcwd()
+        
+        # Set custom base URL if provided
+        if base_url:
+            os.environ['ANTHROPIC_BASE_URL'] = base_url
+        
+        # Get current base URL (from parameter or environment variable)
+        current_base_url = os.getenv('ANTHROPIC_BASE_URL')
+        
+        # Validate API key before proceeding (replayed runs make no API calls)
+        try:
+            if not replay_path:
+                validate_api_key()
+        except ValueError as api_error:
+            print(f"\n{api_error}")
+            print("\n" + "=" * 80)
+            print(t('api_help_header', default="🔗 Need help?"))
+            print("=" * 80)
+            print(t('api_help_get_key', default="• Get your API key: https://console.anthropic.com"))
+            print(t('api_help_docs', default="• View documentation: https://docs.anthropic.com"))
+            print("=" * 80)
+            raise ValueError(f"API key validation failed: {api_error}")
+        
+        if doc_language is None:
+            doc_language = detect_system_language()
+            doc_language_source = t('auto_detected')
+        else:
+            doc_language_source = t('user_specified')
+        
+        self.working_directory = working_directory
+        self.output_directory = output_directory
+        self.doc_language = doc_language
+        self.recursion_limit = recursion_limit
+        self.verbose = verbose
+        self.parallel = parallel
+        self.use_cache = use_cache
+        self.cache_directory = cache_directory
+        self.resume = resume
+        self.compaction_threshold = compaction_threshold
+        self.prompt_caching = prompt_caching
+        self.write_model = write_model or DEFAULT_MODEL
+        self.explore_model = explore_model or self.write_model
+        self.router: Optional[ModelRouter] = None
+        self.replay_path = replay_path
+        self.record_path = record_path
+        self.transcript = TranscriptRecorder(
+            working_directory, output_directory, doc_language=doc_language, parallel=parallel
+        ) if record_path else None
+        self.tool_memo = ToolMemo() if memoize_tools else None
+        self.tool_executor = ToolExecutor(tool_concurrency)
+        self.file_index: Optional[FileIndex] = None
+        self.use_search_index = search_index
+        self.use_shell_session = shell_session
+        self.shell_sessions: Optional[ShellSessions] = None
+        self.limiter = get_shared_rate_limiter(requests_per_minute, tokens_per_minute, max_concurrency)
+        self.result = GenerationResult(working_directory, output_directory)
+        self.response_cache: Optional[ResponseCache] = None
+        self.compactor: Optional[ContextCompactor] = None
+        self.usage = TokenUsageCounter()
+        self.trace_path = trace_path
+        self.tracer = TraceRecorder() if trace_path else None
+        self.on_progress = on_progress
+        
+        print("=" * 80)
+        print(f"{t('starting')} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 80)
+        print(f"{t('working_dir')}: {working_directory}")
+        print(f"{t('output_dir')}: {output_directory}")
+        print(f"{t('doc_language')}: {doc_language} ({doc_language_source})")
+        print(f"{t('ui_language')}: {ui_language} ({ui_language_source})")
+        if current_base_url:
+            print(f"{t('api_base_url')}: {current_base_url}")
+        
+        if incremental:
+            self.manifest = DocManifest.load(working_directory, output_directory)
+        else:
+            self.manifest = DocManifest(working_directory, output_directory)
+        self.reused_docs, self.stale_docs = self.manifest.plan()
+        self.planned_chapters: List[str] = []
+        if self.up_to_date:
+            return
+        
+        self.task_instruction = t('agent_task_instruction')
+        if self.reused_docs:
+            print(t('incremental_plan', stale=', '.join(self.stale_docs), reused=len(self.reused_docs)))
+            self.task_instruction += "\n\n" + t(
+                'agent_incremental_instruction',
+                stale=', '.join(self.stale_docs),
+                reused=', '.join(self.reused_docs)
+            )
+        self.reused_snapshot = self.manifest.snapshot(self.reused_docs)
+    
+    @property
+    def up_to_date(self) -> bool:
+        return bool(self.reused_docs) and not self.stale_docs
+    
+    @property
+    def chapters(self) -> List[str]:
+        if self.reused_docs:
+            return self.stale_docs
+        return self.planned_chapters or DOC_CHAPTERS
+    
+    def plan_chapters(self, analysis: str) -> None:
+        """
+        Take the chapters to write from the analysis report, falling back to `DOC_CHAPTERS`
+        """
+        self.planned_chapters = _parse_chapters(analysis)
+        print(t('parallel_chapters', count=len(self.chapters), chapters=', '.join(self.chapters)))
+    
+    def report_up_to_date(self) -> GenerationResult:
+        print("=" * 80)
+        print(t('docs_up_to_date', count=len(self.reused_docs)))
+        print(f"   {t('docs_reused_regenerated', reused=len(self.reused_docs), regenerated=0)}")
+        print("=" * 80)
+        self.result.reused = sorted(self.reused_docs)
+        self.result.elapsed = time.perf_counter() - self.started
+        return self.result
+    
+    def prepare(self) -> None:
+        """
+        Create the run id, manifest recorder, repository digest, prompt and model
+        """
+        self.run_id = self.resume or new_run_id()
+        print(f"{t('run_id')}: {self.run_id}")
+        
+        self.recorder = ManifestRecorder(
+            self.working_directory,
+            self.output_directory,
+            os.path.join(get_run_directory(self.output_directory, self.run_id), "recorder.json")
+        )
+        if self.resume:
+            print(t('resuming_run', run_id=self.run_id, docs=', '.join(sorted(self.recorder.doc_sources)) or '-'))
+        
+        scan_started = time.perf_counter()
+        output_relative = os.path.relpath(
+            os.path.abspath(self.output_directory),
+            os.path.abspath(self.working_directory)
+        )
+        with _traced(self.tracer, "scan repository"):
+            self.file_index = FileIndex.build(
+                self.working_directory,
+                exclude=[] if output_relative.startswith('..') else [output_relative]
+            )
+            register_index(self.file_index)
+            repository_digest, scanned_files = build_repository_digest(self.working_directory, index=self.file_index)
+        print(t(
+            'repository_scanned',
+            files=len(scanned_files),
+            lines=sum(record.lines for record in scanned_files),
+            seconds=f"{time.perf_counter() - scan_started:.2f}"
+        ))
+        if self.use_search_index:
+            index_started = time.perf_counter()
+            with _traced(self.tracer, "refresh search index"):
+                self.file_index.search_index = TrigramIndex(
+                    os.path.join(get_state_directory(self.output_directory), SEARCH_INDEX_FILENAME),
+                    self.file_index
+                )
+                updated = self.file_index.search_index.refresh()
+            print(t(
+                'search_index_ready',
+                files=len(self.file_index),
+                updated=updated,
+                seconds=f"{time.perf_counter() - index_started:.2f}"
+            ))
+        
+        if self.use_shell_session and os.name == 'posix':
+            # Each conversation of the run gets a shell, started on its first command
+            self.shell_sessions = ShellSessions(self.run_id, self.working_directory)
+            register_sessions(self.shell_sessions)
+        
+        self.prompt = load_prompt(
+            "document_engineer",
+            working_directory=self.working_directory,
+            output_directory=self.output_directory,
+            doc_language=self.doc_language,
+            repository_digest=repository_digest
+        )
+        print(t('loading_prompt'))
+        
+        self.tools = [
+            execute_command,
+            ripgrep_search,
+            write_real_file,
+            read_real_file,
+            read_real_files,
+            list_real_directory,
+            list_real_tree,
+        ]
+        if self.tool_memo:
+            self.tools = [self.tool_memo.wrap(tool) for tool in self.tools]
+        self.tools = [self.tool_executor.wrap(tool) for tool in self.tools]
+        
+        if self.replay_path:
+            self.model = ReplayChatModel.from_transcript(self.replay_path, self.working_directory, self.output_directory)
+            print(t('replaying_transcript', path=self.replay_path))
+            return
+        
+        self.response_cache = ResponseCache(self.cache_directory) if self.use_cache else None
+        if self.response_cache:
+            print(f"{t('response_cache')}: {self.response_cache.cache_directory}")
+        
+        if self.compaction_threshold > 0:
+            self.compactor = ContextCompactor(self.compaction_threshold)
+        max_tokens = DEFAULT_MAX_TOKENS
+        if self.explore_model != self.write_model:
+            self.router = ModelRouter(self.write_model, DEFAULT_MAX_TOKENS)
+            max_tokens = EXPLORE_MAX_TOKENS
+            print(t('model_routing', explore=self.explore_model, write=self.write_model))
+        self.model = CodeViewXChatModel(
+            model_name=self.explore_model,
+            max_tokens=max_tokens,
+            cache=self.response_cache or False,
+            compactor=self.compactor,
+            limiter=self.limiter,
+            prompt_caching=self.prompt_caching,
+            router=self.router,
+            max_retries=0
+        )
+    
+    def announce_agent(self) -> None:
+        print(t('created_agent'))
+        print(t('registered_tools', count=len(self.tools), tools=', '.join([tool.name for tool in self.tools])))
+        print("=" * 80)
+        
+        print(f"\n{t('analyzing')}\n")
+        if self.parallel > 1:
+            print(t('parallel_plan', workers=self.parallel))
+    
+    def config(self, part: Optional[str], recorder: Optional[ManifestRecorder] = None) -> dict:
+        callbacks = [recorder or self.recorder, self.usage]
+        if self.tracer:
+            callbacks.append(self.tracer)
+        if self.transcript:
+            callbacks.append(self.transcript)
+        return _run_config(self.run_id, part, self.recursion_limit, callbacks, self.tool_executor.max_workers)
+    
+    def tracker(self, part: Optional[str], docs_generated: int = 0, lock: Optional[threading.Lock] = None) -> ProgressTracker:
+        """
+        Progress tracker of one conversation, printing to the console and
+        forwarding events to `on_progress`
+        """
+        display = ProgressDisplay(self.verbose, prefix=f"[{part}]" if part else "", lock=lock)
+        listeners = [display.handle]
+        if self.on_progress:
+            listeners.append(self.on_progress)
+        return ProgressTracker(self.output_directory, part, docs_generated, listeners)
+    
+    def chapter_job(self, chapter: str, analysis: str, lock: threading.Lock):
+        """
+        Set up the conversation writing one chapter in parallel mode
+        
+        Returns:
+            Tuple of (instruction, config, progress tracker, chapter recorder)
+        """
+        chapter_recorder = self.recorder.fork(
+            os.path.join(get_run_directory(self.output_directory, self.run_id), f"{chapter}.json")
+        )
+        tracker = self.tracker(chapter, len(chapter_recorder.doc_sources), lock)
+        instruction = t(
+            'agent_chapter_instruction',
+            chapter=f"{self.output_directory}/{chapter}",
+            chapters=', '.join(self.chapters),
+            analysis=analysis
+        )
+        return instruction, self.config(chapter, chapter_recorder), tracker, chapter_recorder
+    
+    def update_manifest(self) -> None:
+        """
+        Record the documents written in this run in the manifest
+        """
+        with _traced(self.tracer, "update manifest"):
+            self.manifest.restore(self.reused_snapshot)
+            self.regenerated_docs = {
+                doc: sources for doc, sources in self.recorder.doc_sources.items()
+                if doc not in self.reused_snapshot
+            }
+            self.manifest.update(self.regenerated_docs)
+            self.manifest.save()
+    
+    def report(self, trackers: List[ProgressTracker], state: dict) -> GenerationResult:
+        """
+        Print the run summary and return the result
+        """
+        step_count = sum(tracker.step_count for tracker in trackers)
+        docs_generated = sum(tracker.docs_generated for tracker in trackers)
+        
+        print("\n" + "=" * 80)
+        print(t('completed'))
+        print("=" * 80)
+        
+        if docs_generated > 0:
+            print(f"\n{t('summary')}:")
+            print(f"   {t('generated_files', count=docs_generated)}")
+            print(f"   {t('doc_location')}: {self.output_directory}/")
+            print(f"   {t('execution_steps', steps=step_count)}")
+            print(f"   {t('docs_reused_regenerated', reused=len(self.reused_snapshot), regenerated=len(self.regenerated_docs))}")
+            if self.response_cache:
+                print(f"   {t('cache_stats', hits=self.response_cache.hits, misses=self.response_cache.misses)}")
+            if self.compactor:
+                print(f"   {t('compaction_stats', compacted=self.compactor.compacted_calls, calls=self.compactor.calls, saved=self.compactor.tokens_saved)}")
+            print(f"   {t('token_usage', input=self.usage.input_tokens, output=self.usage.output_tokens)}")
+            if self.prompt_caching:
+                print(f"   {t('prompt_cache_stats', read=self.usage.cache_read_tokens, written=self.usage.cache_write_tokens)}")
+            if self.tool_memo:
+                print(f"   {t('tool_memo_stats', hits=self.tool_memo.hits, misses=self.tool_memo.misses, rate=f'{self.tool_memo.hit_rate:.0%}')}")
+            if self.router:
+                print(f"   {t('model_routing_stats', escalated=self.router.escalated, calls=self.router.calls, model=self.write_model)}")
+            if self.limiter.retries or self.limiter.throttled_seconds:
+                print(f"   {t('rate_limit_stats', retries=self.limiter.retries, seconds=f'{self.limiter.throttled_seconds:.1f}')}")
+        
+        if "files" in state:
+            print(f"\n{t('generated_file_list')}:")
+            for filename in state["files"].keys():
+                print(f"   - {filename}")
+        
+        result = self.result
+        result.run_id = self.run_id
+        result.docs_generated = docs_generated
+        result.steps = step_count
+        result.reused = sorted(self.reused_snapshot)
+        result.regenerated = sorted(self.regenerated_docs)
+        result.files = list(state.get("files", {}).keys())
+        if self.response_cache:
+            result.cache_hits = self.response_cache.hits
+            result.cache_misses = self.response_cache.misses
+        if self.compactor:
+            result.tokens_saved = self.compactor.tokens_saved
+        result.input_tokens = self.usage.input_tokens
+        result.output_tokens = self.usage.output_tokens
+        result.cache_read_tokens = self.usage.cache_read_tokens
+        result.cache_write_tokens = self.usage.cache_write_tokens
+        if self.tool_memo:
+            result.tool_memo_hits = self.tool_memo.hits
+            result.tool_memo_misses = self.tool_memo.misses
+        result.elapsed = time.perf_counter() - self.started
+        return result
+    
+    def close(self) -> None:
+        self.tool_executor.shutdown()
+        if self.shell_sessions is not None:
+            unregister_sessions(self.shell_sessions)
+            self.shell_sessions.close()
+        if self.file_index is not None:
+            unregister_index(self.file_index)
+            if self.file_index.search_index is not None:
+                self.file_index.search_index.close()
+        if self.response_cache:
+            self.response_cache.close()
+        if self.tracer:
+            self.tracer.save(self.trace_path)
+            print(t('trace_saved', path=self.trace_path))
+        if self.transcript:
+            self.transcript.save(self.record_path)
+            print(t('transcript_saved', path=self.record_path, count=len(self.transcript.responses)))
+
+
+def _generate_chapters_in_parallel(agent, run: _GenerationRun, analysis: str) -> List[ProgressTracker]:
+    """
+    Fan chapters out to a pool of concurrent agents sharing the analysis report
+    
+    Each chapter gets its own checkpointed conversation, progress tracker and
+    manifest recorder (seeded with the sources read during analysis); the
+    recorded document sources are merged back into the run's recorder.
+    
+    Returns:
+        Progress trackers of all chapter runs, in chapter order
+    """
+    lock = threading.Lock()
+    
+    def run_chapter(chapter):
+        instruction, config, tracker, chapter_recorder = run.chapter_job(chapter, analysis, lock)
+        _stream_agent(agent, instruction, config, tracker, run.tracer)
+        return tracker, chapter_recorder
+    
+    trackers = []
+    with ThreadPoolExecutor(max_workers=run.parallel) as pool:
+        for tracker, chapter_recorder in pool.map(run_chapter, run.chapters):
+            run.recorder.doc_sources.update(chapter_recorder.doc_sources)
+            trackers.append(tracker)
+    return trackers
+
+
+async def _agenerate_chapters_concurrently(agent, run: _GenerationRun, analysis: str) -> List[ProgressTracker]:
+    """
+    Async counterpart of `_generate_chapters_in_parallel`, bounded by a semaphore
+    """
+    lock = threading.Lock()
+    semaphore = asyncio.Semaphore(run.parallel)
+    
+    async def run_chapter(chapter):
+        async with semaphore:
+            instruction, config, tracker, chapter_recorder = run.chapter_job(chapter, analysis, lock)
+            await _astream_agent(agent, instruction, config, tracker, run.tracer)
+            return tracker, chapter_recorder
+    
+    trackers = []
+    for tracker, chapter_recorder in await asyncio.gather(*(run_chapter(chapter) for chapter in run.chapters)):
+        run.recorder.doc_sources.update(chapter_recorder.doc_sources)
+        trackers.append(tracker)
+    return trackers
+
+
+def _run_agents(agent, run: _GenerationRun) -> Tuple[List[ProgressTracker], dict]:
+    """
+    Drive the run's conversations: one for the whole task, or analysis then chapters
+    
+    Returns:
+        Tuple of (progress trackers, final state of the first conversation)
+    """
+    if run.parallel > 1:
+        tracker = run.tracker("analysis")
+        instruction = t('agent_analysis_instruction', chapters=', '.join(DOC_CHAPTERS))
+        state = _stream_agent(agent, instruction, run.config("analysis"), tracker, run.tracer)
+        analysis = message_text(state["messages"][-1]) if state.get("messages") else ""
+        run.plan_chapters(analysis)
+        return [tracker] + _generate_chapters_in_parallel(agent, run, analysis), state
+    
+    tracker = run.tracker(None, len(run.recorder.doc_sources))
+    state = _stream_agent(agent, run.task_instruction, run.config(None), tracker, run.tracer)
+    return [tracker], state
+
+
+async def _arun_agents(agent, run: _GenerationRun) -> Tuple[List[ProgressTracker], dict]:
+    """
+    Async counterpart of `_run_agents`
+    """
+    if run.parallel > 1:
+        tracker = run.tracker("analysis")
+        instruction = t('agent_analysis_instruction', chapters=', '.join(DOC_CHAPTERS))
+        state = await _astream_agent(agent, instruction, run.config("analysis"), tracker, run.tracer)
+        analysis = message_text(state["messages"][-1]) if state.get("messages") else ""
+        run.plan_chapters(analysis)
+        return [tracker] + await _agenerate_chapters_concurrently(agent, run, analysis), state
+    
+    tracker = run.tracker(None, len(run.recorder.doc_sources))
+    state = await _astream_agent(agent, run.task_instruction, run.config(None), tracker, run.tracer)
+    return [tracker], state
+
+
 def generate_docs(
     working_directory: Optional[str] = None,
     output_directory: str = "docs",
@@ -54,8 +809,28 @@ def generate_docs(
     ui_language: Optional[str] = None,
     recursion_limit: int = 1000,
     verbose: bool = False,
-    base_url: Optional[str] = None
-) -> None:
+    base_url: Optional[str] = None,
+    incremental: bool = True,
+    parallel: int = 1,
+    use_cache: bool = True,
+    cache_directory: Optional[str] = None,
+    resume: Optional[str] = None,
+    compaction_threshold: int = DEFAULT_COMPACTION_THRESHOLD,
+    requests_per_minute: int = 0,
+    tokens_per_minute: int = 0,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    trace_path: Optional[str] = None,
+    on_progress: Optional[ProgressListener] = None,
+    prompt_caching: bool = True,
+    explore_model: Optional[str] = None,
+    write_model: Optional[str] = None,
+    record_path: Optional[str] = None,
+    replay_path: Optional[str] = None,
+    memoize_tools: bool = True,
+    tool_concurrency: int = DEFAULT_TOOL_CONCURRENCY,
+    search_index: bool = False,
+    shell_session: bool = False
+) -> GenerationResult:
     """
     Generate project documentation using AI
     
@@ -68,6 +843,55 @@ def generate_docs(
         recursion_limit: Agent recursion limit (default: 1000)
         verbose: Show detailed logs (default: False)
         base_url: Custom Anthropic API base URL (default: None, uses https://api.anthropic.com)
+        incremental: Only regenerate documents whose source files changed since the
+                     last run, based on the manifest in the output directory (default: True)
+        parallel: Number of concurrent chapter writers. Values above 1 run a shared
+                  analysis pass first, then write each chapter with its own agent (default: 1)
+        use_cache: Serve repeated model calls from the persistent response cache (default: True)
+        cache_directory: Response cache directory (default: ~/.cache/codeviewx)
+        resume: Id of an interrupted run to continue from its last checkpoint
+                (default: None, start a new run)
+        compaction_threshold: Estimated conversation size in tokens above which old tool
+                              results are compacted in model input; 0 disables (default: 60000)
+        requests_per_minute: Model request budget shared by all runs of the process
+                             with the same limits; 0 for unlimited (default: 0)
+        tokens_per_minute: Model token budget (input plus output), shared likewise;
+                           0 for unlimited (default: 0)
+        max_concurrency: Upper bound of concurrent model calls; the actual limit adapts,
+                         halving on 429/529 responses and growing back on success (default: 16)
+        trace_path: Write a Chrome trace (JSON) of model calls, tool calls and graph steps
+                    to this file, also on failure (default: None, no trace)
+        on_progress: Callable receiving every progress event (ToolStarted, ToolFinished,
+                     DocWritten, TodosUpdated, ModelTokens, AgentMessage, see `codeviewx.events`);
+                     called from worker threads when `parallel` is above 1 (default: None)
+        prompt_caching: Mark the system prompt, tool definitions and conversation so far
+                        as cacheable by the provider, making repeated prefixes cheaper
+                        and faster to process (default: True)
+        explore_model: Fast model for exploration turns (listing, searching, reading).
+                       Each turn starts on it and is handed to `write_model` as soon
+                       as it begins writing a document (default: None, same as write_model)
+        write_model: Model authoring the documents (default: claude-sonnet-4-20250514)
+        record_path: Save every model response of the run to this transcript file,
+                     also on failure (default: None)
+        replay_path: Answer model calls from a transcript saved with `record_path`
+                     instead of the API; no network access or API key needed (default: None)
+        memoize_tools: Answer repeated file reads, directory listings and searches from
+                       a memo kept for the run while the files involved are unchanged
+                       (default: True)
+        tool_concurrency: Tool calls of one model turn run at the same time; results
+                          keep the order of the calls, and writes and commands of a
+                          conversation still run one at a time (default: 8)
+        search_index: Keep a trigram index of the repository in the output state
+                      directory, refreshed by modification time, and search only the
+                      files that can contain a pattern's literal text (default: False)
+        shell_session: Run the agent's commands in one long-lived shell per conversation
+                       (each parallel chapter writer has its own), which keeps its current
+                       directory between commands and saves starting a shell per command;
+                       POSIX only (default: False)
+    
+    Returns:
+        GenerationResult with the run id, generated and reused documents, steps,
+        cache and compaction statistics and elapsed time
     
     Examples:
         generate_docs()
@@ -82,294 +906,134 @@ def generate_docs(
         generate_docs(doc_language="Chinese", ui_language="zh", verbose=True)
         
         generate_docs(base_url="https://custom-api.example.com")
+        
+        generate_docs(parallel=4)
+        
+        generate_docs(resume="20250101-120000-1a2b3c")
+        
+        generate_docs(parallel=4, requests_per_minute=50, tokens_per_minute=40000)
+        
+        generate_docs(on_progress=JsonLinesWriter(sys.stderr))
+        
+        generate_docs(explore_model="claude-3-5-haiku-20241022")
+        
+        generate_docs(record_path="run.transcript.jsonl")
+        generate_docs(replay_path="run.transcript.jsonl", output_directory="/tmp/docs")
     """
-    if ui_language is None:
-        ui_language = detect_ui_language()
-        ui_language_source = t('auto_detected')
-    else:
-        ui_language_source = t('user_specified')
-    
-    get_i18n().set_locale(ui_language)
-    
-    log_level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M:%S'
+    if resume and not is_run_id(resume):
+        raise ValueError(t('error_run_not_found', run_id=resume))
+    run = _GenerationRun(
+        working_directory, output_directory, doc_language, ui_language, recursion_limit,
+        verbose, base_url, incremental, parallel, use_cache, cache_directory, resume,
+        compaction_threshold, requests_per_minute, tokens_per_minute, max_concurrency,
+        trace_path, on_progress, prompt_caching, explore_model, write_model,
+        record_path, replay_path, memoize_tools, tool_concurrency, search_index, shell_session
     )
+    checkpointer = open_checkpointer(output_directory)
+    try:
+        if resume and not has_run(checkpointer, resume):
+            raise ValueError(t('error_run_not_found', run_id=resume))
+        if run.up_to_date:
+            return run.report_up_to_date()
+        run.prepare()
+        agent = create_deep_agent(run.tools, run.prompt, model=run.model, checkpointer=checkpointer)
+        run.announce_agent()
+        
+        try:
+            trackers, state = _run_agents(agent, run)
+        except BaseException:
+            print(f"\n{t('resume_hint', run_id=run.run_id)}")
+            raise
+        
+        run.update_manifest()
+        discard_run(checkpointer, output_directory, run.run_id)
+        return run.report(trackers, state)
+    finally:
+        checkpointer.conn.close()
+        run.close()
+
+
+async def agenerate_docs(
+    working_directory: Optional[str] = None,
+    output_directory: str = "docs",
+    doc_language: Optional[str] = None,
+    ui_language: Optional[str] = None,
+    recursion_limit: int = 1000,
+    verbose: bool = False,
+    base_url: Optional[str] = None,
+    incremental: bool = True,
+    parallel: int = 1,
+    use_cache: bool = True,
+    cache_directory: Optional[str] = None,
+    resume: Optional[str] = None,
+    compaction_threshold: int = DEFAULT_COMPACTION_THRESHOLD,
+    requests_per_minute: int = 0,
+    tokens_per_minute: int = 0,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    trace_path: Optional[str] = None,
+    on_progress: Optional[ProgressListener] = None,
+    prompt_caching: bool = True,
+    explore_model: Optional[str] = None,
+    write_model: Optional[str] = None,
+    record_path: Optional[str] = None,
+    replay_path: Optional[str] = None,
+    memoize_tools: bool = True,
+    tool_concurrency: int = DEFAULT_TOOL_CONCURRENCY,
+    search_index: bool = False,
+    shell_session: bool = False
+) -> GenerationResult:
+    """
+    Generate project documentation using AI, without blocking the event loop
     
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("httpcore").setLevel(logging.WARNING)
-    
-    if verbose:
-        logging.getLogger("langchain").setLevel(logging.DEBUG)
-        logging.getLogger("langgraph").setLevel(logging.DEBUG)
+    Async counterpart of `generate_docs` taking the same arguments. The agent
+    is driven with `astream` and checkpointed with an async SQLite saver; the
+    filesystem and ripgrep tools, which have no native coroutine, are run by
+    LangChain in the default executor, as are the repository scan and the
+    manifest bookkeeping (context variables are carried over to the
+    executor). Many generations can thus share one event loop. With
+    `parallel` above 1, chapters are written by concurrent tasks instead
+    of threads.
     
-    if working_directory is None:
-        working_directory = os.getcwd()
-
-    # Set custom base URL if provided
-    if base_url:
-        os.environ['ANTHROPIC_BASE_URL'] = base_url
+    Returns:
+        GenerationResult, as returned by `generate_docs`
     
-    # Get current base URL (from parameter or environment variable)
-    current_base_url = os.getenv('ANTHROPIC_BASE_URL')
-
-    # Validate API key before proceeding
-    try:
-        validate_api_key()
-    except ValueError as api_error:
-        print(f"\n{api_error}")
-        print("\n" + "=" * 80)
-        print(t('api_help_header', default="🔗 Need help?"))
-        print("=" * 80)
-        print(t('api_help_get_key', default="• Get your API key: https://console.anthropic.com"))
-        print(t('api_help_docs', default="• View documentation: https://docs.anthropic.com"))
-        print("=" * 80)
-        raise ValueError(f"API key validation failed: {api_error}")
-
-    if doc_language is None:
-        doc_language = detect_system_language()
-        doc_language_source = t('auto_detected')
-    else:
-        doc_language_source = t('user_specified')
-    
-    print("=" * 80)
-    print(f"{t('starting')} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 80)
-    print(f"{t('working_dir')}: {working_directory}")
-    print(f"{t('output_dir')}: {output_directory}")
-    print(f"{t('doc_language')}: {doc_language} ({doc_language_source})")
-    print(f"{t('ui_language')}: {ui_language} ({ui_language_source})")
-    if current_base_url:
-        print(f"{t('api_base_url')}: {current_base_url}")
-    
-    prompt = load_prompt(
-        "document_engineer",
-        working_directory=working_directory,
-        output_directory=output_directory,
-        doc_language=doc_language
+    Examples:
+        result = asyncio.run(agenerate_docs(working_directory="/path/to/project"))
+        
+        results = await asyncio.gather(
+            agenerate_docs(working_directory="/repos/a", output_directory="/docs/a"),
+            agenerate_docs(working_directory="/repos/b", output_directory="/docs/b"),
+        )
+    """
+    if resume and not is_run_id(resume):
+        raise ValueError(t('error_run_not_found', run_id=resume))
+    run = await run_in_executor(
+        None, _GenerationRun,
+        working_directory, output_directory, doc_language, ui_language, recursion_limit,
+        verbose, base_url, incremental, parallel, use_cache, cache_directory, resume,
+        compaction_threshold, requests_per_minute, tokens_per_minute, max_concurrency,
+        trace_path, on_progress, prompt_caching, explore_model, write_model,
+        record_path, replay_path, memoize_tools, tool_concurrency, search_index, shell_session
     )
-    print(t('loading_prompt'))
-    
-    tools = [
-        execute_command,
-        ripgrep_search,
-        write_real_file,
-        read_real_file,
-        list_real_directory,
-    ]
-    
-    agent = create_deep_agent(tools, prompt)
-    print(t('created_agent'))
-    print(t('registered_tools', count=len(tools), tools=', '.join([tool.name for tool in tools])))
-    print("=" * 80)
-    
-    print(f"\n{t('analyzing')}\n")
-    
-    step_count = 0
-    docs_generated = 0
-    analysis_phase = True
-    last_todos_count = 0
-    todos_shown = False
-    
-    for chunk in agent.stream(
-        {"messages": [{"role": "user", "content": t('agent_task_instruction')}]},
-        stream_mode="values",
-        config={"recursion_limit": recursion_limit}
-    ):
-        if "messages" in chunk:
-            step_count += 1
-            last_message = chunk["messages"][-1]
-            
-            if not verbose:
-                message_type = last_message.__class__.__name__
-                
-                if message_type == 'AIMessage' and hasattr(last_message, 'content'):
-                    content = str(last_message.content).strip()
-                    has_tool_calls = hasattr(last_message, 'tool_calls') and last_message.tool_calls
-                    if content and len(content) > 20 and not has_tool_calls:
-                        summary = content[:200].replace('\n', ' ').strip()
-                        if len(content) > 200:
-                            summary += "..."
-                        print(f"\n💭 AI: {summary}")
-                
-                if message_type == 'ToolMessage' and step_count <= 25:
-                    tool_name = getattr(last_message, 'name', 'unknown')
-                    content = str(getattr(last_message, 'content', '')).strip()
-                    
-                    if tool_name == 'write_todos':
-                        pass
-                    elif tool_name == 'write_real_file':
-                        pass
-                    else:
-                        result_info = ""
-                        
-                        if tool_name == 'read_real_file':
-                            lines_count = content.count('\n') + 1 if content else 0
-                            preview_lines = content.split('\n')[:2] if content else []
-                            preview = ' '.join(preview_lines)[:60].replace('\n', ' ').strip()
-                            if len(preview) > 60 or lines_count > 2:
-                                preview += "..."
-                            result_info = f"✓ {lines_count} lines | {preview}" if preview else f"✓ {lines_count} lines"
-                        
-                        elif tool_name == 'list_real_directory':
-                            items = [x.strip() for x in content.split('\n') if x.strip()] if content else []
-                            items_count = len(items)
-                            preview = ', '.join(items[:3])
-                            if len(items) > 3:
-                                preview += f" ... (+{len(items)-3})"
-                            result_info = f"✓ {items_count} items | {preview}" if preview else f"✓ {items_count} items"
-                        
-                        elif tool_name == 'ripgrep_search':
-                            if content:
-                                lines = [x.strip() for x in content.split('\n') if x.strip()]
-                                matches_count = len(lines)
-                                first_match = lines[0][:50] if lines else ""
-                                if len(lines[0]) > 50 if lines else False:
-                                    first_match += "..."
-                                result_info = f"✓ {matches_count} matches | {first_match}" if first_match else f"✓ {matches_count} matches"
-                            else:
-                                result_info = "✓ No matches"
-                        
-                        elif tool_name == 'execute_command':
-                            if content:
-                                preview = content[:60].replace('\n', ' ').strip()
-                                if len(content) > 60:
-                                    preview += "..."
-                                result_info = f"✓ {preview}"
-                            else:
-                                result_info = "✓ Done"
-                        
-                        else:
-                            if content:
-                                preview = content[:60].replace('\n', ' ').strip()
-                                if len(content) > 60:
-                                    preview += "..."
-                                result_info = f"✓ {preview}"
-                            else:
-                                result_info = "✓ Done"
-                        
-                        tool_display = {
-                            'read_real_file': t('reading'),
-                            'list_real_directory': t('listing'),
-                            'ripgrep_search': t('searching'),
-                            'execute_command': t('executing'),
-                        }
-                        display_name = tool_display.get(tool_name, f'🔧 {tool_name}')
-                        print(f"   {display_name}: {result_info}")
-            
-            if hasattr(last_message, 'tool_calls') and last_message.tool_calls and not verbose:
-                tool_names = []
-                doc_file = None
-                todos_info = None
-                
-                for tool_call in last_message.tool_calls:
-                    if isinstance(tool_call, dict):
-                        tool_name = tool_call.get('name', 'unknown')
-                        args = tool_call.get('args', {})
-                    else:
-                        tool_name = getattr(tool_call, 'name', tool_call.get('name', 'unknown'))
-                        args = getattr(tool_call, 'args', tool_call.get('args', {}))
-                    
-                    tool_names.append(tool_name)
-                    
-                    if tool_name == 'write_todos':
-                        try:
-                            if isinstance(args, dict):
-                                todos = args.get('todos', [])
-                            else:
-                                todos = getattr(args, 'todos', [])
-                            
-                            if todos:
-                                completed_count = sum(1 for t in todos if isinstance(t, dict) and t.get('status') == 'completed')
-                                total_count = len(todos)
-                                
-                                should_show = False
-                                
-                                if not todos_shown and total_count > 0:
-                                    should_show = True
-                                elif completed_count >= last_todos_count + 2:
-                                    should_show = True
-                                elif completed_count == total_count and total_count > 0 and completed_count > last_todos_count:
-                                    should_show = True
-                                
-                                if should_show:
-                                    todos_shown = True
-                                    
-                                if completed_count > last_todos_count:
-                                    last_todos_count = completed_count
-                                
-                                if should_show:
-                                    todo_summaries = []
-                                    for todo in todos:
-                                        if isinstance(todo, dict):
-                                            content = todo.get('content', '')
-                                            status = todo.get('status', 'pending')
-                                            if content:
-                                                status_icon = {
-                                                    'pending': '⏳',
-                                                    'in_progress': '🔄',
-                                                    'completed': '✅',
-                                                    'cancelled': '❌'
-                                                }.get(status, '○')
-                                                todo_summaries.append(f"{status_icon} {content}")
-                                    
-                                    if todo_summaries:
-                                        todos_info = todo_summaries
-                        except Exception as e:
-                            pass
-                    
-                    elif tool_name == 'write_real_file':
-                        try:
-                            if isinstance(args, dict):
-                                file_path = args.get('file_path', '')
-                            else:
-                                file_path = getattr(args, 'file_path', '')
-                            
-                            if file_path and output_directory in file_path:
-                                doc_file = file_path.split('/')[-1]
-                        except Exception as e:
-                            if verbose:
-                                print(t('verbose_progress_error', error=str(e)))
-                
-                if tool_names:
-                    if todos_info:
-                        print(f"\n{t('task_planning')}:")
-                        for todo_summary in todos_info:
-                            print(f"   {todo_summary}")
-                        print()
-                    elif doc_file:
-                        docs_generated += 1
-                        print(t('generating_doc', current=docs_generated, filename=doc_file))
-                        analysis_phase = False
-                    elif analysis_phase and any(t in ['list_real_directory', 'ripgrep_search'] for t in tool_names):
-                        print(t('analyzing_structure'))
-                        analysis_phase = False
-            
-            if verbose:
-                print(f"\n{'='*80}")
-                print(t('verbose_step', step=step_count, message_type=last_message.__class__.__name__))
-                print(f"{'='*80}")
-                last_message.pretty_print()
-                
-                if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-                    print(f"\n{t('verbose_tools_called', count=len(last_message.tool_calls))}")
-                    for tool_call in last_message.tool_calls:
-                        print(f"   - {tool_call.get('name', 'unknown')}")
-    
-    print("\n" + "=" * 80)
-    print(t('completed'))
-    print("=" * 80)
-    
-    if docs_generated > 0:
-        print(f"\n{t('summary')}:")
-        print(f"   {t('generated_files', count=docs_generated)}")
-        print(f"   {t('doc_location')}: {output_directory}/")
-        print(f"   {t('execution_steps', steps=step_count)}")
-    
-    if "files" in chunk:
-        print(f"\n{t('generated_file_list')}:")
-        for filename in chunk["files"].keys():
-            print(f"   - {filename}")
-
+    checkpointer = await aopen_checkpointer(output_directory)
+    try:
+        if resume and not await ahas_run(checkpointer, resume):
+            raise ValueError(t('error_run_not_found', run_id=resume))
+        if run.up_to_date:
+            return run.report_up_to_date()
+        await run_in_executor(None, run.prepare)
+        agent = async_create_deep_agent(run.tools, run.prompt, model=run.model, checkpointer=checkpointer)
+        run.announce_agent()
+        
+        try:
+            trackers, state = await _arun_agents(agent, run)
+        except BaseException:
+            print(f"\n{t('resume_hint', run_id=run.run_id)}")
+            raise
+        
+        await run_in_executor(None, run.update_manifest)
+        await adiscard_run(checkpointer, output_directory, run.run_id)
+        return run.report(trackers, state)
+    finally:
+        await checkpointer.conn.close()
+        run.close()
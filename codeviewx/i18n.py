@@ -16,9 +16,16 @@ MESSAGES: Dict[str, Dict[str, str]] = {
         'doc_language': '🌍 Document Language',
         'ui_language': '💬 UI Language',
         'api_base_url': '🔗 API Base URL',
+        'response_cache': '🗄️  Response Cache',
+        'run_id': '🔖 Run ID',
+        'resuming_run': '⏯️  Resuming run {run_id} (documents already written: {docs})',
+        'resume_hint': '⏯️  Run interrupted. Continue it with: codeviewx --resume {run_id}',
         'auto_detected': 'Auto-detected',
         'user_specified': 'User-specified',
-        'loading_prompt': '✓ Loaded system prompt (injected working directory, output directory, and document language)',
+        'loading_prompt': '✓ Loaded system prompt (injected working directory, output directory, document language, and repository digest)',
+        'model_routing': '✓ Model routing: exploration on {explore}, writing on {write}',
+        'repository_scanned': '✓ Pre-scanned repository: {files} files, {lines} lines of code ({seconds}s)',
+        'search_index_ready': '✓ Search index: {files} files, {updated} re-indexed ({seconds}s)',
         'created_agent': '✓ Created AI Agent',
         'registered_tools': '✓ Registered {count} custom tools: {tools}',
         'analyzing': '📝 Analyzing project and generating documentation...',
@@ -36,14 +43,51 @@ MESSAGES: Dict[str, Dict[str, str]] = {
         'doc_location': '✓ Document location',
         'execution_steps': '✓ Execution steps: {steps} steps',
         'generated_file_list': '📄 Generated files',
+        'docs_up_to_date': '✅ All {count} documents are up to date, nothing to regenerate',
+        'docs_reused_regenerated': '✓ Documents reused: {reused}, regenerated: {regenerated}',
+        'cache_stats': '✓ Response cache: {hits} hits, {misses} misses',
+        'compaction_stats': '✓ Context compaction: {compacted}/{calls} model calls compacted, ~{saved} input tokens saved',
+        'token_usage': '✓ API tokens: {input} input, {output} output',
+        'prompt_cache_stats': '✓ Prompt cache: {read} input tokens read, {written} written',
+        'model_routing_stats': '✓ Model routing: {escalated}/{calls} model calls handed to {model}',
+        'tool_memo_stats': '✓ Tool memo: {hits} hits, {misses} misses ({rate} hit rate)',
+        'trace_saved': '🕒 Trace written to {path} (open it in https://ui.perfetto.dev or chrome://tracing)',
+        'transcript_saved': '🎞️  Transcript of {count} model responses written to {path}',
+        'replaying_transcript': '🎞️  Replaying model responses from {path} (no API calls)',
+        'benchmark_transcript': '⏱️  Benchmark of {path}: {runs} replayed runs',
+        'benchmark_run': '  Run {index}: {steps} steps, {docs} documents in {seconds}s ({rate} steps/s)',
+        'benchmark_steps_per_second': '✓ Median throughput: {rate} steps/s',
+        'benchmark_peak_memory': '✓ Peak memory (RSS): {mb} MiB',
+        'benchmark_column_tool': 'Tool',
+        'benchmark_column_calls': 'Calls',
+        'rate_limit_stats': '✓ Rate limiting: {retries} retries after rate-limit or transient errors, {seconds}s spent waiting',
+        'batch_plan': '📦 Batch: {count} repositories, {workers} concurrent runs',
+        'batch_started': '▶ [{index}/{count}] {repository} (log: {log})',
+        'batch_finished': '✓ [{index}/{count}] {repository}: {status} in {seconds}s',
+        'batch_failed': '❌ [{index}/{count}] {repository}: {error}',
+        'batch_summary': '📊 Batch summary: {succeeded} succeeded, {failed} failed, {seconds}s total',
+        'batch_column_repository': 'Repository',
+        'batch_column_status': 'Status',
+        'batch_column_docs': 'Docs',
+        'batch_column_steps': 'Steps',
+        'batch_column_input_tokens': 'Input tokens',
+        'batch_column_output_tokens': 'Output tokens',
+        'batch_column_time': 'Time (s)',
+        'batch_status_generated': 'generated',
+        'batch_status_up_to_date': 'up to date',
+        'batch_status_failed': 'failed',
+        'incremental_plan': '♻️  Incremental run: regenerating {stale}; reusing {reused} unchanged documents',
+        'parallel_plan': '⚡ Parallel mode: shared analysis first, then chapters with {workers} concurrent writers',
+        'parallel_chapters': '📑 Chapters to write ({count}): {chapters}',
         
         # Verbose mode messages
-        'verbose_progress_error': '⚠️  Progress detection error: {error}',
         'verbose_step': '📍 Step {step} - {message_type}',
-        'verbose_tools_called': '🔧 Called {count} tools:',
         
         # Agent prompt message
         'agent_task_instruction': 'Please analyze the project in the working directory specified in the system prompt and generate comprehensive technical documentation',
+        'agent_analysis_instruction': 'Please analyze the project in the working directory specified in the system prompt, but do not write any documentation files yet. Finish with a detailed analysis report (tech stack, directory structure, entry points, core modules, key flows and important file paths); it will be handed to separate writers who each produce one chapter. End the report with one line listing the chapter file names that suit this project, in order, e.g. "Chapters: {chapters}"',
+        'agent_chapter_instruction': 'Write only the document {chapter}; other writers produce the remaining chapters of the documentation set ({chapters}) concurrently. Do not write any other document. Read further source files as needed. If this chapter does not apply to the project, do not write it and briefly say so. Shared analysis of the project:\n\n{analysis}',
+        'agent_incremental_instruction': 'This is an incremental update. Only regenerate these documents, whose source files changed: {stale}. These documents are up to date and must not be rewritten: {reused}',
         
         # CLI messages
         'cli_description': 'CodeViewX - AI-Driven Code Documentation Generator',
@@ -56,6 +100,10 @@ MESSAGES: Dict[str, Dict[str, str]] = {
   codeviewx -w . -o docs --verbose    # Full config + detailed logs
   codeviewx --serve                   # Start documentation web server (default docs directory)
   codeviewx --serve -o docs           # Start server with specified directory
+  codeviewx batch repos.txt --workers 8  # Document every repository listed in repos.txt
+  codeviewx --progress json > events.jsonl  # Machine-readable progress events
+  codeviewx --record run.jsonl        # Save the model responses for offline replay
+  codeviewx benchmark run.jsonl       # Measure the generator's own overhead by replaying them
   
 Supported languages:
   Chinese, English, Japanese, Korean, French, German, Spanish, Russian
@@ -71,6 +119,36 @@ Environment variables:
         'cli_verbose_help': 'Show detailed debug logs',
         'cli_base_url_help': 'Custom Anthropic API base URL (default: https://api.anthropic.com)',
         'cli_serve_help': 'Start web server to browse documentation',
+        'cli_no_incremental_help': 'Regenerate all documents, ignoring the incremental manifest',
+        'cli_parallel_help': 'Number of chapters generated concurrently after a shared analysis pass (default: 1, sequential)',
+        'cli_cache_dir_help': 'Model response cache directory (default: ~/.cache/codeviewx)',
+        'cli_no_cache_help': 'Disable the model response cache',
+        'cli_no_prompt_cache_help': 'Do not mark the system prompt, tools and conversation for provider-side prompt caching',
+        'cli_no_tool_memo_help': 'Run every file read, listing and search again instead of reusing unchanged results within the run',
+        'cli_tool_concurrency_help': 'Tool calls of one model turn run at the same time; writes and commands still run one at a time (default: 8)',
+        'cli_search_index_help': 'Keep a trigram index of the repository between runs and search only the files that can match (for large repositories)',
+        'cli_shell_session_help': 'Run the agent\'s commands in one long-lived shell per conversation, keeping the current directory between commands (POSIX only)',
+        'cli_explore_model_help': 'Fast model for exploration turns (listing, searching, reading); turns that write a document switch to the write model (default: same as --write-model)',
+        'cli_write_model_help': 'Model that writes the documents (default: claude-sonnet-4-20250514)',
+        'cli_resume_help': 'Resume an interrupted run from its last checkpoint (run id is printed at start)',
+        'cli_compact_threshold_help': 'Estimated conversation tokens above which old tool results are compacted (default: {default}, 0 disables)',
+        'cli_trace_help': 'Write a Chrome trace (JSON) of model calls, tool calls and steps to FILE',
+        'cli_progress_help': 'Progress output: text (default) or json, one JSON event per line on stdout with all other output moved to stderr',
+        'cli_record_help': 'Save every model response of the run to the transcript FILE (JSON lines) for replaying',
+        'cli_replay_help': 'Answer model calls from a transcript FILE saved with --record instead of the API',
+        'cli_max_rpm_help': 'Maximum model requests per minute across all concurrent runs (default: 0, unlimited)',
+        'cli_max_tpm_help': 'Maximum model tokens (input plus output) per minute across all concurrent runs (default: 0, unlimited)',
+        'cli_max_concurrency_help': 'Upper bound of concurrent model calls; halved on 429/529 responses and grown back on success (default: 16)',
+        'cli_batch_description': 'Generate documentation for many repositories with a bounded number of concurrent runs',
+        'cli_batch_file_help': 'Text file listing one repository path per line (blank lines and # comments are ignored)',
+        'cli_batch_workers_help': 'Number of repositories documented concurrently (default: 4)',
+        'cli_batch_output_dir_help': 'Documentation output directory inside each repository (default: docs)',
+        'cli_batch_output_root_help': 'Write each repository\'s documentation to <DIR>/<repository name> instead of inside the repository',
+        'cli_benchmark_description': 'Replay a transcript saved with --record and report steps per second, tool latency and peak memory, without API calls',
+        'cli_benchmark_transcript_help': 'Transcript file saved with --record',
+        'cli_benchmark_working_dir_help': 'Project to replay against (default: the recorded project directory)',
+        'cli_benchmark_runs_help': 'Number of replayed runs (default: 3)',
+        'cli_benchmark_json_help': 'Print the report as JSON',
         'cli_missing_docs': 'Error: Documentation directory "{path}" does not exist',
         'cli_serve_hint': 'Please generate documentation first using: codeviewx -w /path/to/project',
         'cli_starting_server': '🌐 Starting documentation web server...',
@@ -81,6 +159,12 @@ Environment variables:
         'error_file_not_found': 'Error: Prompt file not found: {filename}',
         'error_template_variable': 'Error: Template requires variable {variable} but not provided in parameters',
         'error_directory_not_exist': 'Error: Directory does not exist: {path}',
+        'error_run_not_found': 'Error: No checkpoint found for run {run_id} in this output directory',
+        'error_batch_empty': 'Error: No repositories listed in {path}',
+        'error_invalid_transcript': 'Error: {path} is not a CodeViewX transcript',
+        'error_replay_exhausted': 'Error: The transcript has no more responses for conversation "{part}" (recorded: {count}); the replayed run diverged from the recorded one',
+        'error_rate_limited': 'The API kept rejecting requests with rate-limit or overload errors after several retries.',
+        'error_rate_limited_hint': 'Lower --parallel / --workers or set --max-rpm / --max-tpm to your account limits, then continue with --resume.',
 
         # API key and authentication errors
         'error_api_key_missing': 'ANTHROPIC_AUTH_TOKEN environment variable not found',
@@ -130,9 +214,16 @@ Environment variables:
         'doc_language': '🌍 文档语言',
         'ui_language': '💬 界面语言',
         'api_base_url': '🔗 API 基础 URL',
+        'response_cache': '🗄️  响应缓存',
+        'run_id': '🔖 运行 ID',
+        'resuming_run': '⏯️  继续运行 {run_id}（已写入的文档: {docs}）',
+        'resume_hint': '⏯️  运行已中断。可使用以下命令继续: codeviewx --resume {run_id}',
         'auto_detected': '自动检测',
         'user_specified': '用户指定',
-        'loading_prompt': '✓ 已加载系统提示词（已注入工作目录、输出目录和文档语言）',
+        'loading_prompt': '✓ 已加载系统提示词（已注入工作目录、输出目录、文档语言和仓库摘要）',
+        'model_routing': '✓ 模型路由: 探索使用 {explore}，撰写使用 {write}',
+        'repository_scanned': '✓ 已预扫描仓库: {files} 个文件，{lines} 行代码（{seconds} 秒）',
+        'search_index_ready': '✓ 搜索索引: {files} 个文件，重新索引 {updated} 个（{seconds} 秒）',
         'created_agent': '✓ 已创建 AI Agent',
         'registered_tools': '✓ 已注册 {count} 个自定义工具: {tools}',
         'analyzing': '📝 开始分析项目并生成文档...',
@@ -150,14 +241,51 @@ Environment variables:
         'doc_location': '✓ 文档位置',
         'execution_steps': '✓ 执行步骤: {steps} 步',
         'generated_file_list': '📄 生成的文件',
+        'docs_up_to_date': '✅ 全部 {count} 个文档均为最新，无需重新生成',
+        'docs_reused_regenerated': '✓ 复用文档: {reused} 个，重新生成: {regenerated} 个',
+        'cache_stats': '✓ 响应缓存: 命中 {hits} 次，未命中 {misses} 次',
+        'compaction_stats': '✓ 上下文压缩: {calls} 次模型调用中压缩 {compacted} 次，节省约 {saved} 个输入 token',
+        'token_usage': '✓ API token: 输入 {input}，输出 {output}',
+        'prompt_cache_stats': '✓ 提示缓存: 读取 {read} 个输入 token，写入 {written} 个',
+        'model_routing_stats': '✓ 模型路由: {escalated}/{calls} 次模型调用交由 {model} 完成',
+        'tool_memo_stats': '✓ 工具结果复用: 命中 {hits} 次，未命中 {misses} 次（命中率 {rate}）',
+        'trace_saved': '🕒 追踪已写入 {path}（可在 https://ui.perfetto.dev 或 chrome://tracing 中打开）',
+        'transcript_saved': '🎞️  {count} 条模型响应的记录已写入 {path}',
+        'replaying_transcript': '🎞️  从 {path} 回放模型响应（不调用 API）',
+        'benchmark_transcript': '⏱️  {path} 的基准测试: 回放 {runs} 次',
+        'benchmark_run': '  第 {index} 次: {steps} 步，{docs} 个文档，耗时 {seconds} 秒（{rate} 步/秒）',
+        'benchmark_steps_per_second': '✓ 吞吐量中位数: {rate} 步/秒',
+        'benchmark_peak_memory': '✓ 内存峰值（RSS）: {mb} MiB',
+        'benchmark_column_tool': '工具',
+        'benchmark_column_calls': '调用次数',
+        'rate_limit_stats': '✓ 限流: 因限流或临时错误重试 {retries} 次，累计等待 {seconds} 秒',
+        'batch_plan': '📦 批量模式: 共 {count} 个仓库，{workers} 个并发运行',
+        'batch_started': '▶ [{index}/{count}] {repository}（日志: {log}）',
+        'batch_finished': '✓ [{index}/{count}] {repository}: {status}，耗时 {seconds} 秒',
+        'batch_failed': '❌ [{index}/{count}] {repository}: {error}',
+        'batch_summary': '📊 批量总结: 成功 {succeeded} 个，失败 {failed} 个，总耗时 {seconds} 秒',
+        'batch_column_repository': '仓库',
+        'batch_column_status': '状态',
+        'batch_column_docs': '文档',
+        'batch_column_steps': '步骤',
+        'batch_column_input_tokens': '输入 token',
+        'batch_column_output_tokens': '输出 token',
+        'batch_column_time': '耗时（秒）',
+        'batch_status_generated': '已生成',
+        'batch_status_up_to_date': '已是最新',
+        'batch_status_failed': '失败',
+        'incremental_plan': '♻️  增量生成: 重新生成 {stale}；复用 {reused} 个未变更文档',
+        'parallel_plan': '⚡ 并行模式: 先进行共享分析，再由 {workers} 个并发写作者生成各章节',
+        'parallel_chapters': '📑 待编写章节 ({count}): {chapters}',
         
         # Verbose mode messages
-        'verbose_progress_error': '⚠️  进度检测异常: {error}',
         'verbose_step': '📍 步骤 {step} - {message_type}',
-        'verbose_tools_called': '🔧 调用了 {count} 个工具:',
         
         # Agent prompt message
         'agent_task_instruction': '请根据系统提示词中的工作目录，分析该项目并生成深度技术文档',
+        'agent_analysis_instruction': '请根据系统提示词中的工作目录分析该项目，但暂时不要写入任何文档文件。最后输出一份详细的分析报告（技术栈、目录结构、入口点、核心模块、关键流程和重要文件路径），该报告将交给分别负责各章节的写作者。报告最后一行按顺序列出适合本项目的章节文件名，例如 "Chapters: {chapters}"',
+        'agent_chapter_instruction': '只编写文档 {chapter}；文档集中的其余章节（{chapters}）由其他写作者同时编写。不要写入任何其他文档。可按需继续读取源文件。如果该章节不适用于本项目，请不要写入并简要说明。项目的共享分析:\n\n{analysis}',
+        'agent_incremental_instruction': '这是一次增量更新。只需重新生成以下源文件已变更的文档: {stale}。以下文档已是最新，不要重写: {reused}',
         
         # CLI messages
         'cli_description': 'CodeViewX - AI 驱动的代码文档生成器',
@@ -170,6 +298,10 @@ Environment variables:
   codeviewx -w . -o docs --verbose    # 完整配置 + 详细日志
   codeviewx --serve                   # 启动文档 Web 服务器（默认 docs 目录）
   codeviewx --serve -o docs           # 启动服务器并指定文档目录
+  codeviewx batch repos.txt --workers 8  # 为 repos.txt 中列出的每个仓库生成文档
+  codeviewx --progress json > events.jsonl  # 输出机器可读的进度事件
+  codeviewx --record run.jsonl        # 保存模型响应，供离线回放
+  codeviewx benchmark run.jsonl       # 回放模型响应，测量生成器自身的开销
   
 支持的语言:
   Chinese, English, Japanese, Korean, French, German, Spanish, Russian
@@ -185,6 +317,36 @@ Environment variables:
         'cli_verbose_help': '显示详细的调试日志',
         'cli_base_url_help': '自定义 Anthropic API 基础 URL（默认: https://api.anthropic.com）',
         'cli_serve_help': '启动 Web 服务器浏览文档',
+        'cli_no_incremental_help': '忽略增量清单，重新生成全部文档',
+        'cli_parallel_help': '共享分析完成后并发生成的章节数（默认：1，顺序生成）',
+        'cli_cache_dir_help': '模型响应缓存目录（默认：~/.cache/codeviewx）',
+        'cli_no_cache_help': '禁用模型响应缓存',
+        'cli_no_prompt_cache_help': '不为系统提示、工具定义和对话设置服务端提示缓存',
+        'cli_no_tool_memo_help': '每次都重新执行文件读取、目录列举和搜索，不在运行内复用未变化的结果',
+        'cli_tool_concurrency_help': '同一模型轮次中同时执行的工具调用数；写文件和命令仍逐个执行（默认：8）',
+        'cli_search_index_help': '在多次运行之间保留仓库的三元组索引，搜索时只扫描可能匹配的文件（适用于大型仓库）',
+        'cli_shell_session_help': '每个对话使用一个长期存在的 shell 执行智能体的命令，并在命令之间保留当前目录（仅限 POSIX）',
+        'cli_explore_model_help': '用于探索轮次（列目录、搜索、读文件）的快速模型；需要写文档的轮次会切换到撰写模型（默认：与 --write-model 相同）',
+        'cli_write_model_help': '撰写文档的模型（默认：claude-sonnet-4-20250514）',
+        'cli_resume_help': '从最近的检查点继续一次中断的运行（运行 ID 会在开始时打印）',
+        'cli_compact_threshold_help': '对话估算 token 数超过该值时压缩旧的工具结果（默认：{default}，0 表示禁用）',
+        'cli_trace_help': '将模型调用、工具调用和步骤的 Chrome 追踪（JSON）写入 FILE',
+        'cli_progress_help': '进度输出格式：text（默认）或 json，json 模式下每行向 stdout 输出一个 JSON 事件，其余输出改写到 stderr',
+        'cli_record_help': '将本次运行的所有模型响应保存到记录文件 FILE（JSON lines），以便回放',
+        'cli_replay_help': '使用 --record 保存的记录文件 FILE 回答模型调用，而不是调用 API',
+        'cli_max_rpm_help': '所有并发运行合计的每分钟最大模型请求数（默认：0，不限制）',
+        'cli_max_tpm_help': '所有并发运行合计的每分钟最大模型 token 数（输入加输出，默认：0，不限制）',
+        'cli_max_concurrency_help': '并发模型调用数上限；遇到 429/529 响应时减半，成功后逐步恢复（默认：16）',
+        'cli_batch_description': '以有限的并发数为多个仓库批量生成文档',
+        'cli_batch_file_help': '每行一个仓库路径的文本文件（忽略空行和 # 注释）',
+        'cli_batch_workers_help': '同时生成文档的仓库数（默认：4）',
+        'cli_batch_output_dir_help': '各仓库内的文档输出目录（默认：docs）',
+        'cli_batch_output_root_help': '将各仓库的文档写入 <DIR>/<仓库名>，而不是仓库内部',
+        'cli_benchmark_description': '回放 --record 保存的记录，报告每秒步数、工具延迟和内存峰值，不调用 API',
+        'cli_benchmark_transcript_help': '使用 --record 保存的记录文件',
+        'cli_benchmark_working_dir_help': '回放所针对的项目（默认：记录中的项目目录）',
+        'cli_benchmark_runs_help': '回放次数（默认：3）',
+        'cli_benchmark_json_help': '以 JSON 格式输出报告',
         'cli_missing_docs': '错误: 文档目录 "{path}" 不存在',
         'cli_serve_hint': '请先使用以下命令生成文档: codeviewx -w /path/to/project',
         'cli_starting_server': '🌐 启动文档 Web 服务器...',
@@ -195,6 +357,12 @@ Environment variables:
         'error_file_not_found': '错误: 找不到提示词文件: {filename}',
         'error_template_variable': '错误: 模板需要变量 {variable}，但未在参数中提供',
         'error_directory_not_exist': '错误: 目录不存在: {path}',
+        'error_run_not_found': '错误: 在该输出目录中找不到运行 {run_id} 的检查点',
+        'error_batch_empty': '错误: {path} 中没有列出任何仓库',
+        'error_invalid_transcript': '错误: {path} 不是 CodeViewX 记录文件',
+        'error_replay_exhausted': '错误: 记录中对话 "{part}" 的响应已用完（共 {count} 条）；回放的运行与记录的运行不一致',
+        'error_rate_limited': 'API 多次重试后仍以限流或过载错误拒绝请求。',
+        'error_rate_limited_hint': '请降低 --parallel / --workers，或将 --max-rpm / --max-tpm 设置为账户限额，然后使用 --resume 继续。',
 
         # API key and authentication errors
         'error_api_key_missing': '找不到环境变量 ANTHROPIC_AUTH_TOKEN',
@@ -0,0 +1,465 @@
+"""
+Incremental generation manifest module
+
+Maps every generated document to the source files and directory listings
+the agent read while writing it, so later runs only regenerate documents
+whose inputs changed.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .tools.fileindex import FileIndex
+
+
+STATE_DIRNAME = ".codeviewx"
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Suffixes marking a dependency on a directory listing rather than on a file
+LISTING_SUFFIX = "/"
+TREE_SUFFIX = "/**"
+
+
+def _write_json(path: str, data: Any, **dump_options: Any) -> None:
+    """
+    Replace a JSON file atomically, through a temporary file unique to this write
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def get_state_directory(output_directory: str) -> str:
+    """
+    Get the hidden per-output state directory used for run artifacts
+
+    Args:
+        output_directory: Documentation output directory
+
+    Returns:
+        Absolute path of the state directory
+    """
+    return os.path.join(os.path.abspath(output_directory), STATE_DIRNAME)
+
+
+def listing_dependency(rel_directory: str, tree: bool = False) -> str:
+    """
+    Name the dependency of a document on a directory listing
+
+    Args:
+        rel_directory: Directory relative to the working directory, "" for the root
+        tree: Depend on every file below the directory rather than on its entries
+
+    Returns:
+        "<dir>/" for the entries of the directory, "<dir>/**" for its tree
+
+    Examples:
+        >>> listing_dependency("src")
+        'src/'
+        >>> listing_dependency("", tree=True)
+        '/**'
+    """
+    return rel_directory + (TREE_SUFFIX if tree else LISTING_SUFFIX)
+
+
+def _parse_listing(dependency: str) -> Optional[Tuple[str, bool]]:
+    if dependency.endswith(TREE_SUFFIX):
+        return dependency[:-len(TREE_SUFFIX)], True
+    if dependency.endswith(LISTING_SUFFIX):
+        return dependency[:-len(LISTING_SUFFIX)], False
+    return None
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    """
+    Compute the SHA-256 content hash of a file
+
+    Args:
+        file_path: File path
+
+    Returns:
+        Hex digest, or None if the file cannot be read
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+class DocManifest:
+    """
+    Source-to-document manifest persisted next to the generated docs
+
+    Layout of the JSON file:
+        {
+            "version": 1,
+            "sources": {"src/app.py": {"sha256": "...", "mtime_ns": 0, "size": 0}},
+            "docs": {"README.md": {"sources": ["src/app.py", "/", "src/**"]}},
+            "listings": {"/": "<sha256 of the entry names>", "src/**": "<sha256 of the file paths>"}
+        }
+
+    Source paths are relative to the working directory, document paths are
+    relative to the output directory. A document's sources also name the
+    directory listings it saw (see `listing_dependency`), whose digests are
+    kept under "listings".
+    """
+
+    def __init__(self, working_directory: str, output_directory: str):
+        self.working_directory = os.path.abspath(working_directory)
+        self.output_directory = os.path.abspath(output_directory)
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.listings: Dict[str, Optional[str]] = {}
+
+    @property
+    def path(self) -> str:
+        return os.path.join(get_state_directory(self.output_directory), MANIFEST_FILENAME)
+
+    @classmethod
+    def load(cls, working_directory: str, output_directory: str) -> "DocManifest":
+        """
+        Load the manifest from disk, returning an empty one if absent or invalid
+        """
+        manifest = cls(working_directory, output_directory)
+        try:
+            with open(manifest.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+
+        if data.get('version') == MANIFEST_VERSION:
+            manifest.sources = data.get('sources', {})
+            manifest.docs = data.get('docs', {})
+            manifest.listings = data.get('listings', {})
+        return manifest
+
+    def save(self) -> None:
+        data = {
+            'version': MANIFEST_VERSION,
+            'sources': self.sources,
+            'docs': self.docs,
+            'listings': self.listings,
+        }
+        _write_json(self.path, data, indent=2, sort_keys=True)
+
+    def _source_changed(self, rel_path: str) -> bool:
+        entry = self.sources.get(rel_path)
+        if entry is None:
+            return True
+
+        abs_path = os.path.join(self.working_directory, rel_path)
+        try:
+            stat = os.stat(abs_path)
+        except OSError:
+            return True
+
+        if stat.st_mtime_ns == entry.get('mtime_ns') and stat.st_size == entry.get('size'):
+            return False
+        return hash_file(abs_path) != entry.get('sha256')
+
+    def listing_digest(self, dependency: str) -> Optional[str]:
+        """
+        Digest a directory listing dependency as it is on disk now
+
+        Entries of a directory are its names, with a trailing "/" on
+        subdirectories, like `list_real_directory` shows them. A tree is the
+        paths of the non-ignored files below the directory, outside the
+        output directory, like `list_real_tree` walks it.
+
+        Args:
+            dependency: Listing dependency from `listing_dependency`
+
+        Returns:
+            Hex digest, or None if the directory cannot be listed
+        """
+        rel_directory, tree = _parse_listing(dependency)
+        directory = os.path.join(self.working_directory, *rel_directory.split('/'))
+        try:
+            if tree:
+                if not os.path.isdir(directory):
+                    return None
+                output_relative = os.path.relpath(self.output_directory, directory)
+                index = FileIndex.build(
+                    directory,
+                    exclude=[] if output_relative.startswith('..') else [output_relative]
+                )
+                names = sorted(path for path, _, _, _ in index.files())
+            else:
+                with os.scandir(directory) as entries:
+                    names = sorted(entry.name + ('/' if entry.is_dir() else '') for entry in entries)
+        except OSError:
+            return None
+
+        digest = hashlib.sha256()
+        for name in names:
+            digest.update(name.encode('utf-8', errors='surrogateescape') + b'\0')
+        return digest.hexdigest()
+
+    def plan(self) -> Tuple[List[str], List[str]]:
+        """
+        Split known documents into reusable and stale ones
+
+        A document is stale when any source it was derived from changed or
+        disappeared, when a directory listing it saw gained or lost entries, or
+        when the document itself is missing on disk.
+
+        Returns:
+            Tuple of (reused, stale) document paths, both sorted
+        """
+        changed = {path for path in self.sources if self._source_changed(path)}
+        changed.update(
+            dependency for dependency, digest in self.listings.items()
+            if self.listing_digest(dependency) != digest
+        )
+        reused, stale = [], []
+        for doc, entry in self.docs.items():
+            doc_path = os.path.join(self.output_directory, doc)
+            if (
+                not os.path.isfile(doc_path)
+                or changed.intersection(entry.get('sources', []))
+            ):
+                stale.append(doc)
+            else:
+                reused.append(doc)
+        return sorted(reused), sorted(stale)
+
+    def update(self, doc_sources: Dict[str, Set[str]]) -> None:
+        """
+        Record the sources of freshly written documents, refresh source stats and listing digests
+
+        Args:
+            doc_sources: Mapping of written document path to the source paths
+                         and directory listings read before it was written
+        """
+        for doc, sources in doc_sources.items():
+            self.docs[doc] = {'sources': sorted(sources)}
+
+        referenced = set()
+        for entry in self.docs.values():
+            referenced.update(entry.get('sources', []))
+
+        sources = {}
+        listings = {}
+        for rel_path in sorted(referenced):
+            if _parse_listing(rel_path) is not None:
+                listings[rel_path] = self.listing_digest(rel_path)
+                continue
+            abs_path = os.path.join(self.working_directory, rel_path)
+            try:
+                stat = os.stat(abs_path)
+            except OSError:
+                continue
+            previous = self.sources.get(rel_path, {})
+            if stat.st_mtime_ns == previous.get('mtime_ns') and stat.st_size == previous.get('size'):
+                sources[rel_path] = previous
+                continue
+            sources[rel_path] = {
+                'sha256': hash_file(abs_path),
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+            }
+        self.sources = sources
+        self.listings = listings
+
+    def snapshot(self, docs: List[str]) -> Dict[str, Tuple[bytes, int, int]]:
+        """
+        Capture the bytes and timestamps of documents that must stay untouched
+        """
+        saved = {}
+        for doc in docs:
+            doc_path = os.path.join(self.output_directory, doc)
+            try:
+                stat = os.stat(doc_path)
+                with open(doc_path, 'rb') as f:
+                    saved[doc] = (f.read(), stat.st_atime_ns, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return saved
+
+    def restore(self, saved: Dict[str, Tuple[bytes, int, int]]) -> None:
+        """
+        Put back any snapshotted document the agent rewrote during the run
+        """
+        for doc, (content, atime_ns, mtime_ns) in saved.items():
+            doc_path = os.path.join(self.output_directory, doc)
+            try:
+                with open(doc_path, 'rb') as f:
+                    if f.read() == content:
+                        continue
+            except OSError:
+                pass
+            with open(doc_path, 'wb') as f:
+                f.write(content)
+            os.utime(doc_path, ns=(atime_ns, mtime_ns))
+
+
+class ManifestRecorder(BaseCallbackHandler):
+    """
+    Callback handler that tracks which sources each written document depends on
+
+    Files read through `read_real_file` / `read_real_files` or matched by `ripgrep_search`,
+    and directories listed through `list_real_directory` / `list_real_tree`, are
+    accumulated; every `write_real_file` into the output directory maps the
+    document to all sources read so far in the run.
+
+    When `state_path` is given, the recorded state is persisted after every
+    change and reloaded on construction, so a resumed run keeps the list of
+    documents written before the interruption.
+
+    Tool callbacks arrive concurrently from the tool threads; updates and
+    saves of the state are serialized by a lock.
+    """
+
+    def __init__(self, working_directory: str, output_directory: str, state_path: Optional[str] = None):
+        self.working_directory = os.path.abspath(working_directory)
+        self.output_directory = os.path.abspath(output_directory)
+        self.state_path = state_path
+        self.sources_read: Set[str] = set()
+        self.doc_sources: Dict[str, Set[str]] = {}
+        self._pending: Dict[UUID, Tuple[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        if state_path:
+            self._load_state()
+
+    def _load_state(self) -> None:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.sources_read = set(data['sources_read'])
+            self.doc_sources = {doc: set(sources) for doc, sources in data['doc_sources'].items()}
+        except (OSError, ValueError, KeyError):
+            return
+
+    def _save_state(self) -> None:
+        # Called with the lock held
+        if not self.state_path:
+            return
+        data = {
+            'sources_read': sorted(self.sources_read),
+            'doc_sources': {doc: sorted(sources) for doc, sources in self.doc_sources.items()},
+        }
+        _write_json(self.state_path, data)
+
+    def _relative_source(self, path: str) -> Optional[str]:
+        abs_path = os.path.abspath(path)
+        if abs_path.startswith(self.output_directory + os.sep):
+            return None
+        if not abs_path.startswith(self.working_directory + os.sep):
+            return None
+        if not os.path.isfile(abs_path):
+            return None
+        return os.path.relpath(abs_path, self.working_directory)
+
+    def _relative_listing(self, directory: str, tree: bool) -> Optional[str]:
+        abs_path = os.path.abspath(directory)
+        if abs_path == self.output_directory or abs_path.startswith(self.output_directory + os.sep):
+            return None
+        if abs_path == self.working_directory:
+            return listing_dependency('', tree)
+        if not abs_path.startswith(self.working_directory + os.sep):
+            return None
+        if not os.path.isdir(abs_path):
+            return None
+        rel_path = os.path.relpath(abs_path, self.working_directory)
+        return listing_dependency(rel_path.replace(os.sep, '/'), tree)
+
+    def _record_source(self, path: str) -> bool:
+        # Called with the lock held
+        rel_path = self._relative_source(path)
+        if not rel_path or rel_path in self.sources_read:
+            return False
+        self.sources_read.add(rel_path)
+        return True
+
+    def fork(self, state_path: Optional[str] = None) -> "ManifestRecorder":
+        """
+        Create a recorder for a concurrent sub-run that starts from the sources read so far
+        """
+        child = ManifestRecorder(self.working_directory, self.output_directory, state_path)
+        with self._lock:
+            child.sources_read.update(self.sources_read)
+        return child
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        inputs: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get('name') or kwargs.get('name', '')
+        with self._lock:
+            self._pending[run_id] = (name, inputs or {})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            name, inputs = self._pending.pop(run_id, ('', {}))
+        content = str(getattr(output, 'content', output))
+
+        sources: List[str] = []
+        listing = None
+        doc = None
+        if name == 'read_real_file':
+            if not content.startswith('❌'):
+                sources.append(inputs.get('file_path', ''))
+
+        elif name == 'read_real_files':
+            for line in content.splitlines():
+                if line.startswith('File: '):
+                    sources.append(line[len('File: '):].rsplit(' (', 1)[0])
+
+        elif name == 'ripgrep_search':
+            for line in content.splitlines():
+                if line.startswith('File: '):
+                    sources.append(line[len('File: '):])
+
+        elif name in ('list_real_directory', 'list_real_tree'):
+            if not content.startswith('❌'):
+                listing = self._relative_listing(inputs.get('directory', '.'), name == 'list_real_tree')
+
+        elif name == 'write_real_file':
+            abs_path = os.path.abspath(inputs.get('file_path', ''))
+            if content.startswith('✅') and abs_path.startswith(self.output_directory + os.sep):
+                doc = os.path.relpath(abs_path, self.output_directory)
+
+        if not sources and listing is None and doc is None:
+            return
+        with self._lock:
+            changed = False
+            for source in sources:
+                changed = self._record_source(source) or changed
+            if listing is not None and listing not in self.sources_read:
+                self.sources_read.add(listing)
+                changed = True
+            if doc is not None:
+                self.doc_sources[doc] = set(self.sources_read)
+                changed = True
+            if changed:
+                self._save_state()
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._pending.pop(run_id, None)
@@ -0,0 +1,233 @@
+"""
+Chat model module
+
+ChatAnthropic subclass used by the generator, adding per-call hooks that
+LangChain and deepagents do not expose on their own.
+"""
+
+from functools import cached_property
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.language_models.chat_models import agenerate_from_stream, generate_from_stream
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+from .compaction import ContextCompactor, estimate_tokens
+from .ratelimit import RateLimiter
+from .routing import ModelRouter
+
+
+CACHE_CONTROL = {"type": "ephemeral"}
+# Block types the API does not accept a cache breakpoint on
+UNCACHEABLE_BLOCKS = ("thinking", "redacted_thinking")
+
+
+def _with_breakpoint(content: Any) -> Any:
+    """
+    Copy of message or system content with a cache breakpoint on its last block
+    """
+    if isinstance(content, str):
+        return [{"type": "text", "text": content, "cache_control": dict(CACHE_CONTROL)}] if content else content
+    if not content or not isinstance(content[-1], dict):
+        return content
+    last = content[-1]
+    if last.get("type") in UNCACHEABLE_BLOCKS or (last.get("type") == "text" and not last.get("text")):
+        return content
+    return list(content[:-1]) + [{**last, "cache_control": dict(CACHE_CONTROL)}]
+
+
+def add_cache_breakpoints(payload: dict) -> dict:
+    """
+    Mark the reusable prefix of an Anthropic Messages request for prompt caching
+
+    The API caches the prompt up to each breakpoint, in the order tools,
+    system, messages. Breakpoints go on the last tool definition, the end
+    of the system prompt and the last message; the latter rolls forward
+    with the conversation, so each call reads the previous call's prefix
+    from the cache and only pays full price for the newest turn.
+
+    Args:
+        payload: Request payload, modified in place
+
+    Returns:
+        The payload
+    """
+    tools = payload.get("tools")
+    if tools and isinstance(tools[-1], dict):
+        # The list is shared by every call of the bound model; replace rather than modify it
+        payload["tools"] = list(tools[:-1]) + [{**tools[-1], "cache_control": dict(CACHE_CONTROL)}]
+    if payload.get("system"):
+        payload["system"] = _with_breakpoint(payload["system"])
+    messages = payload.get("messages")
+    if messages:
+        messages[-1] = {**messages[-1], "content": _with_breakpoint(messages[-1]["content"])}
+    return payload
+
+
+class CodeViewXChatModel(ChatAnthropic):
+    """
+    ChatAnthropic with context compaction, rate limiting and prompt caching applied right before each API call
+
+    All happen below LangChain's response cache, so cache keys are still
+    computed from the full conversation held in the agent state and cache
+    hits are never throttled. When a limiter is set it also handles retries
+    of rate-limit, server and connection errors, so the client's own retries
+    should be disabled
+    (`max_retries=0`). With `prompt_caching`, requests carry cache
+    breakpoints (see `add_cache_breakpoints`). With a `router`, the model
+    is the exploration model and authoring turns are handed over to the
+    router's writing model (see `ModelRouter`).
+
+    Examples:
+        model = CodeViewXChatModel(
+            model_name="claude-sonnet-4-20250514",
+            max_tokens=64000,
+            compactor=ContextCompactor(threshold_tokens=60000),
+            limiter=get_shared_rate_limiter(requests_per_minute=50),
+            prompt_caching=True,
+            max_retries=0
+        )
+
+        model = CodeViewXChatModel(
+            model_name="claude-3-5-haiku-20241022",
+            max_tokens=8192,
+            router=ModelRouter("claude-sonnet-4-20250514", write_max_tokens=64000)
+        )
+    """
+
+    compactor: Optional[ContextCompactor] = Field(default=None, exclude=True)
+    limiter: Optional[RateLimiter] = Field(default=None, exclude=True)
+    prompt_caching: bool = Field(default=False, exclude=True)
+    router: Optional[ModelRouter] = Field(default=None, exclude=True)
+
+    @cached_property
+    def _writer(self) -> "CodeViewXChatModel":
+        return self.model_copy(update={
+            "model": self.router.write_model,
+            "max_tokens": self.router.write_max_tokens,
+            "router": None,
+        })
+
+    def _get_llm_string(self, stop: Optional[List[str]] = None, **kwargs: Any) -> str:
+        llm_string = super()._get_llm_string(stop=stop, **kwargs)
+        if self.router is None:
+            return llm_string
+        # Routed responses may come from the writing model; keep them apart in the response cache
+        return f"{llm_string}---write_model={self.router.write_model}"
+
+    def _prepare_messages(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        if self.compactor is None:
+            return messages
+        return self.compactor.compact(messages)
+
+    def _get_request_payload(self, input_: LanguageModelInput, *, stop: Optional[List[str]] = None, **kwargs: Any) -> dict:
+        payload = super()._get_request_payload(input_, stop=stop, **kwargs)
+        if self.prompt_caching:
+            add_cache_breakpoints(payload)
+        return payload
+
+    def _routed_stream(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        """
+        Stream a call from the exploration model, or from the writing model once it turns out to author a document
+
+        Exploration chunks are held back until the response is known not
+        to write, so callers never see output of a dropped attempt; they
+        then reach the run manager, which the writing model streams to
+        directly.
+        """
+        run_manager = kwargs.get("run_manager")
+        explore_kwargs = {key: value for key, value in kwargs.items() if key != "run_manager"}
+        chunks = []
+        stream = self._direct_stream(messages, *args, **explore_kwargs)
+        for chunk in stream:
+            if self.router.starts_write(chunk):
+                stream.close()
+                self.router.record(escalated=True)
+                yield from self._writer._stream(messages, *args, **kwargs)
+                return
+            chunks.append(chunk)
+        self.router.record(escalated=False)
+        for chunk in chunks:
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _arouted_stream(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        run_manager = kwargs.get("run_manager")
+        explore_kwargs = {key: value for key, value in kwargs.items() if key != "run_manager"}
+        chunks = []
+        stream = self._adirect_stream(messages, *args, **explore_kwargs)
+        async for chunk in stream:
+            if self.router.starts_write(chunk):
+                await stream.aclose()
+                self.router.record(escalated=True)
+                async for write_chunk in self._writer._astream(messages, *args, **kwargs):
+                    yield write_chunk
+                return
+            chunks.append(chunk)
+        self.router.record(escalated=False)
+        for chunk in chunks:
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    # run_manager is named so LangChain passes it in (it checks the signature)
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        kwargs = {"stop": stop, "run_manager": run_manager, **kwargs}
+        if self.router is not None:
+            return generate_from_stream(self._routed_stream(messages, **kwargs))
+        messages = self._prepare_messages(messages)
+        generate = super()._generate
+        if self.limiter is None:
+            return generate(messages, **kwargs)
+        return self.limiter.call(lambda: generate(messages, **kwargs), estimate_tokens(messages))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        kwargs = {"stop": stop, "run_manager": run_manager, **kwargs}
+        if self.router is not None:
+            return await agenerate_from_stream(self._arouted_stream(messages, **kwargs))
+        messages = self._prepare_messages(messages)
+        agenerate = super()._agenerate
+        if self.limiter is None:
+            return await agenerate(messages, **kwargs)
+        return await self.limiter.acall(lambda: agenerate(messages, **kwargs), estimate_tokens(messages))
+
+    def _direct_stream(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        messages = self._prepare_messages(messages)
+        stream = super()._stream
+        if self.limiter is None:
+            return stream(messages, *args, **kwargs)
+        return self.limiter.stream(lambda: stream(messages, *args, **kwargs), estimate_tokens(messages))
+
+    def _adirect_stream(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        messages = self._prepare_messages(messages)
+        astream = super()._astream
+        if self.limiter is None:
+            return astream(messages, *args, **kwargs)
+        return self.limiter.astream(lambda: astream(messages, *args, **kwargs), estimate_tokens(messages))
+
+    def _stream(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        if self.router is not None:
+            return self._routed_stream(messages, *args, **kwargs)
+        return self._direct_stream(messages, *args, **kwargs)
+
+    def _astream(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        if self.router is not None:
+            return self._arouted_stream(messages, *args, **kwargs)
+        return self._adirect_stream(messages, *args, **kwargs)
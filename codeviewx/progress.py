@@ -0,0 +1,199 @@
+"""
+Progress display module
+"""
+
+import json
+import threading
+from typing import Optional
+
+from .events import AgentMessage, DocWritten, ProgressEvent, TodosUpdated, ToolFinished, ToolStarted
+from .i18n import t
+
+
+TOOL_DISPLAY_KEYS = {
+    'read_real_file': 'reading',
+    'read_real_files': 'reading',
+    'list_real_directory': 'listing',
+    'list_real_tree': 'listing',
+    'ripgrep_search': 'searching',
+    'execute_command': 'executing',
+}
+
+TODO_STATUS_ICONS = {
+    'pending': '⏳',
+    'in_progress': '🔄',
+    'completed': '✅',
+    'cancelled': '❌',
+}
+
+
+def _result_info(tool_name: str, content: str) -> str:
+    """
+    One-line summary of a tool result
+    """
+    if tool_name == 'read_real_file':
+        lines_count = content.count('\n') + 1 if content else 0
+        preview_lines = content.split('\n')[:2] if content else []
+        preview = ' '.join(preview_lines)[:60].replace('\n', ' ').strip()
+        if len(preview) > 60 or lines_count > 2:
+            preview += "..."
+        return f"✓ {lines_count} lines | {preview}" if preview else f"✓ {lines_count} lines"
+    
+    if tool_name == 'read_real_files':
+        files = [line[len('File: '):].rsplit(' (', 1)[0] for line in content.split('\n') if line.startswith('File: ')]
+        preview = ', '.join(files[:3])
+        if len(files) > 3:
+            preview += f" ... (+{len(files)-3})"
+        return f"✓ {len(files)} files | {preview}" if preview else f"✓ {len(files)} files"
+    
+    if tool_name in ('list_real_directory', 'list_real_tree'):
+        items = [x.strip() for x in content.split('\n') if x.strip()] if content else []
+        preview = ', '.join(items[:3])
+        if len(items) > 3:
+            preview += f" ... (+{len(items)-3})"
+        return f"✓ {len(items)} items | {preview}" if preview else f"✓ {len(items)} items"
+    
+    if tool_name == 'ripgrep_search':
+        if not content.startswith('Found '):
+            return "✓ No matches" if not content or content.startswith('No matches') else f"✓ {content[:60]}"
+        lines = content.split('\n')
+        count = lines[0][len('Found '):].split(' (', 1)[0]
+        first_match = next((line.split(':', 1)[1].strip() for line in lines[1:] if line[:1].isdigit() and ':' in line), "")
+        if len(first_match) > 50:
+            first_match = first_match[:50] + "..."
+        return f"✓ {count} | {first_match}" if first_match else f"✓ {count}"
+    
+    if not content:
+        return "✓ Done"
+    preview = content[:60].replace('\n', ' ').strip()
+    if len(content) > 60:
+        preview += "..."
+    return f"✓ {preview}"
+
+
+class ProgressDisplay:
+    """
+    Console progress display for an agent conversation
+    
+    Listens to the events of a ProgressTracker and prints concise,
+    human-readable progress lines. Several displays may share one lock so
+    that concurrent agents write whole lines to a single console without
+    interleaving.
+    
+    Examples:
+        display = ProgressDisplay(verbose=False)
+        tracker = ProgressTracker("docs", listeners=[display.handle])
+        for update in agent.stream(inputs, stream_mode="updates"):
+            tracker.handle(update)
+        
+        lock = threading.Lock()
+        display = ProgressDisplay(prefix="[03-architecture.md]", lock=lock)
+    """
+    
+    def __init__(
+        self,
+        verbose: bool = False,
+        prefix: str = "",
+        lock: Optional[threading.Lock] = None
+    ):
+        """
+        Initialize progress display
+        
+        Args:
+            verbose: Print every event in full instead of concise progress
+            prefix: Text prepended to every printed line (e.g. the chapter name)
+            lock: Lock shared with other displays printing to the same console
+        """
+        self.verbose = verbose
+        self.prefix = prefix
+        self.lock = lock or threading.Lock()
+        self.analysis_phase = True
+        self.last_todos_count = 0
+        self.todos_shown = False
+    
+    def _print(self, message: str = "") -> None:
+        if self.prefix:
+            message = '\n'.join(
+                f"{self.prefix} {line}" if line else line
+                for line in message.split('\n')
+            )
+        with self.lock:
+            print(message)
+    
+    def handle(self, event: ProgressEvent) -> None:
+        """
+        Print progress for one event
+        
+        Args:
+            event: Event produced by the conversation's ProgressTracker
+        """
+        if self.verbose:
+            self._print_verbose(event)
+            return
+        
+        if isinstance(event, AgentMessage):
+            if len(event.text) > 20 and not event.tool_calls:
+                summary = event.text[:200].replace('\n', ' ').strip()
+                if len(event.text) > 200:
+                    summary += "..."
+                self._print(f"\n💭 AI: {summary}")
+        
+        elif isinstance(event, ToolStarted):
+            if self.analysis_phase and event.tool in ('list_real_directory', 'list_real_tree', 'ripgrep_search'):
+                self._print(t('analyzing_structure'))
+                self.analysis_phase = False
+        
+        elif isinstance(event, ToolFinished):
+            if event.step <= 25 and event.tool not in ('write_todos', 'write_real_file'):
+                display_name = TOOL_DISPLAY_KEYS.get(event.tool)
+                display_name = t(display_name) if display_name else f'🔧 {event.tool}'
+                self._print(f"   {display_name}: {_result_info(event.tool, event.content)}")
+        
+        elif isinstance(event, DocWritten):
+            self._print(t('generating_doc', current=event.index, filename=event.filename))
+            self.analysis_phase = False
+        
+        elif isinstance(event, TodosUpdated):
+            self._print_todos(event)
+    
+    def _print_todos(self, event: TodosUpdated) -> None:
+        # Show the plan once, then only when it made notable progress
+        should_show = event.total > 0 and (
+            not self.todos_shown
+            or event.completed >= self.last_todos_count + 2
+            or (event.completed == event.total and event.completed > self.last_todos_count)
+        )
+        if event.completed > self.last_todos_count:
+            self.last_todos_count = event.completed
+        if not should_show:
+            return
+        self.todos_shown = True
+        
+        todo_summaries = []
+        for todo in event.todos:
+            if isinstance(todo, dict) and todo.get('content'):
+                status_icon = TODO_STATUS_ICONS.get(todo.get('status', 'pending'), '○')
+                todo_summaries.append(f"{status_icon} {todo['content']}")
+        if todo_summaries:
+            self._print(f"\n{t('task_planning')}:")
+            for todo_summary in todo_summaries:
+                self._print(f"   {todo_summary}")
+            self._print()
+    
+    def _print_verbose(self, event: ProgressEvent) -> None:
+        self._print(f"\n{'='*80}")
+        self._print(t('verbose_step', step=event.step, message_type=event.__class__.__name__))
+        self._print(f"{'='*80}")
+        if isinstance(event, AgentMessage):
+            self._print(event.text)
+        elif isinstance(event, ToolStarted):
+            self._print(f"{event.tool} ({event.call_id})")
+            self._print(json.dumps(event.args, ensure_ascii=False, indent=2, default=str))
+        elif isinstance(event, ToolFinished):
+            self._print(f"{event.tool} ({event.call_id})")
+            self._print(event.content)
+        else:
+            details = event.to_dict()
+            for key in ('event', 'part', 'step'):
+                details.pop(key)
+            self._print(json.dumps(details, ensure_ascii=False, indent=2, default=str))
@@ -2,11 +2,44 @@
 Prompt loading module
 """
 
+from functools import lru_cache
 from pathlib import Path
 from langchain_core.prompts import PromptTemplate
 from .i18n import t
 
 
+# Template variables callers may omit; they are filled with these defaults
+DEFAULT_VARIABLES = {
+    "repository_digest": "",
+}
+
+
+@lru_cache(maxsize=None)
+def _read_template(name: str) -> str:
+    """
+    Read a prompt template from the package, once per process
+    """
+    try:
+        try:
+            from importlib.resources import files
+            prompt_file = files("codeviewx.prompts").joinpath(f"{name}.md")
+            with prompt_file.open("r", encoding="utf-8") as f:
+                template_text = f.read()
+        except (ImportError, AttributeError):
+            from importlib.resources import open_text
+            with open_text("codeviewx.prompts", f"{name}.md", encoding="utf-8") as f:
+                template_text = f.read()
+    except (FileNotFoundError, ModuleNotFoundError):
+        package_dir = Path(__file__).parent
+        prompt_path = package_dir / "prompts" / f"{name}.md"
+        if not prompt_path.exists():
+            raise FileNotFoundError(t('error_file_not_found', filename=f"{name}.md"))
+        with open(prompt_path, "r", encoding="utf-8") as f:
+            template_text = f.read()
+    
+    return template_text
+
+
 def load_prompt(name: str, **kwargs) -> str:
     """
     Load AI documentation generation system prompt
@@ -30,32 +63,21 @@ def load_prompt(name: str, **kwargs) -> str:
                            output_directory="docs")
     
     Note:
-        - If the template contains {variable} placeholders, corresponding kwargs must be provided
+        - If the template contains {variable} placeholders, corresponding kwargs must be provided,
+          except for those listed in DEFAULT_VARIABLES
         - If kwargs are not provided, the original template text is returned
         - Uses LangChain PromptTemplate's default format ({variable})
     """
-    try:
-        try:
-            from importlib.resources import files
-            prompt_file = files("codeviewx.prompts").joinpath(f"{name}.md")
-            with prompt_file.open("r", encoding="utf-8") as f:
-                template_text = f.read()
-        except (ImportError, AttributeError):
-            from importlib.resources import open_text
-            with open_text("codeviewx.prompts", f"{name}.md", encoding="utf-8") as f:
-                template_text = f.read()
-    except (FileNotFoundError, ModuleNotFoundError):
-        package_dir = Path(__file__).parent
-        prompt_path = package_dir / "prompts" / f"{name}.md"
-        if not prompt_path.exists():
-            raise FileNotFoundError(t('error_file_not_found', filename=f"{name}.md"))
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            template_text = f.read()
+    template_text = _read_template(name)
     
     if kwargs:
         try:
             template = PromptTemplate.from_template(template_text)
-            return template.format(**kwargs)
+            defaults = {
+                key: value for key, value in DEFAULT_VARIABLES.items()
+                if key in template.input_variables and key not in kwargs
+            }
+            return template.format(**defaults, **kwargs)
         except KeyError as e:
             raise ValueError(t('error_template_variable', variable=str(e))) from e
     
@@ -0,0 +1,356 @@
+"""
+Rate limiting module
+
+Client-side throttling shared by the model calls of a process: token
+buckets for requests and tokens per minute, retries with exponential
+backoff and jitter on rate-limit (429), overload (529) and other transient
+failures, and an AIMD concurrency limit that settles near the provider's
+capacity.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+import anthropic
+
+
+RATE_LIMIT_STATUS_CODES = (429, 529)
+# Besides those and 5xx: request timeout and conflict, which the SDK retries as well
+RETRYABLE_STATUS_CODES = (408, 409) + RATE_LIMIT_STATUS_CODES
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 6
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+# Minimum time between two multiplicative decreases, so a burst of
+# failures from calls started together only halves concurrency once
+DECREASE_INTERVAL_SECONDS = 5.0
+POLL_SECONDS = 0.05
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """
+    Check whether an API error is a rate-limit or overload response
+    """
+    return isinstance(error, anthropic.APIStatusError) and error.status_code in RATE_LIMIT_STATUS_CODES
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether an API error is transient: rate limits and overload, request
+    timeouts, conflicts, server errors and connection failures (including timeouts)
+    """
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and (
+        error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    )
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _usage_tokens(output: Any) -> Optional[int]:
+    """
+    Total tokens reported by a ChatResult or a ChatGenerationChunk, if any
+    """
+    generations = getattr(output, 'generations', None) or [output]
+    total = None
+    for generation in generations:
+        usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+        if usage:
+            total = (total or 0) + usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+    return total
+
+
+class TokenBucket:
+    """
+    Budget of `per_minute` units refilled continuously
+
+    The level may go negative when actual usage exceeds what was reserved;
+    the debt delays later callers. Not thread-safe on its own.
+    """
+
+    __slots__ = ("capacity", "rate", "level", "updated")
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """
+        Seconds until `cost` units are available (0 if they are now)
+        """
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A single call larger than the whole budget only waits for a full bucket
+        needed = min(cost, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def consume(self, cost: float) -> None:
+        self.level = min(self.capacity, self.level - cost)
+
+
+class RateLimiter:
+    """
+    Throttles model calls by request rate, token rate and adaptive concurrency
+
+    Every call first waits for a concurrency slot and for budget in the
+    requests-per-minute and tokens-per-minute buckets (reserving its
+    estimated input tokens, reconciled with the reported usage afterwards).
+    Calls failing with 429/529 or another transient error (see `is_retryable`)
+    are retried with exponential backoff and full jitter, honoring
+    `retry-after`; the model client's own retries are off. The concurrency
+    limit grows by one per window of successful calls and is halved on
+    rate-limit responses (AIMD).
+
+    Works from threads and from coroutines; one instance is meant to be
+    shared by all models of a process, see `get_shared_rate_limiter`.
+
+    Examples:
+        limiter = RateLimiter(requests_per_minute=50, tokens_per_minute=40000)
+        result = limiter.call(lambda: client.messages.create(...), cost=1200)
+        result = await limiter.acall(lambda: async_client.messages.create(...), cost=1200)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES
+    ):
+        """
+        Args:
+            requests_per_minute: Request budget, 0 for unlimited
+            tokens_per_minute: Token budget (input plus output), 0 for unlimited
+            max_concurrency: Upper bound of the adaptive concurrency limit
+            max_retries: Retries of a call failing with a transient error before giving up
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.max_retries = max_retries
+        self.in_flight = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+        self._backoff_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, cost: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = self._backoff_until - now
+            if self.in_flight >= int(self.concurrency):
+                wait = max(wait, POLL_SECONDS)
+            if self.requests:
+                wait = max(wait, self.requests.wait_time(1, now))
+            if self.tokens:
+                wait = max(wait, self.tokens.wait_time(cost, now))
+            if wait > 0:
+                self.throttled_seconds += wait
+                return wait
+
+            self.in_flight += 1
+            if self.requests:
+                self.requests.consume(1)
+            if self.tokens:
+                self.tokens.consume(cost)
+            return 0.0
+
+    def _release(self, cost: int, used: Optional[int], error: Optional[BaseException], attempt: int) -> float:
+        """
+        Free the slot, settle the token budget and adapt concurrency
+
+        Returns:
+            Seconds to wait before retrying, or 0 if the call must not be retried
+        """
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if error is None:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+                if self.tokens and used is not None:
+                    self.tokens.consume(used - cost)
+                return 0.0
+
+            if self.tokens:
+                # The request was rejected or aborted; give its reservation back
+                self.tokens.consume(-cost)
+            if not is_retryable(error) or attempt >= self.max_retries:
+                return 0.0
+
+            if is_rate_limited(error) and now - self._last_decrease >= DECREASE_INTERVAL_SECONDS:
+                self.concurrency = max(1.0, self.concurrency / 2)
+                self._last_decrease = now
+            delay = random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempt))
+            retry_after = _retry_after(error)
+            if retry_after is not None:
+                # The provider says when capacity returns: pause every caller until then
+                self._backoff_until = max(self._backoff_until, now + retry_after)
+                delay = max(delay, retry_after)
+            self.retries += 1
+            self.throttled_seconds += delay
+            return delay
+
+    def acquire(self, cost: int) -> None:
+        """
+        Block until a call of `cost` estimated tokens may start
+        """
+        while True:
+            wait = self._try_acquire(cost)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, cost: int) -> None:
+        """
+        Async counterpart of `acquire`
+        """
+        while True:
+            wait = self._try_acquire(cost)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def call(self, func: Callable[[], Any], cost: int) -> Any:
+        """
+        Run a model call under the limits, retrying on transient errors
+
+        Args:
+            func: Performs the call and returns a ChatResult
+            cost: Estimated input tokens of the call
+        """
+        attempt = 0
+        while True:
+            self.acquire(cost)
+            try:
+                result = func()
+            except BaseException as error:
+                delay = self._release(cost, None, error, attempt)
+                if not delay:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._release(cost, _usage_tokens(result), None, attempt)
+            return result
+
+    async def acall(self, func: Callable[[], Awaitable[Any]], cost: int) -> Any:
+        """
+        Async counterpart of `call`
+        """
+        attempt = 0
+        while True:
+            await self.aacquire(cost)
+            try:
+                result = await func()
+            except BaseException as error:
+                delay = self._release(cost, None, error, attempt)
+                if not delay:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._release(cost, _usage_tokens(result), None, attempt)
+            return result
+
+    def stream(self, func: Callable[[], Iterator[Any]], cost: int) -> Iterator[Any]:
+        """
+        Streaming counterpart of `call`; only retried if no chunk was produced yet
+
+        A stream closed by its consumer counts as a finished call, charged with
+        the usage reported so far, or the estimate if none was.
+        """
+        attempt = 0
+        while True:
+            self.acquire(cost)
+            used = None
+            started = False
+            try:
+                for chunk in func():
+                    started = True
+                    tokens = _usage_tokens(chunk)
+                    if tokens is not None:
+                        used = (used or 0) + tokens
+                    yield chunk
+            except GeneratorExit:
+                # The consumer closed the stream (e.g. a dropped routed attempt): it was billed
+                self._release(cost, used, None, attempt)
+                raise
+            except BaseException as error:
+                delay = self._release(cost, None, error, attempt)
+                if started or not delay:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._release(cost, used, None, attempt)
+            return
+
+    async def astream(self, func: Callable[[], AsyncIterator[Any]], cost: int) -> AsyncIterator[Any]:
+        """
+        Async counterpart of `stream`
+        """
+        attempt = 0
+        while True:
+            await self.aacquire(cost)
+            used = None
+            started = False
+            try:
+                async for chunk in func():
+                    started = True
+                    tokens = _usage_tokens(chunk)
+                    if tokens is not None:
+                        used = (used or 0) + tokens
+                    yield chunk
+            except GeneratorExit:
+                self._release(cost, used, None, attempt)
+                raise
+            except BaseException as error:
+                delay = self._release(cost, None, error, attempt)
+                if started or not delay:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._release(cost, used, None, attempt)
+            return
+
+
+_shared_limiters: Dict[Tuple[int, int, int], RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(
+    requests_per_minute: int = 0,
+    tokens_per_minute: int = 0,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> RateLimiter:
+    """
+    Get the process-wide limiter for a set of limits
+
+    Runs configured with the same limits (e.g. all runs of a batch) share
+    one limiter, so the limits apply to their combined traffic.
+
+    Returns:
+        RateLimiter shared by all callers passing the same arguments
+    """
+    key = (requests_per_minute, tokens_per_minute, max_concurrency)
+    with _shared_lock:
+        if key not in _shared_limiters:
+            _shared_limiters[key] = RateLimiter(requests_per_minute, tokens_per_minute, max_concurrency)
+        return _shared_limiters[key]
@@ -0,0 +1,220 @@
+"""
+Record and replay module
+
+Captures the model responses of a run in a transcript file and plays them
+back through a local stand-in chat model, so the generator's own work
+(agent graph, tools, checkpoints, progress) can be run and measured
+without network access or API costs.
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+from pydantic import Field, PrivateAttr
+
+from .trace import DEFAULT_LANE, thread_lane
+from .i18n import t
+
+
+TRANSCRIPT_VERSION = 1
+
+
+class TranscriptRecorder(BaseCallbackHandler):
+    """
+    Callback handler recording every model response of a run
+
+    Responses are kept in call order together with the conversation they
+    belong to (the main one, "analysis" or a chapter), which is how
+    `ReplayChatModel` hands them out again. Record complete runs: a resumed
+    run only contains the calls made after resuming.
+
+    Examples:
+        recorder = TranscriptRecorder("/path/to/project", "docs", doc_language="English", parallel=1)
+        agent.invoke(inputs, config={"callbacks": [recorder]})
+        recorder.save("run.transcript.jsonl")
+    """
+
+    def __init__(self, working_directory: str, output_directory: str, **settings: Any):
+        """
+        Args:
+            working_directory: Project working directory of the run
+            output_directory: Documentation output directory of the run
+            **settings: Further run settings stored in the header (doc_language, parallel)
+        """
+        self.header = {
+            "codeviewx_transcript": TRANSCRIPT_VERSION,
+            "working_directory": os.path.abspath(working_directory),
+            "output_directory": os.path.abspath(output_directory),
+            # As given to the agent, which may write to paths relative to it
+            "output_argument": output_directory,
+            **settings,
+        }
+        self.responses: List[Tuple[str, BaseMessage]] = []
+        self._parts: Dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        with self._lock:
+            self._parts[run_id] = thread_lane((metadata or {}).get('thread_id'))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            part = self._parts.pop(run_id, DEFAULT_LANE)
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, 'message', None)
+                    if message is not None:
+                        self.responses.append((part, message))
+
+    def save(self, path: str) -> None:
+        """
+        Write the transcript as JSON lines: a header, then one response per line
+        """
+        with self._lock:
+            responses = list(self.responses)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.header, ensure_ascii=False) + "\n")
+            for part, message in responses:
+                f.write(json.dumps({"part": part, "message": message_to_dict(message)}, ensure_ascii=False) + "\n")
+
+
+def load_transcript(path: str) -> Tuple[Dict[str, Any], Dict[str, List[BaseMessage]]]:
+    """
+    Read a transcript written by `TranscriptRecorder`
+
+    Args:
+        path: Transcript file
+
+    Returns:
+        Tuple of (header, responses of each conversation in call order)
+
+    Raises:
+        ValueError: If the file is not a transcript
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+    header = json.loads(lines[0]) if lines else {}
+    if header.get("codeviewx_transcript") != TRANSCRIPT_VERSION:
+        raise ValueError(t('error_invalid_transcript', path=path))
+
+    responses: Dict[str, List[BaseMessage]] = {}
+    for line in lines[1:]:
+        entry = json.loads(line)
+        responses.setdefault(entry["part"], []).extend(messages_from_dict([entry["message"]]))
+    return header, responses
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Local stand-in chat model answering with the responses of a transcript
+
+    Each conversation (identified by the checkpoint thread id the agent
+    passes along) gets its recorded responses in order, whatever the input.
+    Paths of the recorded project and output directory in tool call
+    arguments are rewritten to the replaying ones, so a transcript can be
+    replayed against another checkout or into a scratch output directory.
+    Other relative paths are resolved against the current directory, as
+    when recording.
+
+    Examples:
+        model = ReplayChatModel.from_transcript("run.transcript.jsonl", "/path/to/project", "/tmp/docs")
+        agent = create_deep_agent(tools, prompt, model=model)
+    """
+
+    responses: Dict[str, List[BaseMessage]] = Field(default_factory=dict, exclude=True)
+    path_map: List[Tuple[str, str]] = Field(default_factory=list, exclude=True)
+    output_prefix: Optional[Tuple[str, str]] = Field(default=None, exclude=True)
+    _positions: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_transcript(cls, path: str, working_directory: str, output_directory: str) -> "ReplayChatModel":
+        """
+        Create a replay model for a transcript
+
+        Args:
+            path: Transcript file
+            working_directory: Project working directory of the replaying run
+            output_directory: Documentation output directory of the replaying run
+        """
+        header, responses = load_transcript(path)
+        # Output directory first: it usually lies inside the working directory
+        path_map = [
+            (header["output_directory"], os.path.abspath(output_directory)),
+            (header["working_directory"], os.path.abspath(working_directory)),
+        ]
+        output_prefix = None
+        output_argument = os.path.normpath(header.get("output_argument") or header["output_directory"])
+        if not os.path.isabs(output_argument) and header["output_directory"] != os.path.abspath(output_directory):
+            output_prefix = (output_argument, os.path.abspath(output_directory))
+        return cls(
+            responses=responses,
+            path_map=[(old, new) for old, new in path_map if old != new],
+            output_prefix=output_prefix
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "codeviewx-replay"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayChatModel":
+        # Tool schemas do not matter: the recorded responses already contain the calls
+        return self
+
+    def _remap(self, value: Any) -> Any:
+        if isinstance(value, str):
+            for old, new in self.path_map:
+                value = value.replace(old, new)
+            if self.output_prefix:
+                old, new = self.output_prefix
+                relative = value[2:] if value.startswith('./') else value
+                if relative == old or relative.startswith(old + '/'):
+                    value = new + relative[len(old):]
+            return value
+        if isinstance(value, dict):
+            return {key: self._remap(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._remap(item) for item in value]
+        return value
+
+    def next_response(self, part: str) -> BaseMessage:
+        """
+        Hand out the next recorded response of a conversation
+
+        Raises:
+            ValueError: If the conversation has no responses left
+        """
+        with self._lock:
+            index = self._positions.get(part, 0)
+            recorded = self.responses.get(part, [])
+            if index >= len(recorded):
+                raise ValueError(t('error_replay_exhausted', part=part, count=len(recorded)))
+            self._positions[part] = index + 1
+        message = recorded[index]
+        if isinstance(message, AIMessage) and message.tool_calls and (self.path_map or self.output_prefix):
+            message = message.model_copy(update={"tool_calls": [
+                {**tool_call, "args": self._remap(tool_call["args"])} for tool_call in message.tool_calls
+            ]})
+        return message
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        metadata = getattr(run_manager, 'metadata', None) or {}
+        message = self.next_response(thread_lane(metadata.get('thread_id')))
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,65 @@
+"""
+Model routing module
+
+Lets the cheap, frequent turns of a run (listing, searching, reading)
+run on a fast model while the turns that author documents run on a
+strong one.
+"""
+
+import threading
+from typing import Sequence
+
+from langchain_core.outputs import ChatGenerationChunk
+
+
+DEFAULT_WRITE_TOOLS = ("write_real_file",)
+
+
+class ModelRouter:
+    """
+    Routes each model call to an exploration or a writing model
+
+    A call is first streamed from the exploration model. As soon as the
+    response starts a call to one of `write_tools`, the stream is dropped
+    and the call is repeated with `write_model`, so documents are always
+    authored by the strong model while exploration turns get the fast
+    model's latency. The dropped attempt costs its input tokens and at
+    most a few output tokens; it is not part of the reported usage.
+
+    Examples:
+        router = ModelRouter("claude-sonnet-4-20250514", write_max_tokens=64000)
+        model = CodeViewXChatModel(model_name="claude-3-5-haiku-20241022", router=router)
+        print(router.escalated, router.calls)
+    """
+
+    def __init__(
+        self,
+        write_model: str,
+        write_max_tokens: int,
+        write_tools: Sequence[str] = DEFAULT_WRITE_TOOLS
+    ):
+        """
+        Args:
+            write_model: Model name used for turns that write documents
+            write_max_tokens: Output token limit of the writing model
+            write_tools: Tools whose calls mark a turn as authoring
+        """
+        self.write_model = write_model
+        self.write_max_tokens = write_max_tokens
+        self.write_tools = tuple(write_tools)
+        self.calls = 0
+        self.escalated = 0
+        self._lock = threading.Lock()
+
+    def starts_write(self, chunk: ChatGenerationChunk) -> bool:
+        """
+        Check whether a streamed chunk begins a call to a writing tool
+        """
+        tool_call_chunks = getattr(chunk.message, 'tool_call_chunks', None) or []
+        return any(tool_call.get('name') in self.write_tools for tool_call in tool_call_chunks)
+
+    def record(self, escalated: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if escalated:
+                self.escalated += 1
@@ -102,6 +102,63 @@ def generate_file_tree(directory, current_file=None):
     return file_tree
 
 
+def render_markdown(content):
+    """
+    Render a documentation page's Markdown to HTML, with a table of contents
+    
+    A [TOC] marker is inserted before the first heading unless the page
+    already has one.
+    
+    Args:
+        content (str): Markdown source
+    
+    Returns:
+        str: HTML of the page body
+    """
+    if '[TOC]' not in content:
+        lines = content.split('\n')
+        insert_index = 0
+
+        for i, line in enumerate(lines):
+            if line.strip().startswith('#'):
+                insert_index = i
+                break
+
+        lines.insert(insert_index, '[TOC]')
+        lines.insert(insert_index + 1, '')
+        content = '\n'.join(lines)
+
+    import markdown
+    from markdown.extensions.toc import TocExtension
+
+    toc_extension = TocExtension(
+        permalink=True,
+        permalink_class='headerlink',
+        title=t('server_toc_title'),
+        baselevel=1,
+        toc_depth=6,
+        marker='[TOC]'
+    )
+
+    html = markdown.markdown(
+        content,
+        extensions=[
+            'tables',
+            'fenced_code',
+            'codehilite',
+            toc_extension
+        ],
+        extension_configs={
+            'codehilite': {
+                'css_class': 'language-',
+                'use_pygments': False
+            }
+        }
+    )
+
+    return html
+
+
 def start_document_web_server(output_directory):
     """
     Start documentation web server
@@ -131,46 +188,7 @@ def start_document_web_server(output_directory):
         if os.path.exists(index_file_path):
             with open(index_file_path, "r") as f:
                 content = f.read()
-            if '[TOC]' not in content:
-                lines = content.split('\n')
-                insert_index = 0
-
-                for i, line in enumerate(lines):
-                    if line.strip().startswith('#'):
-                        insert_index = i
-                        break
-
-                lines.insert(insert_index, '[TOC]')
-                lines.insert(insert_index + 1, '')
-                content = '\n'.join(lines)
-                
-            import markdown
-            from markdown.extensions.toc import TocExtension
-
-            toc_extension = TocExtension(
-                permalink=True,
-                permalink_class='headerlink',
-                title=t('server_toc_title'),
-                baselevel=1,
-                toc_depth=6,
-                marker='[TOC]'
-            )
-
-            html = markdown.markdown(
-                content,
-                extensions=[
-                    'tables',
-                    'fenced_code',
-                    'codehilite',
-                    toc_extension
-                ],
-                extension_configs={
-                    'codehilite': {
-                        'css_class': 'language-',
-                        'use_pygments': False
-                    }
-                }
-            )
+            html = render_markdown(content)
 
             file_tree_data = generate_file_tree(output_directory, filename)
             print(t('server_debug_file_tree', data=str(file_tree_data)))
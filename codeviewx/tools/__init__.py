@@ -2,15 +2,51 @@
 Tools package
 """
 
-from .command import execute_command
-from .search import ripgrep_search
-from .filesystem import write_real_file, read_real_file, list_real_directory
+import importlib
+
+# Public names and the module defining them, imported on first access (see codeviewx/__init__.py)
+_EXPORTS = {
+    'execute_command': '.command',
+    'ripgrep_search': '.search',
+    'write_real_file': '.filesystem',
+    'read_real_file': '.filesystem',
+    'read_real_files': '.filesystem',
+    'list_real_directory': '.filesystem',
+    'list_real_tree': '.filesystem',
+    'FileIndex': '.fileindex',
+    'ShellSession': '.shell',
+    'ShellSessions': '.shell',
+    'ToolMemo': '.memo',
+    'ToolExecutor': '.executor',
+    'DEFAULT_TOOL_CONCURRENCY': '.executor',
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
 
 __all__ = [
     'execute_command',
     'ripgrep_search',
     'write_real_file',
     'read_real_file',
+    'read_real_files',
     'list_real_directory',
+    'list_real_tree',
+    'FileIndex',
+    'ShellSession',
+    'ShellSessions',
+    'ToolMemo',
+    'ToolExecutor',
+    'DEFAULT_TOOL_CONCURRENCY',
 ]
 
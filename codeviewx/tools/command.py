@@ -2,52 +2,70 @@
 Command execution tool module
 """
 
-import subprocess
 from langchain_core.tools import tool
+from langchain_core.runnables.config import ensure_config
+
+from .fileindex import mark_commands_run
+from .shell import (
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_OUTPUT_BYTES,
+    MAX_COMMAND_TIMEOUT,
+    MAX_OUTPUT_BYTES,
+    find_session,
+    run_command,
+)
 
 
 @tool
-def execute_command(command: str, working_dir: str = None) -> str:
+def execute_command(command: str, working_dir: str = None,
+                    timeout: int = DEFAULT_COMMAND_TIMEOUT,
+                    max_output_bytes: int = DEFAULT_OUTPUT_BYTES) -> str:
     """
     Execute system command and return result
-    
+
     Args:
         command: Command string to execute
         working_dir: Working directory, uses current directory if None
-    
+        timeout: Seconds before the command is killed, defaults to 30 (at most 600)
+        max_output_bytes: Bytes kept of stdout and of stderr; longer output keeps its
+                          beginning and end, defaults to 65536
+
     Returns:
         Command execution output, or error message if failed
-    
+
     Examples:
         - execute_command("ls -la")
         - execute_command("cat main.py", "/path/to/project")
         - execute_command("find . -name '*.py' | head -20")
-    
+        - execute_command("make test", timeout=300)
+
     Features:
         - Supports any shell command
         - Supports pipes and redirection
         - Automatically captures stdout and stderr
+        - Commands run in a shell session kept for the conversation when the
+          run has them, so the current directory carries over between calls
     """
+    timeout = min(max(1, timeout), MAX_COMMAND_TIMEOUT)
+    max_output_bytes = min(max(1024, max_output_bytes), MAX_OUTPUT_BYTES)
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            cwd=working_dir,
-            timeout=30
-        )
-        
+        # The conversation is known from the config LangChain sets around each tool call
+        session = find_session(ensure_config().get("configurable", {}).get("thread_id"))
+        if session is not None:
+            stdout, stderr, timed_out = session.run(command, working_dir, timeout, max_output_bytes)
+        else:
+            stdout, stderr, timed_out = run_command(command, working_dir, timeout, max_output_bytes)
+        mark_commands_run()
+
         output = ""
-        if result.stdout:
-            output += result.stdout
-        if result.stderr:
-            output += f"\n[Error Output]\n{result.stderr}"
-        
+        if stdout:
+            output += stdout
+        if stderr:
+            output += f"\n[Error Output]\n{stderr}"
+
+        if timed_out:
+            return f"❌ Error: Command execution timeout ({timeout} seconds)" + (f"\n[Partial Output]\n{output}" if output else "")
         return output if output else "Command executed successfully, no output"
-    
-    except subprocess.TimeoutExpired:
-        return "❌ Error: Command execution timeout (30 seconds)"
+
     except Exception as e:
         return f"❌ Error: {str(e)}"
-
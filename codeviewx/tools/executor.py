@@ -0,0 +1,113 @@
+"""
+Tool execution module
+
+Runs the tool calls of one model turn concurrently on a bounded pool of
+threads, while calls with side effects keep to one at a time.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables.config import ensure_config
+from langchain_core.tools import BaseTool, StructuredTool
+
+
+DEFAULT_TOOL_CONCURRENCY = 8
+
+# Tools that change files or run arbitrary commands
+SERIAL_TOOLS = ("write_real_file", "execute_command")
+
+
+class ToolExecutor:
+    """
+    Bounded, order-preserving concurrent execution of the tool calls of a turn
+
+    LangGraph's tool node already runs the calls of one model turn side
+    by side and returns their results in call order, but on a pool sized
+    by CPU count, which is the wrong measure for I/O-bound reads and
+    searches. This sets the bound explicitly: synchronous runs pass it
+    as the `max_concurrency` of the run config (see `config`); async runs
+    use a pool of that size owned by the executor, instead of the event
+    loop's default executor shared with checkpointing and bookkeeping.
+    Calls to `SERIAL_TOOLS` take a per-conversation lock, so writes and
+    commands requested in one turn never interleave, while parallel
+    chapters still write independently.
+
+    Examples:
+        executor = ToolExecutor(max_workers=8)
+        tools = [executor.wrap(tool) for tool in tools]
+        agent.invoke(inputs, config={**config, **executor.config()})
+        executor.shutdown()
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_TOOL_CONCURRENCY):
+        """
+        Args:
+            max_workers: Tool calls of one turn running at the same time
+        """
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._serial_locks: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def config(self) -> Dict[str, Any]:
+        """
+        Run config entries bounding the tool node's thread pool
+        """
+        return {"max_concurrency": self.max_workers}
+
+    def _serial_lock(self) -> threading.Lock:
+        # The conversation is known from the config LangChain sets around each tool call
+        thread_id = ensure_config().get("configurable", {}).get("thread_id")
+        with self._lock:
+            return self._serial_locks.setdefault(thread_id, threading.Lock())
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="codeviewx-tool")
+            return self._pool
+
+    def wrap(self, tool: BaseTool) -> BaseTool:
+        """
+        Copy of a function tool running on this executor
+
+        The copy keeps the tool's name, description and argument schema.
+        """
+        function = tool.func
+
+        if tool.name in SERIAL_TOOLS:
+            def run(**kwargs: Any) -> Any:
+                with self._serial_lock():
+                    return function(**kwargs)
+        else:
+            run = function
+
+        async def arun(**kwargs: Any) -> Any:
+            # Carry context variables (run config, batch log routing) over to the pool thread
+            context = copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor(), partial(context.run, run, **kwargs)
+            )
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            func=run,
+            coroutine=arun,
+            return_direct=tool.return_direct
+        )
+
+    def shutdown(self) -> None:
+        """
+        Release the pool threads of async runs
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
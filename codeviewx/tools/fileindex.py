@@ -0,0 +1,527 @@
+"""
+File index module
+
+Run-scoped, in-memory index of the repository's files (paths, sizes,
+modification times and languages), built once with a parallel scandir
+walk so that glob, tree and search queries of the tools do not walk the
+disk again.
+"""
+
+import os
+import re
+import bisect
+import fnmatch
+import threading
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from pygments.lexers import get_all_lexers, get_lexer_for_filename
+from pygments.util import ClassNotFound
+
+from .ignore import DEFAULT_IGNORE_PATTERNS, IgnoreRules
+
+
+_language_cache: Dict[str, Optional[str]] = {}
+_language_lock = threading.Lock()
+_lexer_filenames: Optional["re.Pattern"] = None
+
+
+def _matches_any_lexer(name: str) -> bool:
+    """
+    Quick check against the file name patterns of the built-in lexers
+
+    A failed Pygments lookup also scans the installed plugins, which is
+    slow, and repositories have many names no lexer knows.
+    """
+    global _lexer_filenames
+    if _lexer_filenames is None:
+        patterns = {pattern for _, _, filenames, _ in get_all_lexers(plugins=False) for pattern in filenames}
+        _lexer_filenames = re.compile("|".join(fnmatch.translate(pattern) for pattern in sorted(patterns)))
+    return _lexer_filenames.match(name) is not None
+
+
+def detect_language(filename: str) -> Optional[str]:
+    """
+    Detect the programming language of a file name with Pygments lexers
+
+    Results are cached per extension (or per name for extensionless files).
+
+    Args:
+        filename: File name or path
+
+    Returns:
+        Lexer name such as 'Python', or None if unknown or plain text
+    """
+    name = os.path.basename(filename)
+    ext = os.path.splitext(name)[1].lower()
+    key = ext or name
+    with _language_lock:
+        if key in _language_cache:
+            return _language_cache[key]
+    try:
+        language = get_lexer_for_filename(name).name if _matches_any_lexer(name) else None
+    except ClassNotFound:
+        language = None
+    if language == "Text only":
+        language = None
+    with _language_lock:
+        _language_cache[key] = language
+    return language
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _depth(rel_dir: str) -> int:
+    return rel_dir.count("/") + 1 if rel_dir else 0
+
+
+def _scan_directory(root: str, rel_dir: str, rules: IgnoreRules) -> Tuple[str, int, list, list]:
+    """
+    Scan one directory: its modification time, files and subdirectories to descend into
+    """
+    files = []
+    subdirectories = []
+    try:
+        mtime_ns = os.stat(os.path.join(root, rel_dir)).st_mtime_ns
+        with os.scandir(os.path.join(root, rel_dir)) as iterator:
+            entries = list(iterator)
+    except OSError:
+        return rel_dir, -1, files, subdirectories
+    for entry in entries:
+        rel_path = _join(rel_dir, entry.name)
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if rules.is_ignored(rel_path, is_dir):
+                continue
+            if is_dir:
+                subdirectories.append((rel_path, rules.descend(rel_path)))
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            continue
+    files.sort()
+    return rel_dir, mtime_ns, files, subdirectories
+
+
+def _component_regex(component: str) -> str:
+    """
+    Regex for one glob path component; wildcards do not match a leading dot, like glob
+    """
+    parts = []
+    position = 0
+    while position < len(component):
+        char = component[position]
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[" and component.find("]", position + 2) >= 0:
+            end = component.find("]", position + 2)
+            body = component[position + 1:end].replace("\\", "\\\\").replace("[", "\\[")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            position = end
+        else:
+            parts.append(re.escape(char))
+        position += 1
+    regex = "".join(parts)
+    if component[:1] in ("*", "?", "["):
+        regex = r"(?!\.)" + regex
+    return regex
+
+
+def glob_regex(pattern: str) -> "re.Pattern":
+    """
+    Compile a relative glob pattern (with recursive `**`) to a regex over "/"-separated paths
+    """
+    components = pattern.split("/")
+    regex = ""
+    for position, component in enumerate(components):
+        last = position == len(components) - 1
+        if component == "**":
+            regex += r"(?:(?!\.)[^/]+/)*" + (r"(?!\.)[^/]+" if last else "")
+        else:
+            regex += _component_regex(component) + ("" if last else "/")
+    return re.compile(regex + r"\Z")
+
+
+class FileIndex:
+    """
+    Compact snapshot of the non-ignored files of a repository
+
+    Files are grouped by directory and kept in parallel arrays (names,
+    sizes, modification times, language ids), so a million-file tree
+    costs little more than its file names. Directories keep the range of
+    their files, their subdirectories and the totals of their subtree.
+
+    The snapshot is taken once. Queries check the modification time of
+    the directories they cover, which changes when entries are added,
+    removed or renamed, and return None when any changed, so callers fall
+    back to the disk. Writes through the run's tools are recorded with
+    `mark_changed`, since in-place edits do not touch the directory, and
+    commands with `mark_commands_run`, since they may touch anything.
+
+    Examples:
+        index = FileIndex.build("/path/to/project", exclude=["docs"])
+        register_index(index)
+        index.directory_entries("src")   # (["pkg"], [("app.py", 2048)])
+        index.glob("/path/to/project/src/**/*.py")
+    """
+
+    __slots__ = (
+        "root", "directories", "_directory_ids", "_directory_mtimes", "_subdirectories",
+        "_file_starts", "_total_files", "_total_sizes", "names", "sizes", "mtimes",
+        "languages", "language_names", "search_index", "excluded", "_changed", "_written",
+        "_unverified", "_lock",
+    )
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Absolute repository root
+        """
+        self.root = root
+        self.directories: List[str] = []
+        self._directory_ids: Dict[str, int] = {}
+        self._directory_mtimes = array('q')
+        self._subdirectories: List[Tuple[int, ...]] = []
+        # Files of directory i are at positions _file_starts[i] to _file_starts[i + 1]
+        self._file_starts = array('q', [0])
+        self._total_files = array('q')
+        self._total_sizes = array('q')
+        self.names: List[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.languages = array('H')
+        self.language_names: List[Optional[str]] = [None]
+        # TrigramIndex over these files, when the run keeps one
+        self.search_index = None
+        # Directories left out of the snapshot on request (e.g. the docs output)
+        self.excluded: Tuple[str, ...] = ()
+        self._changed: Set[int] = set()
+        # Files written through the run's tools
+        self._written: Set[str] = set()
+        # Whether a command ran since the directories were last checked
+        self._unverified = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, working_directory: str, exclude: Sequence[str] = (), max_workers: int = 8) -> "FileIndex":
+        """
+        Walk a repository in parallel, honoring the default ignore list and .gitignore files
+
+        Args:
+            working_directory: Repository root
+            exclude: Extra directories to skip, relative to the root (e.g. the docs output)
+            max_workers: Number of directories scanned at the same time
+
+        Returns:
+            The index of all non-ignored files
+        """
+        root = os.path.abspath(working_directory)
+        rules = IgnoreRules.for_directory(
+            root,
+            DEFAULT_IGNORE_PATTERNS + [f"/{path.strip('/')}/" for path in exclude]
+        )
+        scans = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            pending = {pool.submit(_scan_directory, root, "", rules)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_dir, mtime_ns, files, subdirectories = future.result()
+                    scans[rel_dir] = (mtime_ns, files, [path for path, _ in subdirectories])
+                    pending.update(pool.submit(_scan_directory, root, path, child_rules) for path, child_rules in subdirectories)
+
+        index = cls(root)
+        index.excluded = tuple(path.strip("/") for path in exclude)
+        index.directories = sorted(scans)
+        index._directory_ids = {path: position for position, path in enumerate(index.directories)}
+        language_ids: Dict[Optional[str], int] = {None: 0}
+        for path in index.directories:
+            mtime_ns, files, subdirectories = scans[path]
+            index._directory_mtimes.append(mtime_ns)
+            index._subdirectories.append(tuple(sorted(index._directory_ids[child] for child in subdirectories)))
+            for name, size, file_mtime_ns in files:
+                language = detect_language(name)
+                if language not in language_ids:
+                    language_ids[language] = len(index.language_names)
+                    index.language_names.append(language)
+                index.names.append(name)
+                index.sizes.append(size)
+                index.mtimes.append(file_mtime_ns)
+                index.languages.append(language_ids[language])
+            index._file_starts.append(len(index.names))
+
+        # Subtree totals, children before parents
+        count = len(index.directories)
+        index._total_files = array('q', [0]) * count
+        index._total_sizes = array('q', [0]) * count
+        for position in reversed(range(count)):
+            start, end = index._file_starts[position], index._file_starts[position + 1]
+            files = end - start
+            size = sum(index.sizes[start:end])
+            for child in index._subdirectories[position]:
+                files += index._total_files[child]
+                size += index._total_sizes[child]
+            index._total_files[position] = files
+            index._total_sizes[position] = size
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def files(self) -> Iterator[Tuple[str, int, int, Optional[str]]]:
+        """
+        All files as (relative path, size, modification time in ns, language)
+        """
+        for position, rel_dir in enumerate(self.directories):
+            for file_id in range(self._file_starts[position], self._file_starts[position + 1]):
+                yield (
+                    _join(rel_dir, self.names[file_id]), self.sizes[file_id],
+                    self.mtimes[file_id], self.language_names[self.languages[file_id]]
+                )
+
+    def relative(self, path: str) -> Optional[str]:
+        """
+        Path relative to the root with "/" separators, None if outside the root
+        """
+        abs_path = os.path.abspath(path)
+        if abs_path == self.root:
+            return ""
+        if not abs_path.startswith(self.root.rstrip(os.sep) + os.sep):
+            return None
+        return os.path.relpath(abs_path, self.root).replace(os.sep, "/")
+
+    def _descendants(self, rel_dir: str) -> List[int]:
+        """
+        Ids of a directory and of every directory below it
+        """
+        if not rel_dir:
+            return list(range(len(self.directories)))
+        # Paths below rel_dir sort contiguously between "rel_dir/" and "rel_dir0" ("0" follows "/")
+        start = bisect.bisect_left(self.directories, rel_dir + "/")
+        end = bisect.bisect_left(self.directories, rel_dir + "0", start)
+        return [self._directory_ids[rel_dir]] + list(range(start, end))
+
+    def fresh(self, rel_dir: str, recursive: bool = False) -> bool:
+        """
+        Whether the snapshot of a directory (and its subtree) still matches the disk
+
+        Args:
+            rel_dir: Indexed directory relative to the root
+            recursive: Check every directory below it as well
+        """
+        if rel_dir not in self._directory_ids:
+            return False
+        return self._fresh(self._descendants(rel_dir) if recursive else [self._directory_ids[rel_dir]])
+
+    def _fresh(self, directory_ids: List[int]) -> bool:
+        with self._lock:
+            if any(directory_id in self._changed for directory_id in directory_ids):
+                return False
+        for directory_id in directory_ids:
+            try:
+                if os.stat(os.path.join(self.root, self.directories[directory_id])).st_mtime_ns != self._directory_mtimes[directory_id]:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def settled(self, rel_dir: str) -> bool:
+        """
+        Whether the files below a directory are the snapshot's plus the `written` ones
+
+        Directories are only checked on disk after a command ran; a check of
+        the whole tree that finds nothing changed clears the need for more.
+
+        Args:
+            rel_dir: Directory relative to the root
+        """
+        if rel_dir not in self._directory_ids:
+            return False
+        with self._lock:
+            if not self._unverified:
+                return True
+        for directory_id in self._descendants(rel_dir):
+            try:
+                if os.stat(os.path.join(self.root, self.directories[directory_id])).st_mtime_ns != self._directory_mtimes[directory_id]:
+                    return False
+            except OSError:
+                return False
+        if not rel_dir:
+            with self._lock:
+                self._unverified = False
+        return True
+
+    def written(self, rel_dir: str) -> List[str]:
+        """
+        Files below a directory written through the run's tools, relative to the root
+        """
+        prefix = rel_dir + "/" if rel_dir else ""
+        with self._lock:
+            return sorted(path for path in self._written if path.startswith(prefix))
+
+    def mark_changed(self, path: str) -> None:
+        """
+        Record a write: queries covering the file's directory go back to the disk
+
+        Args:
+            path: Written file path; ignored outside the root and in excluded directories
+        """
+        rel_path = self.relative(path)
+        if not rel_path or any(rel_path.startswith(excluded + "/") for excluded in self.excluded):
+            return
+        rel_dir = rel_path
+        while rel_dir:
+            rel_dir = rel_dir.rsplit("/", 1)[0] if "/" in rel_dir else ""
+            if rel_dir in self._directory_ids:
+                directory_id = self._directory_ids[rel_dir]
+                try:
+                    # The entries the write added are known from now on
+                    mtime_ns = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+                except OSError:
+                    mtime_ns = -1
+                with self._lock:
+                    self._changed.add(directory_id)
+                    self._written.add(rel_path)
+                    self._directory_mtimes[directory_id] = mtime_ns
+                return
+
+    def mark_commands_run(self) -> None:
+        """
+        Record that a command ran: `settled` checks the directories on disk again
+        """
+        with self._lock:
+            self._unverified = True
+
+    def paths(self, path: str) -> Optional[List[str]]:
+        """
+        Files below a directory, as `path` joined with the path below it
+
+        Args:
+            path: Directory path
+
+        Returns:
+            Sorted file paths, or None if the directory is not indexed or changed since the snapshot
+        """
+        rel_dir = self.relative(path)
+        if rel_dir is None or not self.fresh(rel_dir, recursive=True):
+            return None
+        paths = []
+        for directory_id in self._descendants(rel_dir):
+            below = self.directories[directory_id][len(rel_dir):].lstrip("/")
+            for file_id in range(self._file_starts[directory_id], self._file_starts[directory_id + 1]):
+                paths.append(os.path.join(path, below, self.names[file_id]) if below else os.path.join(path, self.names[file_id]))
+        return sorted(paths)
+
+    def directory_entries(self, rel_dir: str) -> Tuple[List[str], List[Tuple[str, int]]]:
+        """
+        Subdirectory names and (file name, size) pairs of an indexed directory, sorted by name
+        """
+        position = self._directory_ids[rel_dir]
+        subdirectories = [self.directories[child].rsplit("/", 1)[-1] for child in self._subdirectories[position]]
+        files = [
+            (self.names[file_id], self.sizes[file_id])
+            for file_id in range(self._file_starts[position], self._file_starts[position + 1])
+        ]
+        return sorted(subdirectories), files
+
+    def totals(self, rel_dir: str) -> Tuple[int, int]:
+        """
+        Number and total size of the files below an indexed directory
+        """
+        position = self._directory_ids[rel_dir]
+        return self._total_files[position], self._total_sizes[position]
+
+    def glob(self, pattern: str) -> Optional[List[str]]:
+        """
+        Files matching a glob pattern, written the way `glob.glob` would return them
+
+        Args:
+            pattern: Glob pattern whose leading part without wildcards is an indexed directory
+
+        Returns:
+            Sorted matching files, or None if the pattern cannot be answered from the snapshot
+        """
+        components = pattern.split("/")
+        for position, component in enumerate(components):
+            if any(char in component for char in "*?["):
+                break
+        else:
+            return None
+        prefix = "/".join(components[:position])
+        rel_dir = self.relative(prefix or ("/" if pattern.startswith("/") else "."))
+        if rel_dir is None or rel_dir not in self._directory_ids:
+            return None
+        remainder = components[position:]
+        # Directories the pattern can reach: all below it with "**", else only down to its depth
+        reachable = self._descendants(rel_dir)
+        if "**" not in remainder:
+            max_depth = _depth(rel_dir) + len(remainder) - 1
+            reachable = [directory_id for directory_id in reachable if _depth(self.directories[directory_id]) <= max_depth]
+        if not self._fresh(reachable):
+            return None
+
+        regex = glob_regex("/".join(remainder))
+        matches = []
+        base_length = len(rel_dir) + 1 if rel_dir else 0
+        for directory_id in reachable:
+            directory = self.directories[directory_id]
+            for file_id in range(self._file_starts[directory_id], self._file_starts[directory_id + 1]):
+                rel_path = _join(directory, self.names[file_id])[base_length:]
+                if regex.match(rel_path):
+                    matches.append(f"{prefix}/{rel_path}" if prefix else rel_path)
+        return sorted(matches)
+
+
+_indexes: Dict[str, FileIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def register_index(index: FileIndex) -> None:
+    """
+    Make an index answer the tools' queries under its root
+    """
+    with _indexes_lock:
+        _indexes[index.root] = index
+
+
+def unregister_index(index: FileIndex) -> None:
+    """
+    Stop using an index, unless another run registered its own for the same root
+    """
+    with _indexes_lock:
+        if _indexes.get(index.root) is index:
+            del _indexes[index.root]
+
+
+def find_index(path: str) -> Optional[FileIndex]:
+    """
+    Registered index whose root contains a path, the innermost if several do
+
+    Args:
+        path: File or directory path
+    """
+    abs_path = os.path.abspath(path)
+    with _indexes_lock:
+        candidates = [
+            index for root, index in _indexes.items()
+            if abs_path == root or abs_path.startswith(root.rstrip(os.sep) + os.sep)
+        ]
+    return max(candidates, key=lambda index: len(index.root)) if candidates else None
+
+
+def mark_commands_run() -> None:
+    """
+    Record on every registered index that a command ran, since it may have written anywhere
+    """
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.mark_commands_run()
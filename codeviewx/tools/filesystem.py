@@ -3,8 +3,32 @@ Filesystem tool module
 """
 
 import os
+import glob
+import stat
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
 from langchain_core.tools import tool
 
+from .fileindex import FileIndex, find_index
+from .ignore import DEFAULT_IGNORE_PATTERNS, IgnoreRules
+from .lineindex import line_index
+
+
+# Content returned by one read; more needs an explicit line window
+DEFAULT_MAX_BYTES = 256 * 1024
+# A NUL byte within the first bytes marks a file as binary
+BINARY_CHECK_BYTES = 8192
+# Total content returned by one batch read, shared by its files
+DEFAULT_BATCH_MAX_BYTES = 512 * 1024
+# Files one batch read returns at most, after glob expansion
+MAX_BATCH_FILES = 100
+BATCH_READ_WORKERS = 8
+# Default depth and size of a directory tree listing
+DEFAULT_TREE_DEPTH = 3
+DEFAULT_TREE_ENTRIES = 300
+
 
 @tool
 def write_real_file(file_path: str, content: str) -> str:
@@ -34,6 +58,9 @@ def write_real_file(file_path: str, content: str) -> str:
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        index = find_index(file_path)
+        if index is not None:
+            index.mark_changed(file_path)
         
         file_size = os.path.getsize(file_path)
         file_size_kb = file_size / 1024
@@ -45,12 +72,16 @@ def write_real_file(file_path: str, content: str) -> str:
 
 
 @tool
-def read_real_file(file_path: str) -> str:
+def read_real_file(file_path: str, offset: int = 0, limit: Optional[int] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> str:
     """
     Read file content from real filesystem
     
     Args:
         file_path: File path (relative or absolute)
+        offset: First line to read, counting from 0 (default: 0)
+        limit: Number of lines to read (default: None, up to the end of the file)
+        max_bytes: Maximum bytes of content returned; longer content is cut at a line
+                   boundary and ends with a marker telling the offset to continue from
     
     Returns:
         File content, or error message if failed
@@ -59,17 +90,27 @@ def read_real_file(file_path: str) -> str:
         - read_real_file("main.py")
         - read_real_file("config/settings.json")
         - read_real_file("/absolute/path/to/file.txt")
+        - read_real_file("dist/bundle.js", offset=2000, limit=500)
+    
+    Features:
+        - Large files are read in line windows; the header tells the lines shown
+        - Binary files are detected and not returned
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         file_size = os.path.getsize(file_path)
-        file_size_kb = file_size / 1024
-        lines_count = len(content.split('\n'))
+        whole_file = offset <= 0 and limit is None and file_size <= max_bytes
+        with open(file_path, 'rb') as f:
+            data = f.read() if whole_file else f.read(BINARY_CHECK_BYTES)
+        if b'\0' in data[:BINARY_CHECK_BYTES]:
+            return f"❌ Error: File '{file_path}' is a binary file ({file_size / 1024:.2f} KB)"
         
-        header = f"File: {file_path} ({file_size_kb:.2f} KB, {lines_count} lines)\n{'=' * 60}\n"
-        return header + content
+        if whole_file:
+            content = data.decode('utf-8')
+            lines_count = content.count('\n') + 1
+            header = f"File: {file_path} ({file_size / 1024:.2f} KB, {lines_count} lines)\n{'=' * 60}\n"
+            return header + content
+        
+        return _read_window(file_path, file_size, max(offset, 0), limit, max_bytes)
     
     except FileNotFoundError:
         return f"❌ Error: File '{file_path}' does not exist"
@@ -81,11 +122,271 @@ def read_real_file(file_path: str) -> str:
         return f"❌ Error: {str(e)}"
 
 
+def _decode_prefix(data: bytes) -> str:
+    """
+    Decode UTF-8 that may end in the middle of a character
+    """
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError as error:
+        if error.start < len(data) - 3:
+            raise
+        return data[:error.start].decode('utf-8')
+
+
+def _read_window(file_path: str, file_size: int, offset: int, limit: Optional[int], max_bytes: int) -> str:
+    """
+    Read a window of lines through the file's line index, at most `max_bytes` of it
+    """
+    index = line_index(file_path)
+    lines_count = index.line_count
+    if offset >= lines_count:
+        return f"❌ Error: Line offset {offset} exceeds file length ({lines_count} lines)"
+    
+    start = index.start_of(offset)
+    end = index.start_of(offset + limit) if limit is not None else file_size
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(min(end - start, max_bytes))
+    
+    truncated = end - start > max_bytes
+    line_cut = False
+    if truncated:
+        cut = data.rfind(b'\n')
+        if cut >= 0:
+            data = data[:cut + 1]
+            next_offset = offset + data.count(b'\n')
+        else:
+            # A single line longer than max_bytes: show its beginning
+            line_cut = True
+            next_offset = offset + 1
+    else:
+        next_offset = offset + data.count(b'\n') + (0 if data.endswith(b'\n') else 1)
+    
+    content = _decode_prefix(data)
+    last_line = max(next_offset, offset + 1)
+    header = (
+        f"File: {file_path} ({file_size / 1024:.2f} KB, {lines_count} lines, "
+        f"showing lines {offset + 1}-{last_line})\n{'=' * 60}\n"
+    )
+    if truncated:
+        marker = f"Truncated at {max_bytes} bytes"
+        if line_cut:
+            marker += f"; line {offset + 1} is longer than that"
+        if next_offset < lines_count:
+            marker += f". Continue with read_real_file(\"{file_path}\", offset={next_offset})"
+        content += f"\n\n... [{marker}]"
+    return header + content
+
+
+@tool
+def read_real_files(paths: List[str], max_bytes: int = DEFAULT_BATCH_MAX_BYTES) -> str:
+    """
+    Read several files from real filesystem in one call
+    
+    Args:
+        paths: File paths or glob patterns (relative or absolute, `**` supported)
+        max_bytes: Total bytes of content returned for all files; when the files
+                   are larger, the budget is shared evenly and the largest files
+                   are cut at a line boundary with a marker telling the offset to
+                   continue from with read_real_file
+    
+    Returns:
+        One section per file, each starting with a `File:` header line, or error message if failed
+    
+    Examples:
+        - read_real_files(["README.md", "pyproject.toml", "setup.py"])
+        - read_real_files(["src/app/*.py"], max_bytes=100000)
+        - read_real_files(["docs/**/*.md", "CHANGELOG.md"])
+    
+    Features:
+        - Files are read concurrently
+        - Glob matches skip ignored directories such as `.git` and `node_modules`
+        - Binary and missing files are reported in their own section
+    """
+    files, missing = _expand_paths(paths)
+    if not files and not missing:
+        return "❌ Error: No paths given"
+    if not files:
+        return f"❌ Error: No files matched {', '.join(repr(pattern) for pattern in missing)}"
+    
+    omitted = files[MAX_BATCH_FILES:]
+    files = files[:MAX_BATCH_FILES]
+    # Shares come from the sizes on disk, so no file is read past its own (plus a byte to see it goes on)
+    with ThreadPoolExecutor(max_workers=min(BATCH_READ_WORKERS, len(files))) as pool:
+        allowances = _share_budget(list(pool.map(_file_size, files)), max_bytes)
+        reads = list(pool.map(lambda path, allowance: _read_for_batch(path, allowance + 1), files, allowances))
+    
+    sections = []
+    returned = truncated = 0
+    for path, (data, file_size, error), allowance in zip(files, reads, allowances):
+        if error:
+            sections.append(error)
+            continue
+        section, cut = _batch_section(path, data, file_size, allowance)
+        sections.append(section)
+        returned += min(len(data), allowance)
+        truncated += cut
+    sections.extend(f"❌ Error: No files matched '{pattern}'" for pattern in missing)
+    
+    summary = f"Read {len(files)} files ({returned / 1024:.2f} KB of {max_bytes / 1024:.2f} KB budget"
+    if truncated:
+        summary += f", {truncated} truncated"
+    summary += ")"
+    if omitted:
+        summary += f"; {len(omitted)} more matches not read, first: {omitted[0]}"
+    return summary + "\n\n" + "\n\n".join(sections)
+
+
+def _glob_root(pattern: str) -> str:
+    """
+    Leading part of a glob pattern without wildcards
+    """
+    parts = pattern.split('/')
+    for position, part in enumerate(parts):
+        if glob.has_magic(part):
+            return '/'.join(parts[:position]) or ('/' if pattern.startswith('/') else '.')
+    return pattern
+
+
+def _ignored(match: str, root: str) -> bool:
+    """
+    Whether a glob match lies in, or is, an ignored entry below the pattern's root
+    """
+    parts = os.path.relpath(match, root).split(os.sep)
+    return any(
+        fnmatch.fnmatch(part, ignore_pattern)
+        for part in parts
+        for ignore_pattern in DEFAULT_IGNORE_PATTERNS
+    )
+
+
+def _expand_paths(paths: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Expand glob patterns into files, in the order given and without duplicates
+
+    Returns:
+        The files to read and the patterns that matched nothing
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    files: List[str] = []
+    seen = set()
+    missing = []
+    for pattern in paths:
+        if glob.has_magic(pattern):
+            root = _glob_root(pattern)
+            index = find_index(root)
+            matches = index.glob(pattern) if index is not None else None
+            if matches is None:
+                matches = [
+                    match for match in sorted(glob.glob(pattern, recursive=True))
+                    if os.path.isfile(match) and not _ignored(match, root)
+                ]
+            if not matches:
+                missing.append(pattern)
+        else:
+            matches = [pattern]
+        for match in matches:
+            key = os.path.abspath(match)
+            if key not in seen:
+                seen.add(key)
+                files.append(match)
+    return files, missing
+
+
+def _file_size(file_path: str) -> int:
+    """
+    Size of a regular file, 0 for anything else (the read reports the error)
+    """
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return 0
+    return file_stat.st_size if stat.S_ISREG(file_stat.st_mode) else 0
+
+
+def _read_for_batch(file_path: str, max_bytes: int) -> Tuple[Optional[bytes], int, Optional[str]]:
+    """
+    Read up to `max_bytes` of a file for a batch read, and at least its first
+    BINARY_CHECK_BYTES to tell binary files apart
+
+    Returns:
+        The bytes read, the file size, and an error section instead if the file cannot be returned
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            data = f.read(max(max_bytes, BINARY_CHECK_BYTES))
+        if b'\0' in data[:BINARY_CHECK_BYTES]:
+            return None, file_size, f"❌ Error: File '{file_path}' is a binary file ({file_size / 1024:.2f} KB)"
+        return data, file_size, None
+    except FileNotFoundError:
+        return None, 0, f"❌ Error: File '{file_path}' does not exist"
+    except IsADirectoryError:
+        return None, 0, f"❌ Error: '{file_path}' is a directory"
+    except PermissionError:
+        return None, 0, f"❌ Error: No permission to read file '{file_path}'"
+    except Exception as e:
+        return None, 0, f"❌ Error: {file_path}: {str(e)}"
+
+
+def _share_budget(sizes: List[int], budget: int) -> List[int]:
+    """
+    Split a byte budget between files: small files get all they need,
+    the rest is shared evenly by the larger ones
+    """
+    allowances = [0] * len(sizes)
+    left = budget
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    for position, i in enumerate(order):
+        allowances[i] = min(sizes[i], left // (len(order) - position))
+        left -= allowances[i]
+    return allowances
+
+
+def _batch_section(file_path: str, data: bytes, file_size: int, allowance: int) -> Tuple[str, bool]:
+    """
+    Format one file of a batch read, cut to its share of the budget
+
+    Returns:
+        The section and whether the file was truncated
+    """
+    try:
+        if len(data) >= file_size and len(data) <= allowance:
+            content = data.decode('utf-8')
+            lines_count = content.count('\n') + 1
+            return f"File: {file_path} ({file_size / 1024:.2f} KB, {lines_count} lines)\n{'=' * 60}\n{content}", False
+        
+        data = data[:allowance]
+        cut = data.rfind(b'\n')
+        if cut >= 0:
+            data = data[:cut + 1]
+        content = _decode_prefix(data)
+    except UnicodeDecodeError:
+        return f"❌ Error: File '{file_path}' is not a text file or not UTF-8 encoded", False
+    
+    next_offset = data.count(b'\n')
+    lines_count = line_index(file_path).line_count
+    header = (
+        f"File: {file_path} ({file_size / 1024:.2f} KB, {lines_count} lines, "
+        f"showing lines 1-{max(next_offset, 1)})\n{'=' * 60}\n"
+    )
+    marker = (
+        f"Truncated at {len(data)} bytes of the batch budget. "
+        f"Continue with read_real_file(\"{file_path}\", offset={next_offset})"
+    )
+    return f"{header}{content}\n\n... [{marker}]", True
+
+
 @tool
 def list_real_directory(directory: str = ".") -> str:
     """
     List directory contents in real filesystem
     
+    Every entry is listed, including ignored ones (build output, .gitignore
+    matches); use list_real_tree for a view that leaves them out.
+    
     Args:
         directory: Directory path, defaults to current directory
     
@@ -97,9 +398,11 @@ def list_real_directory(directory: str = ".") -> str:
         - list_real_directory(".")
     """
     try:
-        items = os.listdir(directory)
-        dirs = [f"📁 {item}/" for item in items if os.path.isdir(os.path.join(directory, item))]
-        files = [f"📄 {item}" for item in items if os.path.isfile(os.path.join(directory, item))]
+        # scandir reports the entry type without a stat per entry
+        with os.scandir(directory) as entries:
+            entries = list(entries)
+        dirs = [f"📁 {entry.name}/" for entry in entries if entry.is_dir()]
+        files = [f"📄 {entry.name}" for entry in entries if entry.is_file()]
         
         result = f"Directory: {os.path.abspath(directory)}\n"
         result += f"Total {len(dirs)} directories, {len(files)} files\n\n"
@@ -117,3 +420,173 @@ def list_real_directory(directory: str = ".") -> str:
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
+
+
+class _TreeNode:
+    """
+    One entry of a directory tree; directories carry the totals of their subtree
+    """
+
+    __slots__ = ("name", "is_dir", "size", "files", "children")
+
+    def __init__(self, name: str, is_dir: bool, size: int = 0, files: int = 0):
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.files = files
+        self.children: List["_TreeNode"] = []
+
+
+def _scan_tree(root: str, rel_dir: str, rules: IgnoreRules, depth: int, max_depth: int) -> _TreeNode:
+    """
+    Scan a directory, keeping child entries down to `max_depth` and totals for the whole subtree
+    """
+    node = _TreeNode(rel_dir.rsplit('/', 1)[-1], True)
+    try:
+        with os.scandir(os.path.join(root, rel_dir)) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+    except OSError:
+        return node
+    keep = depth < max_depth
+    subdirectories, files = [], []
+    for entry in entries:
+        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if rules.is_ignored(rel_path, is_dir):
+                continue
+            if is_dir:
+                child = _scan_tree(root, rel_path, rules.descend(rel_path), depth + 1, max_depth)
+                subdirectories.append(child)
+            elif entry.is_file(follow_symlinks=False):
+                child = _TreeNode(entry.name, False, entry.stat(follow_symlinks=False).st_size, 1)
+                files.append(child)
+            else:
+                continue
+        except OSError:
+            continue
+        node.size += child.size
+        node.files += child.files
+    if keep:
+        node.children = subdirectories + files
+    return node
+
+
+def _index_tree(index: FileIndex, rel_dir: str, depth: int, max_depth: int) -> _TreeNode:
+    """
+    Same tree as `_scan_tree`, taken from the run's file index
+    """
+    files, size = index.totals(rel_dir)
+    node = _TreeNode(rel_dir.rsplit('/', 1)[-1], True, size, files)
+    if depth < max_depth:
+        subdirectories, entries = index.directory_entries(rel_dir)
+        node.children = [
+            _index_tree(index, f"{rel_dir}/{name}" if rel_dir else name, depth + 1, max_depth)
+            for name in subdirectories
+        ] + [_TreeNode(name, False, file_size, 1) for name, file_size in entries]
+    return node
+
+
+def _format_bytes(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def _render_tree(tree: _TreeNode, max_entries: int) -> Tuple[List[str], int]:
+    """
+    Render a tree as indented lines, choosing the entries to show level by level
+
+    Returns:
+        The lines and the number of entries left out
+    """
+    shown = set()
+    level = tree.children
+    while level and len(shown) < max_entries:
+        next_level = []
+        for node in level:
+            if len(shown) >= max_entries:
+                break
+            shown.add(id(node))
+            next_level.extend(node.children)
+        level = next_level
+
+    lines: List[str] = []
+    # Items are nodes to render, or lines already formatted
+    stack: list = [(node, 0) for node in reversed(tree.children)]
+    while stack:
+        node, indent = stack.pop()
+        if isinstance(node, str):
+            lines.append(f"{'  ' * indent}{node}")
+        elif id(node) not in shown:
+            continue
+        elif node.is_dir:
+            lines.append(f"{'  ' * indent}{node.name}/ ({node.files} files, {_format_bytes(node.size)})")
+            hidden = sum(1 for child in node.children if id(child) not in shown)
+            if hidden:
+                stack.append((f"... +{hidden} more entries", indent + 1))
+            stack.extend((child, indent + 1) for child in reversed(node.children))
+        else:
+            lines.append(f"{'  ' * indent}{node.name} ({_format_bytes(node.size)})")
+    return lines, _count_nodes(tree) - len(shown)
+
+
+def _count_nodes(tree: _TreeNode) -> int:
+    return sum(1 + _count_nodes(child) for child in tree.children)
+
+
+@tool
+def list_real_tree(
+    directory: str = ".",
+    max_depth: int = DEFAULT_TREE_DEPTH,
+    max_entries: int = DEFAULT_TREE_ENTRIES,
+    ignore_patterns: Optional[Sequence[str]] = None
+) -> str:
+    """
+    List a directory tree in real filesystem, with file counts and sizes
+    
+    Args:
+        directory: Root directory of the tree, defaults to current directory
+        max_depth: Levels of entries shown below the root (default: 3); deeper
+                   content still counts towards the totals of its directory
+        max_entries: Maximum entries shown; when there are more, upper levels
+                     are shown first and each directory tells how many were left out
+        ignore_patterns: Extra gitignore-style patterns to skip (e.g. ["*.min.js", "fixtures/"])
+    
+    Returns:
+        Indented tree, directories first, each directory with the number and total
+        size of the files below it, or error message if failed
+    
+    Examples:
+        - list_real_tree(".")
+        - list_real_tree("src", max_depth=5)
+        - list_real_tree(".", max_depth=2, ignore_patterns=["tests/", "*.lock"])
+    
+    Features:
+        - One call maps a whole project
+        - Honors .gitignore / .ignore files and skips `.git`, `node_modules`, build output, etc.
+    """
+    if not os.path.isdir(directory):
+        if os.path.exists(directory):
+            return f"❌ Error: '{directory}' is not a directory"
+        return f"❌ Error: Directory '{directory}' does not exist"
+    try:
+        root = os.path.abspath(directory)
+        index = None if ignore_patterns else find_index(root)
+        rel_dir = index.relative(root) if index is not None else None
+        if index is not None and index.fresh(rel_dir, recursive=True):
+            tree = _index_tree(index, rel_dir, 0, max(max_depth, 1))
+        else:
+            rules = IgnoreRules.for_directory(root, DEFAULT_IGNORE_PATTERNS + list(ignore_patterns or []))
+            tree = _scan_tree(root, "", rules, 0, max(max_depth, 1))
+        lines, hidden = _render_tree(tree, max(max_entries, 1))
+        
+        result = f"Tree: {root} ({tree.files} files, {_format_bytes(tree.size)}; depth {max(max_depth, 1)})\n"
+        result += "\n".join(lines) if lines else "Directory is empty"
+        if hidden:
+            result += f"\n\n... [{hidden} entries not shown. List a subdirectory or raise max_entries]"
+        return result
+    except PermissionError:
+        return f"❌ Error: No permission to access directory '{directory}'"
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
@@ -0,0 +1,303 @@
+"""
+Pure-Python search module
+
+Built-in search engine used by `ripgrep_search` when the ripgrep binary
+is not installed. It walks the tree with the same ignore rules, splits
+the files across a process pool and scans memory-mapped files with a
+compiled regex, producing the same messages as `rg --json`.
+"""
+
+import os
+import re
+import mmap
+import fnmatch
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+from .fileindex import FileIndex, find_index
+
+
+# Files containing a NUL byte in their first bytes are binary and skipped, like ripgrep does
+BINARY_SNIFF_BYTES = 8192
+# Searches over fewer bytes than this run in the calling process. A warm pool
+# costs 10-20 ms per search, in which one process scans about 10 MB for a
+# pattern starting with literal text
+MIN_POOL_BYTES = 16 * 1024 * 1024
+# Bytes of files given to one pool task
+CHUNK_BYTES = 4 * 1024 * 1024
+MAX_CHUNK_FILES = 256
+SEARCH_WORKERS = min(8, os.cpu_count() or 1)
+# Longest part of a line decoded; the results show less of it anyway
+MAX_LINE_BYTES = 2048
+
+
+def type_globs(file_type: str) -> Optional[List[str]]:
+    """
+    File name globs of a file type, from the Pygments lexer of that name (e.g. 'py', 'js', 'md')
+
+    Returns:
+        The globs, or None for an unknown type
+    """
+    try:
+        return list(get_lexer_by_name(file_type).filenames)
+    except ClassNotFound:
+        return None
+
+
+def search_paths(path: str, file_type: Optional[str] = None) -> List[str]:
+    """
+    Files a search of `path` covers: the non-ignored, non-hidden files below it
+
+    Uses the run's file index when it covers the directory, and walks the
+    disk with the same ignore rules otherwise.
+
+    Args:
+        path: File or directory searched
+        file_type: Optional file type the files must have
+
+    Returns:
+        Sorted file paths
+
+    Raises:
+        ValueError: For an unknown file type
+    """
+    globs = type_globs(file_type) if file_type else None
+    if file_type and globs is None:
+        raise ValueError(f"unrecognized file type: {file_type}")
+    if os.path.isfile(path):
+        return [path]
+
+    index = find_index(path)
+    paths = index.paths(path) if index is not None else None
+    if paths is None:
+        paths = FileIndex.build(path).paths(path) or []
+    selected = []
+    for file_path in paths:
+        below = os.path.relpath(file_path, path)
+        if any(part.startswith(".") for part in below.split(os.sep)):
+            continue
+        if globs and not any(fnmatch.fnmatch(os.path.basename(file_path), glob) for glob in globs):
+            continue
+        selected.append(file_path)
+    return selected
+
+
+@lru_cache(maxsize=32)
+def _compile(pattern: str, ignore_case: bool) -> "re.Pattern":
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(pattern.encode('utf-8'), flags)
+
+
+def _message(kind: str, path: str, line_number: int, line: bytes) -> dict:
+    """
+    A match or context message shaped like those of `rg --json`
+    """
+    return {"type": kind, "data": {
+        "path": {"text": path},
+        "lines": {"text": line[:MAX_LINE_BYTES].decode('utf-8', errors='replace')},
+        "line_number": line_number,
+    }}
+
+
+def _scan(path: str, data, regex: "re.Pattern", max_count: int, context_lines: int) -> List[dict]:
+    """
+    Messages of the matching lines of one file's data, with their context lines
+    """
+    size = len(data)
+
+    def line_end(start: int) -> int:
+        end = data.find(b"\n", start)
+        return size if end < 0 else end
+
+    # (line number, start offset, end offset) of the first max_count matching lines
+    matches: List[Tuple[int, int, int]] = []
+    line_number = 1
+    counted = 0
+    position = 0
+    while position < size and len(matches) < max_count:
+        match = regex.search(data, position)
+        if match is None:
+            break
+        start = data.rfind(b"\n", 0, match.start()) + 1
+        end = line_end(match.start())
+        position = end + 1
+        # Matches are per line: \s, \W or [^x] may have run into the next lines
+        if match.end() > end and regex.search(data, start, end) is None:
+            continue
+        line_number += data[counted:start].count(b"\n")
+        counted = start
+        matches.append((line_number, start, end))
+
+    messages = []
+    emitted = 0
+    for position, (line_number, start, end) in enumerate(matches):
+        before = []
+        line_start = start
+        # emitted is a line start, so the lines before this one never reach below it
+        while len(before) < context_lines and line_start > emitted:
+            previous_start = data.rfind(b"\n", 0, line_start - 1) + 1
+            before.append((previous_start, line_start - 1))
+            line_start = previous_start
+        for offset, (context_start, context_end) in enumerate(reversed(before)):
+            messages.append(_message("context", path, line_number - len(before) + offset, data[context_start:context_end]))
+        messages.append(_message("match", path, line_number, data[start:end]))
+        emitted = end + 1
+
+        limit = matches[position + 1][1] if position + 1 < len(matches) else size
+        for offset in range(1, context_lines + 1):
+            if emitted >= limit:
+                break
+            context_end = line_end(emitted)
+            messages.append(_message("context", path, line_number + offset, data[emitted:context_end]))
+            emitted = context_end + 1
+    return messages
+
+
+def search_file(path: str, pattern: str, ignore_case: bool, max_count: int, context_lines: int) -> List[dict]:
+    """
+    Search one file, memory-mapped; binary and unreadable files have no matches
+
+    Returns:
+        Match and context messages, in `rg --json` shape
+    """
+    regex = _compile(pattern, ignore_case)
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b"\0", 0, BINARY_SNIFF_BYTES) >= 0:
+                    return []
+                return _scan(path, data, regex, max_count, context_lines)
+    except (OSError, ValueError):
+        return []
+
+
+def _search_chunk(paths: List[str], pattern: str, ignore_case: bool, max_count: int, context_lines: int) -> List[dict]:
+    messages = []
+    for path in paths:
+        messages.extend(search_file(path, pattern, ignore_case, max_count, context_lines))
+    return messages
+
+
+def _chunks(paths: List[str]) -> Iterator[List[str]]:
+    """
+    Split files into pool tasks of about CHUNK_BYTES each
+    """
+    chunk, chunk_bytes = [], 0
+    for path in paths:
+        try:
+            chunk_bytes += os.path.getsize(path)
+        except OSError:
+            pass
+        chunk.append(path)
+        if chunk_bytes >= CHUNK_BYTES or len(chunk) >= MAX_CHUNK_FILES:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        yield chunk
+
+
+# Pool of the searches, kept for the process, and the tasks checking its workers are up
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_warmup: List[Future] = []
+_pool_lock = threading.Lock()
+
+
+def _search_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    The search pool once its workers are up, else None
+
+    The first call starts the workers in the background, so no search
+    waits for them: a worker process imports the main module of the
+    program, which for the CLI is the whole agent stack.
+    """
+    global _pool, _pool_workers, _pool_warmup
+    with _pool_lock:
+        if _pool is None or _pool_workers != SEARCH_WORKERS:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # Forking would copy the caller's threads and locks (model clients, the tool executor) mid-use
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=SEARCH_WORKERS, mp_context=multiprocessing.get_context(start_method))
+            _pool_workers = SEARCH_WORKERS
+            _pool_warmup = [_pool.submit(os.getpid) for _ in range(SEARCH_WORKERS)]
+        if not all(future.done() for future in _pool_warmup):
+            return None
+        return _pool
+
+
+def _drop_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def python_search(paths: List[str], pattern: str, on_message: Callable[[dict], bool],
+                  ignore_case: bool = False, max_count: int = 100, context_lines: int = 0) -> None:
+    """
+    Search files with Python regexes, streaming the results
+
+    Large searches are split across a process pool kept for the process,
+    once its workers are up; results of a task are passed on as soon as it
+    finishes, and the queued tasks are cancelled once `on_message` asks to
+    stop. Python's regex syntax applies, which
+    covers the common ripgrep patterns.
+
+    Args:
+        paths: Files to search
+        pattern: Regular expression pattern
+        on_message: Receives each match or context message (`rg --json` shape); returns False to stop
+        ignore_case: Whether to ignore case
+        max_count: Maximum number of matching lines per file
+        context_lines: Lines of context around each match
+
+    Raises:
+        re.error: For a pattern Python cannot compile
+    """
+    _compile(pattern, ignore_case)
+    total_bytes = 0
+    for path in paths:
+        try:
+            total_bytes += os.path.getsize(path)
+        except OSError:
+            pass
+        if total_bytes >= MIN_POOL_BYTES:
+            break
+
+    pool = _search_pool() if total_bytes >= MIN_POOL_BYTES and SEARCH_WORKERS >= 2 else None
+    if pool is None:
+        for path in paths:
+            for message in search_file(path, pattern, ignore_case, max_count, context_lines):
+                if not on_message(message):
+                    return
+        return
+
+    pending = {
+        pool.submit(_search_chunk, chunk, pattern, ignore_case, max_count, context_lines)
+        for chunk in _chunks(paths)
+    }
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for message in future.result():
+                    if not on_message(message):
+                        return
+    except BrokenProcessPool:
+        _drop_pool(pool)
+        raise
+    finally:
+        # The pool is kept: drop the queued tasks, the workers finish the chunk in hand
+        for future in pending:
+            future.cancel()
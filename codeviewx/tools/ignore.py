@@ -0,0 +1,134 @@
+"""
+Ignore rules module
+
+Shared ignore list and a lightweight `.gitignore` matcher used by the
+directory walking tools.
+"""
+
+import os
+import re
+import fnmatch
+from typing import List, Optional, Sequence, Tuple
+
+
+DEFAULT_IGNORE_PATTERNS = [
+    ".git", ".venv", "venv", "env", "node_modules",
+    "__pycache__", ".pytest_cache", ".mypy_cache",
+    "dist", "build", "target", ".cache", "*.pyc",
+    ".DS_Store", "Thumbs.db", "*.log"
+]
+
+IGNORE_FILENAMES = (".gitignore", ".ignore")
+
+
+def _compile(pattern: str) -> "re.Pattern":
+    # fnmatch's "*" also matches "/", so "**" needs no special handling
+    return re.compile(fnmatch.translate(pattern))
+
+
+class IgnoreRules:
+    """
+    Ordered gitignore-style rules scoped to a directory tree
+
+    Supports comments, `!` negation (last matching rule wins), trailing `/`
+    for directory-only rules, and anchored patterns containing `/`. Rules
+    from nested ignore files only apply below the directory they live in.
+
+    Examples:
+        rules = IgnoreRules.for_directory("/path/to/project")
+        rules.is_ignored("node_modules", is_dir=True)   # True
+        sub_rules = rules.descend("src")                 # picks up src/.gitignore
+        sub_rules.is_ignored("src/generated.py", is_dir=False)
+    """
+
+    __slots__ = ("root", "rules")
+
+    def __init__(self, root: str, rules: Optional[List[Tuple[str, "re.Pattern", bool, bool, bool]]] = None):
+        """
+        Args:
+            root: Absolute root directory the relative paths are based on
+            rules: Parsed rules as (base, regex, negate, dir_only, anchored)
+        """
+        self.root = root
+        self.rules = rules or []
+
+    @classmethod
+    def for_directory(cls, root: str, patterns: Optional[Sequence[str]] = None) -> "IgnoreRules":
+        """
+        Build the rules for a tree root: default patterns plus its own ignore files
+
+        Args:
+            root: Root directory
+            patterns: Base patterns (default: DEFAULT_IGNORE_PATTERNS)
+        """
+        rules = cls(os.path.abspath(root))
+        rules._add_patterns("", DEFAULT_IGNORE_PATTERNS if patterns is None else patterns)
+        return rules.descend("")
+
+    def _add_patterns(self, base: str, patterns: Sequence[str]) -> None:
+        for line in patterns:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line:
+                self.rules.append((base, _compile(line), negate, dir_only, anchored))
+
+    def descend(self, rel_dir: str) -> "IgnoreRules":
+        """
+        Get the rules that apply inside `rel_dir`, loading its ignore files if any
+
+        Args:
+            rel_dir: Directory relative to the root ("" for the root itself)
+
+        Returns:
+            The same instance if the directory has no ignore files, else an extended copy
+        """
+        patterns = []
+        for filename in IGNORE_FILENAMES:
+            try:
+                with open(os.path.join(self.root, rel_dir, filename), "r", encoding="utf-8") as f:
+                    patterns.extend(f.readlines())
+            except (OSError, UnicodeDecodeError):
+                continue
+        if not patterns:
+            return self
+
+        child = IgnoreRules(self.root, list(self.rules))
+        child._add_patterns(rel_dir, patterns)
+        return child
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check a path against the rules
+
+        Args:
+            rel_path: Path relative to the root, using "/" separators
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the path is ignored
+        """
+        name = rel_path.rsplit("/", 1)[-1]
+        ignored = False
+        for base, regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if anchored:
+                if base:
+                    if not rel_path.startswith(base + "/"):
+                        continue
+                    target = rel_path[len(base) + 1:]
+                else:
+                    target = rel_path
+            else:
+                target = name
+            if regex.match(target):
+                ignored = not negate
+        return ignored
@@ -0,0 +1,110 @@
+"""
+Line index module
+
+Byte offsets of line starts in large files, found with mmap and kept
+between calls, so windowed reads of a big file seek straight to their
+first line instead of scanning the file again.
+"""
+
+import os
+import mmap
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+MAX_INDEXED_FILES = 64
+COUNT_CHUNK_BYTES = 1024 * 1024
+
+
+class LineIndex:
+    """
+    Start offsets of the lines of one file, built lazily
+
+    Lines are counted like `content.split('\\n')`: a file ending in a
+    newline has an empty last line. The index only scans as far as the
+    highest line asked for, and remembers where it stopped.
+
+    Examples:
+        index = line_index("bundle.min.js")
+        start, end = index.start_of(1000), index.start_of(1200)
+    """
+
+    def __init__(self, path: str, stamp: Tuple[int, int]):
+        """
+        Args:
+            path: Absolute file path
+            stamp: Modification time (ns) and size the index is valid for
+        """
+        self.path = path
+        self.stamp = stamp
+        self.size = stamp[1]
+        self._starts = array('q', [0])
+        self._complete = self.size == 0
+        self._line_count: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def line_count(self) -> int:
+        """
+        Number of lines in the file
+        """
+        with self._lock:
+            if self._line_count is None:
+                if self._complete:
+                    self._line_count = len(self._starts)
+                else:
+                    newlines = 0
+                    with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        for position in range(0, self.size, COUNT_CHUNK_BYTES):
+                            newlines += mm[position:position + COUNT_CHUNK_BYTES].count(b'\n')
+                    self._line_count = newlines + 1
+            return self._line_count
+
+    def start_of(self, line: int) -> int:
+        """
+        Byte offset where a line starts (0-based), or the file size past the last line
+        """
+        with self._lock:
+            if line < len(self._starts):
+                return self._starts[line]
+            if not self._complete:
+                with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    position = self._starts[-1]
+                    while len(self._starts) <= line:
+                        newline = mm.find(b'\n', position)
+                        if newline < 0:
+                            self._complete = True
+                            break
+                        position = newline + 1
+                        self._starts.append(position)
+            return self._starts[line] if line < len(self._starts) else self.size
+
+
+_indexes: "OrderedDict[str, LineIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def line_index(path: str) -> LineIndex:
+    """
+    Line index of a file, reused while its modification time and size are unchanged
+
+    Args:
+        path: File path
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None or index.stamp != stamp:
+            index = LineIndex(path, stamp)
+            _indexes[path] = index
+        _indexes.move_to_end(path)
+        while len(_indexes) > MAX_INDEXED_FILES:
+            _indexes.popitem(last=False)
+        return index
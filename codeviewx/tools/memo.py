@@ -0,0 +1,164 @@
+"""
+Tool memoization module
+
+Run-scoped memo of read-only tool results, so an agent that reads the
+same README or repeats a search pattern does not go back to the disk or
+spawn ripgrep again.
+"""
+
+import os
+import json
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+
+DEFAULT_MAX_ENTRIES = 1024
+
+# Tool argument holding the path whose modification time validates a result
+PATH_ARGUMENTS = {
+    "read_real_file": "file_path",
+    "list_real_directory": "directory",
+}
+# Results that depend on many files; invalidated by any write or command in the run
+TREE_TOOLS = ("ripgrep_search", "read_real_files", "list_real_tree")
+WRITE_TOOLS = ("write_real_file",)
+COMMAND_TOOLS = ("execute_command",)
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Modification time and size of a path, None if it does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ToolMemo:
+    """
+    Memo of tool results shared by the conversations of one run
+
+    `read_real_file` and `list_real_directory` results are reused while
+    the modification time and size of their file or directory are
+    unchanged. `ripgrep_search`, `read_real_files` and `list_real_tree` results are reused until a file is
+    written or a command is run through the tools. A write through
+    `write_real_file` also drops the entries of the written file and of
+    its directory right away, so changes within the filesystem's
+    timestamp resolution are not missed. Changes made outside the run's
+    tools are only noticed through modification times.
+
+    Examples:
+        memo = ToolMemo()
+        tools = [memo.wrap(tool) for tool in [read_real_file, ripgrep_search, write_real_file]]
+        agent = create_deep_agent(tools, prompt)
+        print(memo.hits, memo.misses, memo.hit_rate)
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Results kept at most; the least recently used are dropped first
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.tool_hits: Dict[str, int] = {}
+        self.tool_misses: Dict[str, int] = {}
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, str, Optional[str]]]" = OrderedDict()
+        # Bumped by every write or command; part of the stamp of tree-wide results
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of memoizable calls answered from the memo
+        """
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def _stamp(self, name: str, arguments: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        """
+        Validity stamp of a result and the absolute path it depends on, if any
+        """
+        if name in PATH_ARGUMENTS:
+            path = os.path.abspath(str(arguments.get(PATH_ARGUMENTS[name]) or "."))
+            return _stat(path), path
+        return self._generation, None
+
+    def _invalidate(self, written_path: Optional[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            if written_path is None:
+                return
+            written_path = os.path.abspath(written_path)
+            affected = (written_path, os.path.dirname(written_path))
+            for key in [key for key, (_, _, path) in self._entries.items() if path in affected]:
+                del self._entries[key]
+
+    def call(self, name: str, function: Callable[..., str], arguments: Dict[str, Any]) -> str:
+        """
+        Run a tool function through the memo
+
+        Args:
+            name: Tool name
+            function: Underlying tool function
+            arguments: Call arguments, defaults included
+        """
+        if name in WRITE_TOOLS or name in COMMAND_TOOLS:
+            try:
+                return function(**arguments)
+            finally:
+                self._invalidate(arguments.get("file_path") if name in WRITE_TOOLS else None)
+        if name not in PATH_ARGUMENTS and name not in TREE_TOOLS:
+            return function(**arguments)
+
+        key = (name, json.dumps(arguments, sort_keys=True, default=str))
+        stamp, path = self._stamp(name, arguments)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.tool_hits[name] = self.tool_hits.get(name, 0) + 1
+                return entry[1]
+            self.misses += 1
+            self.tool_misses[name] = self.tool_misses.get(name, 0) + 1
+
+        result = function(**arguments)
+        with self._lock:
+            self._entries[key] = (stamp, result, path)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def wrap(self, tool: BaseTool) -> BaseTool:
+        """
+        Copy of a function tool whose calls go through the memo
+
+        The copy keeps the tool's name, description and argument schema,
+        so the model and the run's callbacks see the same tool.
+        """
+        function = tool.func
+        signature = inspect.signature(function)
+        name = tool.name
+
+        def memoized(**kwargs: Any) -> str:
+            bound = signature.bind(**kwargs)
+            bound.apply_defaults()
+            return self.call(name, function, dict(bound.arguments))
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            func=memoized,
+            return_direct=tool.return_direct
+        )
@@ -2,15 +2,175 @@
 Code search tool module
 """
 
-from ripgrepy import Ripgrepy
+import os
+import json
+import base64
+import fnmatch
+import shutil
+import subprocess
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
 from langchain_core.tools import tool
 
+from .fileindex import find_index
+from .grep import python_search, search_paths, type_globs
+from .ignore import DEFAULT_IGNORE_PATTERNS
+
+
+# Candidate files passed to one ripgrep process
+MAX_PATHS_PER_CALL = 1000
+# Longest line text shown in results; minified files have lines of megabytes
+MAX_LINE_CHARS = 300
+
+
+@lru_cache(maxsize=1)
+def _type_globs() -> dict:
+    """
+    File name globs of ripgrep's file types, from `rg --type-list`
+    """
+    output = subprocess.run(["rg", "--type-list"], capture_output=True, text=True).stdout
+    types = {}
+    for line in output.splitlines():
+        name, _, globs = line.partition(":")
+        types[name.strip()] = tuple(pattern.strip() for pattern in globs.split(","))
+    return types
+
+
+def _indexed_candidates(pattern: str, path: str, file_type: Optional[str]) -> Optional[List[str]]:
+    """
+    Files the run's search index narrows a search to, None to search the whole path
+    """
+    index = find_index(path)
+    search_index = index.search_index if index is not None else None
+    if search_index is None:
+        return None
+    candidates = search_index.candidates(pattern, path)
+    if candidates is None or not file_type:
+        return candidates
+    # Explicit paths bypass ripgrep's type filter: apply it here
+    if shutil.which("rg") is not None:
+        globs: Tuple[str, ...] = _type_globs().get(file_type, ())
+    else:
+        globs = tuple(type_globs(file_type) or ())
+    if not globs:
+        return None
+    return [
+        candidate for candidate in candidates
+        if any(fnmatch.fnmatch(os.path.basename(candidate), glob) for glob in globs)
+    ]
+
+
+def _text(data: dict) -> str:
+    """
+    Text of a path or line of ripgrep's JSON output, which base64-encodes non-UTF-8 data
+    """
+    if "text" in data:
+        return data["text"]
+    return base64.b64decode(data.get("bytes", "")).decode('utf-8', errors='replace')
+
+
+class _SearchResults:
+    """
+    Matching lines of a search grouped per file, up to a global number of matches
+
+    Fed the messages of `rg --json` one at a time. Once `max_count` matches
+    are collected, the trailing context of the last match is still taken;
+    anything past it (another match, or the context leading to one) ends
+    the search.
+    """
+
+    def __init__(self, max_count: int, context_lines: int = 0):
+        self.max_count = max_count
+        self.context_lines = context_lines
+        self.files: Dict[str, List[Tuple[int, str, str]]] = {}
+        self.matches = 0
+        self.truncated = False
+        self._last_path: Optional[str] = None
+        self._last_match_line = 0
+
+    def add(self, message: dict) -> bool:
+        """
+        Take one message of ripgrep's JSON output
+
+        Returns:
+            False once the search should stop
+        """
+        kind = message.get("type")
+        if kind not in ("match", "context"):
+            return True
+        data = message["data"]
+        path = _text(data["path"])
+        if self.matches >= self.max_count and (
+            kind == "match" or path != self._last_path
+            or data["line_number"] > self._last_match_line + self.context_lines
+        ):
+            self.truncated = True
+            return False
+        if kind == "match":
+            self.matches += 1
+            self._last_match_line = data["line_number"]
+        text = _text(data["lines"]).rstrip("\r\n")
+        if len(text) > MAX_LINE_CHARS:
+            text = text[:MAX_LINE_CHARS] + " ..."
+        separator = ":" if kind == "match" else "-"
+        self.files.setdefault(path, []).append((data["line_number"], separator, text))
+        self._last_path = path
+        return True
+
+    def format(self, pattern: str) -> str:
+        """
+        Render the results: a summary line, then the lines of each file under its name
+        """
+        if not self.matches:
+            return f"No matches found for '{pattern}'"
+        summary = f"Found {self.matches} matches in {len(self.files)} files"
+        if self.truncated:
+            summary += f" (stopped at max_count={self.max_count}; narrow the pattern or path to see the rest)"
+        output = [summary]
+        for path, lines in self.files.items():
+            output.append(f"File: {path}")
+            previous = None
+            for line_number, separator, text in lines:
+                if self.context_lines and previous is not None and line_number > previous + 1:
+                    output.append("--")
+                output.append(f"{line_number}{separator}{text}")
+                previous = line_number
+        return "\n".join(output)
+
+
+def _stream_search(command: List[str], results: _SearchResults) -> Optional[str]:
+    """
+    Run one `rg --json` process into `results`, killing it once they are complete
+
+    Returns:
+        Error message of a failed search, None on success
+    """
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, encoding='utf-8', errors='replace'
+    )
+    stopped = False
+    try:
+        for line in process.stdout:
+            if not results.add(json.loads(line)):
+                stopped = True
+                break
+    finally:
+        if process.poll() is None:
+            process.kill()
+        stderr = process.communicate()[1]
+    if not stopped and process.returncode > 1:
+        return stderr.strip() or f"rg exited with status {process.returncode}"
+    return None
+
 
 @tool
 def ripgrep_search(pattern: str, path: str = ".", 
                    file_type: str = None, 
                    ignore_case: bool = False,
-                   max_count: int = 100) -> str:
+                   max_count: int = 100,
+                   context_lines: int = 0) -> str:
     """
     Search for text patterns in files using ripgrep (faster than grep)
     
@@ -19,58 +179,63 @@ def ripgrep_search(pattern: str, path: str = ".",
         path: Search path, defaults to current directory
         file_type: File type filter (e.g., 'py', 'js', 'md'), searches all files if None
         ignore_case: Whether to ignore case, defaults to False
-        max_count: Maximum number of results to return, defaults to 100
+        max_count: Maximum number of matching lines to return across all files, defaults to 100
+        context_lines: Lines of context shown before and after each match, defaults to 0
     
     Returns:
-        Search results, including matched file paths and content
+        Search results: a summary line, then the matching lines of each file
+        under a "File: <path>" header, as "<line>:<text>" (context lines as
+        "<line>-<text>", gaps between groups as "--")
     
     Examples:
         - ripgrep_search("def main", ".", "py") - Search for "def main" in all Python files
         - ripgrep_search("TODO", "/path/to/project") - Search for all lines containing TODO
         - ripgrep_search("import.*Agent", ".", "py", ignore_case=True) - Case-insensitive import search
+        - ripgrep_search("def run", "src", context_lines=3) - Show three lines around each match
     
     Features:
         - Automatically ignores .git, .venv, node_modules, etc.
         - Supports regular expressions
         - Shows line numbers and context
         - Much faster than traditional grep
-        - Uses ripgrepy library, requires ripgrep installed: brew install ripgrep
+        - Stops ripgrep as soon as max_count matches are found
+        - Only searches files that can contain the pattern's literal text when
+          the run keeps a search index
+        - Falls back to a built-in multiprocess Python search (Python regex
+          syntax) when ripgrep is not installed: brew install ripgrep
     """
+    command = ["rg", "--json", "--no-messages", "--max-count", str(max_count)]
+    if ignore_case:
+        command.append("--ignore-case")
+    if context_lines > 0:
+        command += ["--context", str(context_lines)]
+    results = _SearchResults(max_count, context_lines)
+    error = None
+    
     try:
-        rg = Ripgrepy(pattern, path)
-        
-        rg = rg.line_number()
-        rg = rg.with_filename()
-        rg = rg.max_count(max_count)
-        
-        if ignore_case:
-            rg = rg.ignore_case()
-        
-        if file_type:
-            rg = rg.type_add(file_type)
-        
-        ignore_patterns = [
-            ".git", ".venv", "venv", "env", "node_modules", 
-            "__pycache__", ".pytest_cache", ".mypy_cache",
-            "dist", "build", "target", ".cache", "*.pyc",
-            ".DS_Store", "Thumbs.db", "*.log"
-        ]
-        for ignore_pattern in ignore_patterns:
-            rg = rg.glob(f"!{ignore_pattern}")
-        
-        result = rg.run().as_string
-        
-        if result.strip():
-            lines = result.strip().split('\n')
-            if len(lines) > max_count:
-                return result + f"\n\n... (Too many results, truncated to first {max_count} lines)"
-            return result
+        candidates = _indexed_candidates(pattern, path, file_type)
+        if shutil.which("rg") is None:
+            paths = candidates if candidates is not None else search_paths(path, file_type)
+            python_search(paths, pattern, results.add, ignore_case, max_count, context_lines)
+        elif candidates is not None:
+            # Explicit files: ripgrep applies no type or ignore filters to them
+            for start in range(0, len(candidates), MAX_PATHS_PER_CALL):
+                error = _stream_search(command + ["--", pattern] + candidates[start:start + MAX_PATHS_PER_CALL], results)
+                if error or results.truncated:
+                    break
         else:
-            return f"No matches found for '{pattern}'"
+            if file_type:
+                command += ["--type", file_type]
+            for ignore_pattern in DEFAULT_IGNORE_PATTERNS:
+                command += ["--glob", f"!{ignore_pattern}"]
+            error = _stream_search(command + ["--", pattern, path], results)
+        
+        if error:
+            return f"Search error: {error}"
+        return results.format(pattern)
     
+    except FileNotFoundError:
+        return "Error: ripgrep (rg) is not installed. Please install it: brew install ripgrep (macOS) or apt install ripgrep (Linux)"
     except Exception as e:
-        error_msg = str(e)
-        if "rg" in error_msg.lower() and ("not found" in error_msg.lower() or "cannot find" in error_msg.lower()):
-            return "Error: ripgrep (rg) is not installed. Please install it: brew install ripgrep (macOS) or apt install ripgrep (Linux)"
-        return f"Search error: {error_msg}"
+        return f"Search error: {str(e)}"
 
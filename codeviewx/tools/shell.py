@@ -0,0 +1,333 @@
+"""
+Shell session module
+
+Runs the commands of `execute_command`: each in a new shell, or in a
+long-lived shell session kept for a run, which saves the fork/exec of a
+shell per command and keeps the working directory between calls. Output
+is read as it is produced into a bounded buffer keeping its first and
+last bytes, so a command printing gigabytes costs a fixed amount of memory.
+"""
+
+import os
+import uuid
+import shlex
+import shutil
+import signal
+import tempfile
+import selectors
+import threading
+import subprocess
+import time
+from typing import Dict, Optional, Tuple
+
+
+DEFAULT_COMMAND_TIMEOUT = 30
+MAX_COMMAND_TIMEOUT = 600
+# Output kept per stream (stdout, stderr): the first half and the last half
+DEFAULT_OUTPUT_BYTES = 64 * 1024
+MAX_OUTPUT_BYTES = 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class CappedOutput:
+    """
+    First and last bytes of a stream, `max_bytes` in total
+
+    Examples:
+        output = CappedOutput(10)
+        output.write(b"0123456789abcdef")
+        output.text()   # "01234\\n... [6 bytes omitted] ...\\nbcdef"
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        head_room = self.max_bytes - self.max_bytes // 2 - len(self.head)
+        if head_room > 0:
+            self.head += data[:head_room]
+            data = data[head_room:]
+        if data:
+            self.tail += data
+            excess = len(self.tail) - self.max_bytes // 2
+            if excess > 0:
+                del self.tail[:excess]
+
+    def text(self) -> str:
+        omitted = self.total - len(self.head) - len(self.tail)
+        if not omitted:
+            return (self.head + self.tail).decode('utf-8', errors='replace')
+        return (
+            self.head.decode('utf-8', errors='replace')
+            + f"\n... [{omitted} bytes omitted] ...\n"
+            + self.tail.decode('utf-8', errors='replace')
+        )
+
+
+def _drain(stream, output: CappedOutput) -> None:
+    for chunk in iter(lambda: stream.read1(READ_CHUNK_BYTES), b""):
+        output.write(chunk)
+
+
+def _kill(process: subprocess.Popen) -> None:
+    """
+    Kill a process started in its own session, with the commands it started
+    """
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        pass
+    process.wait()
+
+
+def run_command(command: str, working_dir: Optional[str], timeout: float, max_bytes: int) -> Tuple[str, str, bool]:
+    """
+    Run a command in a new shell, streaming its output into capped buffers
+
+    Args:
+        command: Shell command
+        working_dir: Working directory, the current directory if None
+        timeout: Seconds before the command and its children are killed
+        max_bytes: Bytes kept of each of stdout and stderr
+
+    Returns:
+        (stdout, stderr, timed out)
+    """
+    process = subprocess.Popen(
+        command, shell=True, cwd=working_dir,
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        start_new_session=os.name == 'posix'
+    )
+    stdout, stderr = CappedOutput(max_bytes), CappedOutput(max_bytes)
+    readers = [
+        threading.Thread(target=_drain, args=(process.stdout, stdout), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill(process)
+    for reader in readers:
+        # Background processes left by the command may hold the pipes open
+        reader.join(timeout=1)
+    return stdout.text(), stderr.text(), timed_out
+
+
+class ShellSession:
+    """
+    Long-lived shell running the commands of a run one at a time
+
+    Each command runs in the shell itself, so `cd` and exported variables
+    carry over to the next one. Its stdin is /dev/null and its stderr goes
+    to a file read back afterwards; stdout is streamed until a marker
+    printed after the command. A command that times out or ends the shell
+    (`exit`, or a syntax error in a POSIX-mode shell) kills the session,
+    and the next command starts a new one in the session root. POSIX only.
+
+    Examples:
+        session = ShellSession("/path/to/project")
+        session.run("cd src", None, 30, 65536)
+        session.run("ls", None, 30, 65536)   # lists /path/to/project/src
+        session.close()
+    """
+
+    def __init__(self, root: str, shell: Optional[str] = None):
+        """
+        Args:
+            root: Directory the shell starts in
+            shell: Shell executable (default: bash, else /bin/sh)
+        """
+        self.root = os.path.abspath(root)
+        self.shell = shell or shutil.which("bash") or "/bin/sh"
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        descriptor, self._stderr_path = tempfile.mkstemp(prefix="codeviewx-stderr-")
+        os.close(descriptor)
+
+    def _start(self) -> subprocess.Popen:
+        self._process = subprocess.Popen(
+            [self.shell], cwd=self.root,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        return self._process
+
+    def _read_stderr(self, max_bytes: int) -> str:
+        stderr = CappedOutput(max_bytes)
+        try:
+            with open(self._stderr_path, 'rb') as f:
+                _drain(f, stderr)
+        except OSError:
+            pass
+        return stderr.text()
+
+    def run(self, command: str, working_dir: Optional[str], timeout: float, max_bytes: int) -> Tuple[str, str, bool]:
+        """
+        Run a command in the session
+
+        Args:
+            command: Shell command
+            working_dir: Directory to change to first; the session's current one if None
+            timeout: Seconds before the session is killed
+            max_bytes: Bytes kept of each of stdout and stderr
+
+        Returns:
+            (stdout, stderr, timed out)
+        """
+        with self._lock:
+            process = self._process
+            if process is None or process.poll() is not None:
+                process = self._start()
+
+            marker = f"__codeviewx_done_{uuid.uuid4().hex}__".encode()
+            script = f"eval {shlex.quote(command)}"
+            if working_dir:
+                script = f"cd -- {shlex.quote(working_dir)} && {script}"
+            script = (
+                f"{{ {script}\n}} </dev/null 2>{shlex.quote(self._stderr_path)}\n"
+                f"printf '\\n%s\\n' {marker.decode()}\n"
+            )
+            stdout = CappedOutput(max_bytes)
+            try:
+                process.stdin.write(script.encode('utf-8'))
+                process.stdin.flush()
+            except OSError:
+                self._process = None
+                return "", "Shell session ended", False
+
+            # The marker line follows a newline the output may not end with; hold back what could be its start
+            needle = b"\n" + marker + b"\n"
+            pending = b""
+            deadline = time.monotonic() + timeout
+            finished = timed_out = False
+            with selectors.DefaultSelector() as selector:
+                selector.register(process.stdout, selectors.EVENT_READ)
+                while not finished:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    if not selector.select(remaining):
+                        continue
+                    chunk = os.read(process.stdout.fileno(), READ_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    pending += chunk
+                    position = pending.find(needle)
+                    if position >= 0:
+                        stdout.write(pending[:position])
+                        finished = True
+                    elif len(pending) >= len(needle):
+                        stdout.write(pending[:-len(needle)])
+                        pending = pending[-len(needle):]
+
+            stderr = self._read_stderr(max_bytes)
+            if not finished:
+                stdout.write(pending)
+                if not timed_out:
+                    stderr += f"Shell session ended; the next command starts a new one in {self.root}\n"
+                _kill(process)
+                self._process = None
+            return stdout.text(), stderr, timed_out
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                _kill(self._process)
+            self._process = None
+        try:
+            os.remove(self._stderr_path)
+        except OSError:
+            pass
+
+
+class ShellSessions:
+    """
+    Shell sessions of a run, one per agent conversation
+
+    Each conversation (the main one, and every chapter writer in parallel
+    mode) gets its own shell on its first command, so a `cd` or an exported
+    variable never leaks into another and their commands do not wait on
+    each other. Conversations are named by their thread id, which is the
+    run id, or the run id and the part it writes as "<run id>:<part>".
+
+    Examples:
+        sessions = ShellSessions("20250101-120000-1a2b3c", "/path/to/project")
+        register_sessions(sessions)
+        find_session("20250101-120000-1a2b3c:architecture")   # that chapter's shell
+        unregister_sessions(sessions)
+        sessions.close()
+    """
+
+    def __init__(self, run_id: str, root: str, shell: Optional[str] = None):
+        """
+        Args:
+            run_id: Run identifier
+            root: Directory the shells start in
+            shell: Shell executable (default: bash, else /bin/sh)
+        """
+        self.run_id = run_id
+        self.root = os.path.abspath(root)
+        self.shell = shell
+        self._sessions: Dict[str, ShellSession] = {}
+        self._lock = threading.Lock()
+
+    def session(self, thread_id: str) -> ShellSession:
+        """
+        Session of a conversation, created on first use
+        """
+        with self._lock:
+            if thread_id not in self._sessions:
+                self._sessions[thread_id] = ShellSession(self.root, self.shell)
+            return self._sessions[thread_id]
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+# Sessions of the runs in progress, by run id
+_runs: Dict[str, ShellSessions] = {}
+_runs_lock = threading.Lock()
+
+
+def register_sessions(sessions: ShellSessions) -> None:
+    """
+    Make a run's conversations issue their commands in their shell sessions
+    """
+    with _runs_lock:
+        _runs[sessions.run_id] = sessions
+
+
+def unregister_sessions(sessions: ShellSessions) -> None:
+    with _runs_lock:
+        if _runs.get(sessions.run_id) is sessions:
+            del _runs[sessions.run_id]
+
+
+def find_session(thread_id: Optional[str]) -> Optional[ShellSession]:
+    """
+    Session of a conversation, or None if its run keeps no sessions
+
+    Args:
+        thread_id: Conversation thread id from the run config, None outside a run
+    """
+    if not thread_id:
+        return None
+    with _runs_lock:
+        sessions = _runs.get(thread_id.split(":", 1)[0])
+    return sessions.session(thread_id) if sessions is not None else None
@@ -0,0 +1,267 @@
+"""
+Trigram index module
+
+Optional on-disk index of the byte trigrams of the repository's files.
+`ripgrep_search` uses it to narrow a search to the files that can
+contain the pattern's literal text before handing them to ripgrep.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import FrozenSet, List, Optional, Set
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from .fileindex import FileIndex
+
+
+SEARCH_INDEX_FILENAME = "trigrams.sqlite3"
+SCHEMA_VERSION = 1
+# Larger files are not indexed and always searched
+MAX_INDEXED_FILE_BYTES = 1024 * 1024
+# Alternatives of a query kept before a part of the pattern is given up on
+MAX_ALTERNATIVES = 16
+
+# A query is a list of alternatives, each a set of trigrams a matching file must all contain
+Query = List[FrozenSet[int]]
+MATCH_ALL: Query = [frozenset()]
+
+
+def file_trigrams(data: bytes) -> Set[int]:
+    """
+    Trigrams of a file's bytes, ASCII-lowercased so one index serves case-insensitive searches
+    """
+    data = data.lower()
+    slices = {data[position:position + 3] for position in range(len(data) - 2)}
+    return {int.from_bytes(trigram, 'big') for trigram in slices}
+
+
+def _and(left: Query, right: Query) -> Query:
+    if left == MATCH_ALL:
+        return right
+    if right == MATCH_ALL:
+        return left
+    combined = [a | b for a in left for b in right]
+    if len(combined) > MAX_ALTERNATIVES:
+        # Either side alone is a weaker but still correct condition
+        return left if len(left) <= len(right) else right
+    return combined
+
+
+def _or(left: Query, right: Query) -> Query:
+    combined = left + right
+    if any(not alternative for alternative in combined) or len(combined) > MAX_ALTERNATIVES:
+        return MATCH_ALL
+    return combined
+
+
+def _literal(text: List[str]) -> Query:
+    data = "".join(text).encode('utf-8')
+    return [frozenset(file_trigrams(data))] if len(data) >= 3 else MATCH_ALL
+
+
+def _sequence(items) -> Query:
+    """
+    Query of a parsed regex sequence: the trigrams of its literal runs, combined
+    """
+    query = MATCH_ALL
+    run: List[str] = []
+    for op, argument in items:
+        name = str(op)
+        if name == "LITERAL" and argument < 128:
+            run.append(chr(argument))
+            continue
+        if name == "AT":
+            # Anchors and word boundaries take no space: the run goes on
+            continue
+        query = _and(query, _literal(run))
+        run = []
+        if name == "SUBPATTERN":
+            query = _and(query, _sequence(argument[-1]))
+        elif name == "BRANCH":
+            alternatives = None
+            for branch in argument[1]:
+                branch_query = _sequence(branch)
+                alternatives = branch_query if alternatives is None else _or(alternatives, branch_query)
+            query = _and(query, alternatives or MATCH_ALL)
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") and argument[0] >= 1:
+            query = _and(query, _sequence(argument[2]))
+        # Anything else (classes, any character, optional parts, non-ASCII) matches unknown text
+    return _and(query, _literal(run))
+
+
+def pattern_query(pattern: str) -> Optional[Query]:
+    """
+    Trigram query a file must satisfy to contain a match of a regex
+
+    Non-ASCII characters are treated like wildcards, since case-insensitive
+    matching folds them beyond ASCII lowercasing.
+
+    Args:
+        pattern: Regular expression in the syntax shared by ripgrep and Python
+
+    Returns:
+        The query, or None if the pattern cannot narrow the search (no literal
+        text of three characters, or syntax Python does not parse)
+    """
+    try:
+        query = _sequence(sre_parse.parse(pattern))
+    except Exception:
+        return None
+    return None if query == MATCH_ALL else query
+
+
+class TrigramIndex:
+    """
+    SQLite-backed trigram posting lists of the files of a FileIndex
+
+    The index lives in the run state directory and is kept between runs:
+    `refresh` only re-reads the files whose modification time or size
+    changed since the last run, and forgets removed ones. Files above
+    `MAX_INDEXED_FILE_BYTES` are recorded without trigrams and are
+    candidates of every search.
+
+    Examples:
+        search_index = TrigramIndex(".codeviewx/trigrams.sqlite3", file_index)
+        search_index.refresh()
+        search_index.candidates("class \\w+Controller", "src")   # ["src/api/user.py", ...]
+    """
+
+    def __init__(self, database_path: str, file_index: FileIndex):
+        """
+        Open the index, creating the database if needed
+
+        Args:
+            database_path: SQLite database file
+            file_index: Run's file index, listing the files to index
+        """
+        self.database_path = database_path
+        self.file_index = file_index
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS postings;"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, indexed INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "trigram INTEGER NOT NULL, file_id INTEGER NOT NULL, "
+            "PRIMARY KEY (trigram, file_id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id)")
+        self._conn.commit()
+
+    def refresh(self) -> int:
+        """
+        Bring the index in line with the file index
+
+        Returns:
+            Number of files (re)indexed
+        """
+        root = self.file_index.root
+        updated = 0
+        with self._lock:
+            stored = {
+                path: (file_id, mtime_ns, size)
+                for file_id, path, mtime_ns, size in self._conn.execute("SELECT id, path, mtime_ns, size FROM files")
+            }
+            self._conn.execute("PRAGMA synchronous = OFF")
+            for path, size, mtime_ns, _ in self.file_index.files():
+                previous = stored.pop(path, None)
+                if previous is not None and previous[1:] == (mtime_ns, size):
+                    continue
+                if previous is not None:
+                    self._conn.execute("DELETE FROM postings WHERE file_id = ?", (previous[0],))
+                    self._conn.execute("DELETE FROM files WHERE id = ?", (previous[0],))
+                trigrams = None
+                if size <= MAX_INDEXED_FILE_BYTES:
+                    try:
+                        with open(os.path.join(root, path), 'rb') as f:
+                            trigrams = file_trigrams(f.read(MAX_INDEXED_FILE_BYTES + 1))
+                    except OSError:
+                        trigrams = None
+                file_id = self._conn.execute(
+                    "INSERT INTO files (path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?)",
+                    (path, mtime_ns, size, int(trigrams is not None))
+                ).lastrowid
+                if trigrams:
+                    self._conn.executemany(
+                        "INSERT INTO postings (trigram, file_id) VALUES (?, ?)",
+                        ((trigram, file_id) for trigram in trigrams)
+                    )
+                updated += 1
+            for file_id, _, _ in stored.values():
+                self._conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            self._conn.commit()
+        return updated
+
+    def _matching_paths(self, query: Query, prefix: str) -> Set[str]:
+        """
+        Paths below `prefix` whose trigrams satisfy the query, plus the files without trigrams
+        """
+        below = "(? = '' OR substr(files.path, 1, length(?)) = ?)"
+        paths = {path for path, in self._conn.execute(
+            f"SELECT path FROM files WHERE indexed = 0 AND {below}", (prefix,) * 3
+        )}
+        for alternative in query:
+            trigrams = sorted(alternative)
+            placeholders = ",".join("?" * len(trigrams))
+            paths.update(path for path, in self._conn.execute(
+                "SELECT files.path FROM files JOIN ("
+                f"SELECT file_id FROM postings WHERE trigram IN ({placeholders}) "
+                "GROUP BY file_id HAVING COUNT(*) = ?"
+                f") AS matches ON files.id = matches.file_id WHERE {below}",
+                (*trigrams, len(trigrams), prefix, prefix, prefix)
+            ))
+        return paths
+
+    def candidates(self, pattern: str, path: str) -> Optional[List[str]]:
+        """
+        Files below a directory that may contain a match, as ripgrep would name them
+
+        Hidden files are left out, like ripgrep does when walking a directory.
+        Files written during the run are always candidates, their indexed
+        trigrams being those of the content they had before.
+
+        Args:
+            pattern: Search regex
+            path: Directory searched
+
+        Returns:
+            Sorted candidate paths (`path` joined with the path below it), or None
+            when the search cannot be narrowed: the pattern has no usable literal
+            text, the directory is not indexed, or a command changed it since the snapshot
+        """
+        rel_dir = self.file_index.relative(path)
+        if rel_dir is None or not self.file_index.settled(rel_dir):
+            return None
+        query = pattern_query(pattern)
+        if query is None:
+            return None
+
+        prefix = rel_dir + "/" if rel_dir else ""
+        with self._lock:
+            paths = self._matching_paths(query, prefix)
+        paths.update(self.file_index.written(rel_dir))
+        candidates = []
+        for rel_path in paths:
+            below = rel_path[len(prefix):]
+            if not any(part.startswith(".") for part in below.split("/")):
+                candidates.append(os.path.join(path, below))
+        return sorted(candidates)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
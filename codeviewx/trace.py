@@ -0,0 +1,243 @@
+"""
+Trace export module
+
+Records a timeline of a generation run (graph steps, model calls, tool
+calls and the generator's own work) and writes it as Chrome trace event
+JSON, viewable in https://ui.perfetto.dev or chrome://tracing.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .usage import cache_read_tokens, cache_write_tokens
+
+
+MAX_ARGUMENT_CHARS = 200
+DEFAULT_LANE = "main"
+
+
+def _short(value: Any) -> Any:
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    if len(text) > MAX_ARGUMENT_CHARS:
+        return f"{text[:MAX_ARGUMENT_CHARS]}... ({len(text)} chars)"
+    return text
+
+
+def thread_lane(thread_id: Optional[str]) -> str:
+    """
+    Get the trace track name of an agent conversation
+
+    Args:
+        thread_id: Checkpoint thread id, `run_id` or `run_id:<part>`
+
+    Returns:
+        The part name (e.g. a chapter), or "main" for the run's main conversation
+    """
+    if thread_id and ':' in str(thread_id):
+        return str(thread_id).split(':', 1)[1]
+    return DEFAULT_LANE
+
+
+def _lane(metadata: Optional[Dict[str, Any]]) -> str:
+    # One lane per agent conversation (e.g. each parallel chapter)
+    return thread_lane((metadata or {}).get('thread_id'))
+
+
+class TraceRecorder(BaseCallbackHandler):
+    """
+    Callback handler recording model, tool and graph step spans
+
+    Spans are grouped in one track per agent conversation; spans that
+    overlap within a conversation (e.g. concurrent tool calls) are spread
+    over numbered sub-tracks. Model spans carry token counts, tool spans
+    their (truncated) arguments and result size.
+
+    Examples:
+        tracer = TraceRecorder()
+        agent.invoke(inputs, config={"callbacks": [tracer]})
+        with tracer.span("update manifest"):
+            manifest.save()
+        tracer.save("trace.json")
+    """
+
+    # Record timestamps when events happen, not when an executor gets to them
+    run_inline = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self._pending: Dict[UUID, Tuple[str, str, float, Tuple[str, int], Dict[str, Any]]] = {}
+        self._busy: Dict[str, List[bool]] = {}
+        self._tids: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        return (time.perf_counter() - self.started) * 1e6
+
+    def _open(self, lane: str) -> Tuple[str, int]:
+        with self._lock:
+            slots = self._busy.setdefault(lane, [])
+            slot = next((index for index, busy in enumerate(slots) if not busy), len(slots))
+            if slot == len(slots):
+                slots.append(True)
+            slots[slot] = True
+            return lane, slot
+
+    def _close(self, track: Tuple[str, int], name: str, category: str, start: float, args: Dict[str, Any]) -> None:
+        end = self._now()
+        with self._lock:
+            lane, slot = track
+            self._busy[lane][slot] = False
+            if track not in self._tids:
+                self._tids[track] = len(self._tids) + 1
+            self.events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round(start, 1),
+                "dur": round(end - start, 1),
+                "pid": 1,
+                "tid": self._tids[track],
+                "args": args,
+            })
+
+    def _start(self, run_id: UUID, name: str, category: str, metadata: Optional[Dict[str, Any]], args: Dict[str, Any]) -> None:
+        track = self._open(_lane(metadata))
+        self._pending[run_id] = (name, category, self._now(), track, args)
+
+    def _end(self, run_id: UUID, **args: Any) -> None:
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        name, category, start, track, start_args = pending
+        self._close(track, name, category, start, {**start_args, **args})
+
+    @contextmanager
+    def span(self, name: str, lane: str = DEFAULT_LANE, **args: Any) -> Iterator[None]:
+        """
+        Record a span of the generator's own work
+        """
+        track = self._open(lane)
+        start = self._now()
+        try:
+            yield
+        finally:
+            self._close(track, name, "generator", start, {key: _short(value) for key, value in args.items()})
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        # Only graph nodes (agent, tools, ...), not every nested runnable
+        node = (metadata or {}).get('langgraph_node')
+        if node and kwargs.get('name') == node:
+            self._start(run_id, node, "step", metadata, {"step": (metadata or {}).get('langgraph_step')})
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=_short(str(error)))
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        model = (metadata or {}).get('ls_model_name') or (serialized or {}).get('name', 'model')
+        self._start(run_id, "model", "model", metadata, {
+            "model": model,
+            "messages": sum(len(batch) for batch in messages),
+        })
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        input_tokens = output_tokens = cache_read = cache_write = 0
+        cached = False
+        answered_by = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, 'message', None)
+                # The model that actually answered, which differs from the requested one when routed
+                model = (getattr(message, 'response_metadata', None) or {}).get('model_name')
+                if model:
+                    answered_by = {"model": model}
+                usage = getattr(message, 'usage_metadata', None) or {}
+                input_tokens += usage.get('input_tokens', 0)
+                output_tokens += usage.get('output_tokens', 0)
+                cache_read += cache_read_tokens(usage)
+                cache_write += cache_write_tokens(usage)
+                # LangChain zeroes the cost of responses replayed from the cache
+                cached = cached or 'total_cost' in usage
+        self._end(
+            run_id, input_tokens=input_tokens, output_tokens=output_tokens, cached=cached,
+            cache_read_tokens=cache_read, cache_write_tokens=cache_write, **answered_by
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=_short(str(error)))
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        inputs: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get('name') or kwargs.get('name', 'tool')
+        args = {key: _short(value) for key, value in (inputs or {'input': input_str}).items()}
+        self._start(run_id, name, "tool", metadata, args)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        content = str(getattr(output, 'content', output))
+        self._end(run_id, result_chars=len(content), result_lines=content.count('\n') + 1)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=_short(str(error)))
+
+    def save(self, path: str) -> None:
+        """
+        Write the recorded spans as Chrome trace event JSON
+
+        Args:
+            path: Output file
+        """
+        with self._lock:
+            events = list(self.events)
+            tids = dict(self._tids)
+        metadata = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "codeviewx"}}]
+        for (lane, slot), tid in sorted(tids.items(), key=lambda item: item[1]):
+            metadata.append({
+                "name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                "args": {"name": lane if slot == 0 else f"{lane} #{slot}"},
+            })
+            metadata.append({
+                "name": "thread_sort_index", "ph": "M", "pid": 1, "tid": tid,
+                "args": {"sort_index": tid},
+            })
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
@@ -0,0 +1,67 @@
+"""
+Token usage module
+
+Callback handler that totals the tokens billed for a run's model calls.
+"""
+
+import threading
+from typing import Any, Dict
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+def cache_read_tokens(usage: Dict[str, Any]) -> int:
+    """
+    Input tokens of a response served from the provider's prompt cache
+    """
+    return (usage.get('input_token_details') or {}).get('cache_read') or 0
+
+
+def cache_write_tokens(usage: Dict[str, Any]) -> int:
+    """
+    Input tokens of a response written to the provider's prompt cache
+    """
+    return (usage.get('input_token_details') or {}).get('cache_creation') or 0
+
+
+class TokenUsageCounter(BaseCallbackHandler):
+    """
+    Sums the `usage_metadata` reported by chat model responses
+
+    Responses replayed from the response cache are marked by LangChain with
+    a zero `total_cost` and are not counted, so the totals reflect tokens
+    actually sent to and received from the API. Input tokens include those
+    read from and written to the provider's prompt cache, which are also
+    totalled separately.
+
+    Examples:
+        usage = TokenUsageCounter()
+        agent.invoke(inputs, config={"callbacks": [usage]})
+        print(usage.input_tokens, usage.output_tokens)
+    """
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+                if not usage or 'total_cost' in usage:
+                    continue
+                with self._lock:
+                    self.calls += 1
+                    self.input_tokens += usage.get('input_tokens', 0)
+                    self.output_tokens += usage.get('output_tokens', 0)
+                    self.cache_read_tokens += cache_read_tokens(usage)
+                    self.cache_write_tokens += cache_write_tokens(usage)
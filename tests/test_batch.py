@@ -0,0 +1,61 @@
+"""Test batch generation helpers"""
+
+import os
+import tempfile
+import pytest
+from codeviewx import GenerationResult
+from codeviewx.batch import BatchEntry, read_repository_list, format_batch_summary, _output_directories
+from codeviewx.i18n import get_i18n
+
+
+def test_read_repository_list():
+    """Test comments and blank lines are skipped and paths resolved"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        list_path = os.path.join(tmpdir, "repos.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.write("# nightly\nservice-a\n\n  /abs/service-b  \n")
+
+        assert read_repository_list(list_path) == [
+            os.path.join(tmpdir, "service-a"),
+            "/abs/service-b",
+        ]
+
+
+def test_output_directories():
+    """Test per-repository output directories, with unique names under a root"""
+    repositories = ["/repos/a/api", "/repos/b/api", "/repos/web"]
+
+    assert _output_directories(repositories, "docs", None) == [
+        "/repos/a/api/docs", "/repos/b/api/docs", "/repos/web/docs"
+    ]
+    assert _output_directories(repositories, "docs", "/out") == [
+        "/out/api", "/out/api-2", "/out/web"
+    ]
+
+
+def test_format_batch_summary():
+    """Test the summary table lists every repository, totals and errors"""
+    get_i18n().set_locale('en')
+    done = BatchEntry("/repos/api", "/repos/api/docs")
+    done.result = GenerationResult("/repos/api", "/repos/api/docs")
+    done.result.run_id = "20250101-120000-1a2b3c"
+    done.result.docs_generated = 9
+    done.result.steps = 120
+    done.result.input_tokens = 50000
+    done.result.output_tokens = 8000
+    done.elapsed = 61.5
+    failed = BatchEntry("/repos/web", "/repos/web/docs")
+    failed.error = "overloaded"
+    failed.elapsed = 3.0
+
+    lines = format_batch_summary([done, failed]).split("\n")
+
+    assert lines[0].split()[:2] == ["Repository", "Status"]
+    assert lines[2].split() == ["/repos/api", "generated", "9", "120", "50000", "8000", "61.5"]
+    assert lines[3].split() == ["/repos/web", "failed", "0", "0", "0", "0", "3.0"]
+    assert lines[5].split() == ["1/2", "9", "120", "50000", "8000", "64.5"]
+    assert lines[-1] == "❌ /repos/web: overloaded"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,60 @@
+"""Test the benchmark suite and replay benchmark report"""
+
+import os
+import tempfile
+import pytest
+from benchmarks.suite import NEEDLE, make_repository, compare_results
+from codeviewx.benchmark import BenchmarkReport
+
+
+def test_synthetic_repository_layout():
+    """Test a synthetic repository has the requested number of sources and is reused"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repository = make_repository(tmpdir, 150)
+        sources = [
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(os.path.join(repository, "src")) for name in names
+        ]
+        with open(os.path.join(repository, "src", "pkg_0", "module_0.py"), 'r', encoding='utf-8') as f:
+            first = f.read()
+        assert make_repository(tmpdir, 150) == repository
+
+    assert len(sources) == 150
+    assert NEEDLE in first
+
+
+def test_compare_flags_only_significant_slowdowns():
+    """Test regressions need both a relative and an absolute slowdown"""
+    baseline = {"sizes": {"10": {
+        "slow": {"median_ms": 10.0}, "noise": {"median_ms": 0.2}, "same": {"median_ms": 5.0},
+        "skipped": {"skipped": "rg missing"},
+    }}}
+    current = {"sizes": {"10": {
+        "slow": {"median_ms": 20.0}, "noise": {"median_ms": 0.6}, "same": {"median_ms": 5.5},
+        "skipped": {"median_ms": 1.0}, "new": {"median_ms": 1.0},
+    }}}
+
+    comparison = {entry["case"]: entry for entry in compare_results(current, baseline, tolerance=0.25)}
+
+    assert set(comparison) == {"slow", "noise", "same"}
+    assert comparison["slow"]["regressed"] and comparison["slow"]["ratio"] == 2.0
+    assert not comparison["noise"]["regressed"]
+    assert not comparison["same"]["regressed"]
+
+
+def test_benchmark_report_tool_stats():
+    """Test tool latency percentiles and median throughput of a replay benchmark"""
+    report = BenchmarkReport("run.transcript.jsonl", "/project")
+    report.runs = [{"steps_per_second": rate} for rate in (10.0, 30.0, 20.0)]
+    report.tool_latency = {"read_real_file": [float(value) for value in range(1, 101)]}
+
+    stats = report.to_dict()
+
+    assert stats["steps_per_second"] == 20.0
+    assert stats["tools"]["read_real_file"] == {
+        "calls": 100, "mean_ms": 50.5, "p50_ms": 50.0, "p95_ms": 95.0, "max_ms": 100.0,
+    }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,70 @@
+"""Test model response cache"""
+
+import tempfile
+import pytest
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+from codeviewx.cache import ResponseCache
+
+
+def _generation(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+@pytest.fixture
+def cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        response_cache = ResponseCache(tmpdir)
+        yield response_cache
+        response_cache.close()
+
+
+class TestResponseCache:
+    """Test lookup, key normalization and eviction"""
+
+    def test_lookup_after_update(self, cache):
+        prompt = dumps([HumanMessage(content="hello")])
+
+        assert cache.lookup(prompt, "model-a") is None
+        cache.update(prompt, "model-a", _generation("hi"))
+
+        result = cache.lookup(prompt, "model-a")
+        assert result[0].message.content == "hi"
+        assert cache.lookup(prompt, "model-b") is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_message_ids_do_not_affect_key(self, cache):
+        first = dumps([HumanMessage(content="hello", id="run-1")])
+        second = dumps([HumanMessage(content="hello", id="run-2")])
+
+        cache.update(first, "model", _generation("hi"))
+        assert cache.lookup(second, "model") is not None
+
+    def test_persists_across_instances(self, cache):
+        prompt = dumps([HumanMessage(content="hello")])
+        cache.update(prompt, "model", _generation("hi"))
+
+        reopened = ResponseCache(cache.cache_directory)
+        try:
+            assert reopened.lookup(prompt, "model")[0].message.content == "hi"
+        finally:
+            reopened.close()
+
+    def test_evicts_least_recently_used(self, cache):
+        prompts = [dumps([HumanMessage(content=f"q{i}")]) for i in range(3)]
+        cache.update(prompts[0], "model", _generation("a" * 100))
+        entry_size = cache._conn.execute("SELECT size FROM responses").fetchone()[0]
+        cache.max_bytes = entry_size * 2
+
+        cache.update(prompts[1], "model", _generation("a" * 100))
+        cache.lookup(prompts[0], "model")
+        cache.update(prompts[2], "model", _generation("a" * 100))
+
+        assert cache.lookup(prompts[0], "model") is not None
+        assert cache.lookup(prompts[1], "model") is None
+        assert cache.lookup(prompts[2], "model") is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+"""Test run checkpoints"""
+
+import os
+import asyncio
+import tempfile
+import pytest
+from typing_extensions import TypedDict
+from langgraph.graph import StateGraph, START, END
+from codeviewx import generate_docs
+from codeviewx.manifest import DocManifest
+from codeviewx.checkpoint import (
+    new_run_id,
+    is_run_id,
+    get_run_directory,
+    open_checkpointer,
+    aopen_checkpointer,
+    has_run,
+    ahas_run,
+    discard_run,
+    adiscard_run,
+)
+
+
+class CounterState(TypedDict):
+    count: int
+
+
+def _build_graph(checkpointer):
+    graph = StateGraph(CounterState)
+    graph.add_node("increment", lambda state: {"count": state["count"] + 1})
+    graph.add_edge(START, "increment")
+    graph.add_edge("increment", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def test_new_run_id_is_unique():
+    """Test run ids do not collide"""
+    assert new_run_id() != new_run_id()
+
+
+def test_run_ids_are_matched_literally():
+    """Test wildcard characters in a run id never reach another run's threads"""
+    assert is_run_id(new_run_id())
+    assert not is_run_id("2025%") and not is_run_id("../20250101-120000-aaaaaa")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = {"configurable": {"thread_id": "20250101-120000-aaaaaa:03-architecture"}}
+        checkpointer = open_checkpointer(tmpdir)
+        _build_graph(checkpointer).invoke({"count": 1}, config)
+
+        assert not has_run(checkpointer, "2025%")
+        assert not has_run(checkpointer, "20250101-120000-aaaaa_")
+        discard_run(checkpointer, tmpdir, "2025%")
+        assert has_run(checkpointer, "20250101-120000-aaaaaa")
+        checkpointer.conn.close()
+
+
+def test_resume_is_checked_before_up_to_date_docs_are_reused(monkeypatch):
+    """Test an unknown --resume id is an error even when nothing needs regenerating"""
+    monkeypatch.setenv("ANTHROPIC_AUTH_TOKEN", "test")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        work, out = os.path.join(tmpdir, "project"), os.path.join(tmpdir, "project", "docs")
+        os.makedirs(out)
+        with open(os.path.join(work, "app.py"), 'w') as f:
+            f.write("print('app')\n")
+        with open(os.path.join(out, "README.md"), 'w') as f:
+            f.write("# Readme")
+        manifest = DocManifest(work, out)
+        manifest.update({"README.md": {"app.py"}})
+        manifest.save()
+        trace_path = os.path.join(tmpdir, "trace.json")
+
+        for resume in ("2025%", new_run_id()):
+            with pytest.raises(ValueError):
+                generate_docs(working_directory=work, output_directory=out, doc_language="English", resume=resume)
+        result = generate_docs(working_directory=work, output_directory=out, doc_language="English", trace_path=trace_path)
+
+        assert result.reused == ["README.md"]
+        assert os.path.isfile(trace_path)
+
+
+def test_checkpoints_persist_and_discard():
+    """Test run state survives reopening and is removed by discard_run"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run_id = new_run_id()
+        config = {"configurable": {"thread_id": f"{run_id}:analysis"}}
+
+        checkpointer = open_checkpointer(tmpdir)
+        _build_graph(checkpointer).invoke({"count": 1}, config)
+        checkpointer.conn.close()
+
+        checkpointer = open_checkpointer(tmpdir)
+        graph = _build_graph(checkpointer)
+        assert has_run(checkpointer, run_id)
+        assert not has_run(checkpointer, "unknown-run")
+        assert graph.get_state(config).values == {"count": 2}
+
+        os.makedirs(get_run_directory(tmpdir, run_id))
+        discard_run(checkpointer, tmpdir, run_id)
+
+        assert not has_run(checkpointer, run_id)
+        assert not os.path.exists(get_run_directory(tmpdir, run_id))
+        checkpointer.conn.close()
+
+
+def test_async_checkpoints_share_database():
+    """Test the async saver sees sync checkpoints and discards them"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run_id = new_run_id()
+        config = {"configurable": {"thread_id": run_id}}
+
+        checkpointer = open_checkpointer(tmpdir)
+        _build_graph(checkpointer).invoke({"count": 1}, config)
+        checkpointer.conn.close()
+
+        async def resume_and_discard():
+            checkpointer = await aopen_checkpointer(tmpdir)
+            try:
+                assert await ahas_run(checkpointer, run_id)
+                result = await _build_graph(checkpointer).ainvoke({"count": 5}, config)
+                assert result == {"count": 6}
+
+                await adiscard_run(checkpointer, tmpdir, run_id)
+                assert not await ahas_run(checkpointer, run_id)
+            finally:
+                await checkpointer.conn.close()
+
+        asyncio.run(resume_and_discard())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
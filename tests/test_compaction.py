@@ -0,0 +1,62 @@
+"""Test context compaction"""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from codeviewx.compaction import ContextCompactor, estimate_tokens
+
+
+def _conversation(turns, payload_size=4000):
+    messages = [SystemMessage(content="system prompt"), HumanMessage(content="document the project")]
+    for i in range(turns):
+        messages.append(AIMessage(content="", tool_calls=[{
+            'name': 'write_real_file',
+            'args': {'file_path': f'docs/{i}.md', 'content': 'd' * payload_size},
+            'id': f'call_{i}',
+        }]))
+        messages.append(ToolMessage(
+            content=f"File: src/{i}.py (4 KB, 100 lines)\n" + 'x' * payload_size,
+            name='read_real_file',
+            tool_call_id=f'call_{i}',
+        ))
+    return messages
+
+
+class TestContextCompactor:
+    """Test compaction policy and metrics"""
+
+    def test_under_threshold_is_untouched(self):
+        compactor = ContextCompactor(threshold_tokens=10 ** 6)
+        messages = _conversation(5)
+
+        assert compactor.compact(messages) is messages
+        assert compactor.tokens_saved == 0
+        assert compactor.calls == 1
+
+    def test_compacts_old_messages_and_keeps_recent(self):
+        compactor = ContextCompactor(threshold_tokens=1000, keep_recent=4)
+        messages = _conversation(10)
+
+        result = compactor.compact(messages)
+
+        assert len(result) == len(messages)
+        assert result[0] is messages[0] and result[1] is messages[1]
+        assert result[3].content.startswith("[Compacted read_real_file result: File: src/0.py")
+        assert result[2].tool_calls[0]['args']['content'] == "[4000 characters, compacted]"
+        assert result[2].tool_calls[0]['id'] == 'call_0'
+        assert result[-4:] == messages[-4:]
+        assert messages[3].content.startswith("File: src/0.py")
+        assert compactor.tokens_saved == estimate_tokens(messages) - estimate_tokens(result)
+        assert compactor.compacted_calls == 1
+
+    def test_boundary_is_stable_between_calls(self):
+        compactor = ContextCompactor(threshold_tokens=1000, keep_recent=4)
+        messages = _conversation(10)
+
+        first = compactor.compact(messages)
+        second = compactor.compact(messages + [HumanMessage(content="continue")])
+
+        assert [m.content for m in second[:16]] == [m.content for m in first[:16]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
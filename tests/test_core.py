@@ -83,3 +83,13 @@ def test_prompt_content_structure():
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+def test_chapters_come_from_the_analysis_report():
+    """Test chapter list parsing from the analysis report"""
+    from codeviewx.generator import _parse_chapters
+    
+    analysis = "Tech stack: Python\n\n**Chapters**: README.md, 01-overview.md, `02-plugins.md`, src/app.py, README.md"
+    assert _parse_chapters(analysis) == ['README.md', '01-overview.md', '02-plugins.md']
+    assert _parse_chapters("Chapters：README.md、01-overview.md") == ['README.md', '01-overview.md']
+    assert _parse_chapters("No chapter list in this report") == []
@@ -0,0 +1,106 @@
+"""Test repository digest and ignore rules"""
+
+import os
+import tempfile
+import pytest
+from codeviewx import load_prompt
+from codeviewx.digest import build_repository_digest, scan_repository
+from codeviewx.tools.fileindex import detect_language
+from codeviewx.tools.ignore import IgnoreRules
+
+
+def _write(root, rel_path, content=""):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+@pytest.fixture
+def repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _write(tmpdir, "pyproject.toml", "[project]\nname = 'demo'\n")
+        _write(tmpdir, ".gitignore", "*.tmp\n/generated/\n")
+        _write(tmpdir, "src/main.py", "import os\n\nprint(os.getcwd())\n")
+        _write(tmpdir, "src/util.py", "def helper():\n    pass")
+        _write(tmpdir, "src/.gitignore", "secret.py\n")
+        _write(tmpdir, "src/secret.py", "KEY = 1\n")
+        _write(tmpdir, "scratch.tmp", "tmp")
+        _write(tmpdir, "generated/out.py", "x = 1\n")
+        _write(tmpdir, "node_modules/lib/index.js", "module.exports = {}\n")
+        _write(tmpdir, "docs/README.md", "# Docs\n")
+        yield tmpdir
+
+
+class TestIgnoreRules:
+    """Test gitignore-style matching"""
+
+    def test_default_and_gitignore_patterns(self, repo):
+        rules = IgnoreRules.for_directory(repo)
+
+        assert rules.is_ignored("node_modules", is_dir=True)
+        assert rules.is_ignored("scratch.tmp", is_dir=False)
+        assert rules.is_ignored("generated", is_dir=True)
+        assert not rules.is_ignored("src/generated", is_dir=True)
+        assert not rules.is_ignored("src/main.py", is_dir=False)
+
+    def test_nested_gitignore_and_negation(self, repo):
+        rules = IgnoreRules.for_directory(repo).descend("src")
+
+        assert rules.is_ignored("src/secret.py", is_dir=False)
+
+        negated = IgnoreRules(repo)
+        negated._add_patterns("", ["*.py", "!keep.py"])
+        assert negated.is_ignored("drop.py", is_dir=False)
+        assert not negated.is_ignored("keep.py", is_dir=False)
+
+
+class TestRepositoryDigest:
+    """Test scanning and digest rendering"""
+
+    def test_scan_honors_ignore_rules(self, repo):
+        paths = [record.path for record in scan_repository(repo, exclude=["docs"])]
+
+        assert paths == [".gitignore", "pyproject.toml", "src/.gitignore", "src/main.py", "src/util.py"]
+
+    def test_counts_lines_per_language(self, repo):
+        records = {record.path: record for record in scan_repository(repo)}
+
+        assert records["src/main.py"].language == "Python"
+        assert records["src/main.py"].lines == 3
+        assert records["src/util.py"].lines == 2
+
+    def test_digest_sections(self, repo):
+        digest, records = build_repository_digest(repo, exclude=["docs"])
+
+        assert "Python: 5 lines in 2 files" in digest
+        assert "- pyproject.toml" in digest
+        assert "- src/main.py" in digest
+        assert "src/ (3 files)" in digest
+        assert "node_modules" not in digest
+
+    def test_detect_language(self):
+        assert detect_language("app.py") == "Python"
+        assert detect_language("notes.txt") is None
+
+    def test_digest_injected_into_prompt(self):
+        prompt = load_prompt(
+            "document_engineer",
+            working_directory="/test",
+            output_directory="docs",
+            doc_language="English",
+            repository_digest="### Summary\n- 3 files"
+        )
+        assert "- 3 files" in prompt
+
+        prompt = load_prompt(
+            "document_engineer",
+            working_directory="/test",
+            output_directory="docs",
+            doc_language="English"
+        )
+        assert "{repository_digest}" not in prompt
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""Test progress events built from streamed graph updates"""
+
+import io
+import json
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from codeviewx.events import (
+    AgentMessage,
+    DocWritten,
+    JsonLinesWriter,
+    ModelTokens,
+    ProgressTracker,
+    TodosUpdated,
+    ToolFinished,
+    ToolStarted,
+)
+
+
+def _updates():
+    content = "# Architecture\n" + "x" * 500
+    return [
+        {"agent": {"messages": [AIMessage(
+            content="Reading the entry point first.",
+            tool_calls=[
+                {"name": "read_real_file", "args": {"file_path": "app.py"}, "id": "call_1"},
+                {"name": "write_real_file", "args": {"file_path": "docs/03-architecture.md", "content": content}, "id": "call_2"},
+            ],
+            usage_metadata={"input_tokens": 1200, "output_tokens": 80, "total_tokens": 1280},
+        )]}},
+        {"tools": {"messages": [ToolMessage(content="print('hello')\nmain()", name="read_real_file", tool_call_id="call_1")]}},
+        {"tools": {"messages": [ToolMessage(content="✅ Successfully wrote file", name="write_real_file", tool_call_id="call_2")]}},
+        {"tools": {
+            "todos": [{"content": "Analyze", "status": "completed"}, {"content": "Write", "status": "in_progress"}],
+            "messages": [ToolMessage(content="Updated todo list", name="write_todos", tool_call_id="call_3")],
+        }},
+    ]
+
+
+def test_tracker_translates_updates():
+    """Test each update yields typed events and counts steps and docs"""
+    events = []
+    tracker = ProgressTracker("docs", part="03-architecture.md", listeners=[events.append])
+    for update in _updates():
+        tracker.handle(update)
+
+    assert [type(event) for event in events] == [
+        ModelTokens, AgentMessage, ToolStarted, ToolStarted,
+        ToolFinished, ToolFinished, DocWritten, ToolFinished, TodosUpdated,
+    ]
+    assert tracker.step_count == 4
+    assert tracker.docs_generated == 1
+    assert all(event.part == "03-architecture.md" for event in events)
+
+    tokens, message, read_call = events[0], events[1], events[2]
+    assert (tokens.input_tokens, tokens.output_tokens, tokens.cached) == (1200, 80, False)
+    assert message.tool_calls == 2
+    assert read_call.args == {"file_path": "app.py"}
+
+    read_result, doc, todos = events[4], events[6], events[8]
+    assert read_result.tool == "read_real_file" and read_result.step == 2
+    assert read_result.to_dict()["lines"] == 2
+    assert "content" not in read_result.to_dict()
+    assert (doc.filename, doc.index) == ("03-architecture.md", 1)
+    assert (todos.completed, todos.total) == (1, 2)
+
+
+def test_failed_write_is_not_a_document():
+    """Test a write reporting an error does not count as a written doc"""
+    tracker = ProgressTracker("docs")
+    tracker.translate({"agent": {"messages": [AIMessage(content="", tool_calls=[
+        {"name": "write_real_file", "args": {"file_path": "docs/README.md", "content": "#"}, "id": "call_1"},
+    ])]}})
+    events = tracker.translate({"tools": {"messages": [
+        ToolMessage(content="❌ Failed to write file: disk full", name="write_real_file", tool_call_id="call_1"),
+    ]}})
+
+    assert len(events) == 1
+    assert events[0].failed
+    assert tracker.docs_generated == 0
+
+
+def test_json_lines_writer():
+    """Test events are written one JSON object per line with long arguments truncated"""
+    stream = io.StringIO()
+    writer = JsonLinesWriter(stream)
+    tracker = ProgressTracker("docs", listeners=[writer])
+    tracker.handle(_updates()[0])
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["event"] for line in lines] == ["model_tokens", "agent_message", "tool_started", "tool_started"]
+    assert lines[0]["part"] is None
+    assert lines[3]["args"]["file_path"] == "docs/03-architecture.md"
+    assert lines[3]["args"]["content"].endswith("(515 chars)")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,71 @@
+"""Test concurrent execution of the tool calls of a turn"""
+
+import time
+import asyncio
+import threading
+import pytest
+from deepagents import async_create_deep_agent, create_deep_agent
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from codeviewx.generator import _run_config
+from codeviewx.replay import ReplayChatModel
+from codeviewx.tools import ToolExecutor
+
+
+class _Overlap:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.running -= 1
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_turn_runs_reads_concurrently_and_writes_serially(use_async):
+    """Test a turn's reads overlap up to the bound, writes do not, and results keep call order"""
+    reads, writes = _Overlap(), _Overlap()
+
+    @tool
+    def read_real_file(file_path: str) -> str:
+        """Read a file"""
+        with reads:
+            time.sleep(0.05)
+        return f"read {file_path}"
+
+    @tool
+    def write_real_file(file_path: str, content: str) -> str:
+        """Write a file"""
+        with writes:
+            time.sleep(0.02)
+        return f"wrote {file_path}"
+
+    calls = [{"name": "read_real_file", "args": {"file_path": f"f{index}"}, "id": f"r{index}"} for index in range(6)]
+    calls += [{"name": "write_real_file", "args": {"file_path": f"w{index}", "content": ""}, "id": f"w{index}"} for index in range(3)]
+    model = ReplayChatModel(responses={"main": [AIMessage(content="", tool_calls=calls), AIMessage(content="done")]})
+    executor = ToolExecutor(max_workers=4)
+    tools = [executor.wrap(read_real_file), executor.wrap(write_real_file)]
+    config = _run_config("run", None, 100, [], executor.max_workers)
+    inputs = {"messages": [{"role": "user", "content": "go"}]}
+
+    if use_async:
+        state = asyncio.run(async_create_deep_agent(tools, "Document", model=model).ainvoke(inputs, config=config))
+    else:
+        state = create_deep_agent(tools, "Document", model=model).invoke(inputs, config=config)
+    executor.shutdown()
+
+    results = [message.content for message in state["messages"] if message.type == "tool"]
+    assert results == [f"read f{index}" for index in range(6)] + [f"wrote w{index}" for index in range(3)]
+    assert 1 < reads.peak <= 4
+    assert writes.peak == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
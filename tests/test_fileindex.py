@@ -0,0 +1,124 @@
+"""Test the run-scoped repository file index"""
+
+import os
+import glob
+import tempfile
+import pytest
+from codeviewx.tools import FileIndex, list_real_directory, list_real_tree, read_real_files, write_real_file
+from codeviewx.tools.fileindex import find_index, register_index, unregister_index
+
+
+def _write(root, rel_path, content="x"):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+@pytest.fixture
+def repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _write(tmpdir, ".gitignore", "*.tmp\n")
+        _write(tmpdir, "README.md", "# Demo\n")
+        _write(tmpdir, "src/app.py", "print('app')\n")
+        _write(tmpdir, "src/pkg/core.py", "def core(): pass\n")
+        _write(tmpdir, "src/pkg/.hidden.py")
+        _write(tmpdir, "src-extra/tool.py")
+        _write(tmpdir, "scratch.tmp")
+        _write(tmpdir, "docs/index.md")
+        _write(tmpdir, "node_modules/lib/index.js")
+        yield tmpdir
+
+
+class TestFileIndex:
+    """Test building and querying the index"""
+
+    def test_build_honors_ignore_rules_and_exclude(self, repo):
+        index = FileIndex.build(repo, exclude=["docs"], max_workers=4)
+        files = {path: (size, language) for path, size, _, language in index.files()}
+
+        assert sorted(files) == [
+            ".gitignore", "README.md", "src-extra/tool.py", "src/app.py", "src/pkg/.hidden.py", "src/pkg/core.py"
+        ]
+        assert files["src/app.py"] == (13, "Python")
+        assert index.totals("") == (6, sum(size for size, _ in files.values()))
+        assert index.totals("src") == (3, 13 + 17 + 1)
+        assert index.directory_entries("src") == (["pkg"], [("app.py", 13)])
+
+    @pytest.mark.parametrize("pattern", ["src/*.py", "src/**/*.py", "**/*.py", "s*/*.py", "src/**", "*.md", "src/[ab]pp.py"])
+    def test_glob_matches_the_disk(self, repo, pattern):
+        index = FileIndex.build(repo)
+        expected = sorted(
+            path for path in glob.glob(os.path.join(repo, pattern), recursive=True)
+            if os.path.isfile(path) and "node_modules" not in path
+        )
+
+        assert index.glob(os.path.join(repo, pattern)) == expected
+
+    def test_changes_send_queries_back_to_disk(self, repo):
+        index = FileIndex.build(repo)
+        register_index(index)
+        try:
+            assert find_index(os.path.join(repo, "src", "app.py")) is index
+            assert index.fresh("src")
+
+            write_real_file.invoke({"file_path": os.path.join(repo, "src", "app.py"), "content": "changed"})
+            assert not index.fresh("src")
+            assert index.glob(os.path.join(repo, "src", "*.py")) is None
+            assert not index.fresh("", recursive=True)
+            assert index.glob(os.path.join(repo, "src-extra", "*.py")) == [os.path.join(repo, "src-extra", "tool.py")]
+        finally:
+            unregister_index(index)
+        assert find_index(repo) is None
+
+    def test_written_files_and_commands(self, repo):
+        index = FileIndex.build(repo, exclude=["docs"])
+
+        index.mark_changed(os.path.join(repo, "docs", "README.md"))
+        index.mark_changed(os.path.join(os.path.dirname(repo), "elsewhere.py"))
+        assert index.fresh("", recursive=True)
+        assert index.written("") == []
+
+        with open(os.path.join(repo, "src", "new.py"), 'w') as f:
+            f.write("new")
+        index.mark_changed(os.path.join(repo, "src", "new.py"))
+        assert index.written("src") == ["src/new.py"]
+        assert index.written("src-extra") == []
+        assert not index.fresh("src")
+        assert index.settled("")
+
+        index.mark_commands_run()
+        assert index.settled("")
+        with open(os.path.join(repo, "src", "pkg", "made.py"), 'w') as f:
+            f.write("by a command")
+        index.mark_commands_run()
+        assert not index.settled("src")
+        assert index.settled("src-extra")
+
+
+class TestIndexedTools:
+    """Test the filesystem tools answer from a registered index"""
+
+    def test_tools_use_the_snapshot(self, repo):
+        unindexed = list_real_directory.invoke({"directory": repo})
+        index = FileIndex.build(repo)
+        register_index(index)
+        try:
+            listing = list_real_directory.invoke({"directory": repo})
+            tree = list_real_tree.invoke({"directory": repo})
+            batch = read_real_files.invoke({"paths": [os.path.join(repo, "src", "**", "*.py")]})
+            _write(repo, "src/added.py")
+            after = list_real_directory.invoke({"directory": os.path.join(repo, "src")})
+        finally:
+            unregister_index(index)
+
+        # Listings show every entry, with or without an index
+        assert listing == unindexed
+        assert "📁 node_modules/" in listing and "📄 scratch.tmp" in listing
+        assert tree.splitlines()[1] == "docs/ (1 files, 0.0 KB)"
+        assert "Read 2 files" in batch and ".hidden.py" not in batch
+        assert "📄 added.py" in after
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
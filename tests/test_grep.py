@@ -0,0 +1,130 @@
+"""Test the pure-Python search fallback"""
+
+import os
+import time
+import tempfile
+import pytest
+from codeviewx.tools import ripgrep_search
+from codeviewx.tools import grep, search
+from codeviewx.tools.grep import python_search, search_file, search_paths
+
+
+def _write(root, rel_path, content):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content.encode('utf-8') if isinstance(content, str) else content)
+
+
+@pytest.fixture
+def repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _write(tmpdir, ".gitignore", "build/\n")
+        _write(tmpdir, "src/app.py", "import os\n\ndef main():\n    run()\n\ndef run():\n    pass\n")
+        _write(tmpdir, "src/notes.md", "def is not code here\n")
+        _write(tmpdir, "src/.hidden.py", "def hidden(): pass\n")
+        _write(tmpdir, "build/out.py", "def built(): pass\n")
+        _write(tmpdir, "node_modules/lib/index.py", "def vendored(): pass\n")
+        _write(tmpdir, "data.bin", b"def\x00binary")
+        yield tmpdir
+
+
+def _warm_pool(monkeypatch, workers=2):
+    monkeypatch.setattr(grep, "SEARCH_WORKERS", workers)
+    deadline = time.monotonic() + 60
+    while grep._search_pool() is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def _lines(messages):
+    return [(m["type"], m["data"]["line_number"], m["data"]["lines"]["text"]) for m in messages]
+
+
+def test_search_paths_follow_the_ignore_rules(repo):
+    assert search_paths(repo) == [
+        os.path.join(repo, "data.bin"), os.path.join(repo, "src", "app.py"), os.path.join(repo, "src", "notes.md")
+    ]
+    assert search_paths(repo, "py") == [os.path.join(repo, "src", "app.py")]
+    with pytest.raises(ValueError):
+        search_paths(repo, "no-such-type")
+
+
+def test_search_file_context(repo):
+    path = os.path.join(repo, "src", "app.py")
+
+    assert _lines(search_file(path, r"^def", False, 100, 1)) == [
+        ("context", 2, ""), ("match", 3, "def main():"), ("context", 4, "    run()"),
+        ("context", 5, ""), ("match", 6, "def run():"), ("context", 7, "    pass"),
+    ]
+    assert _lines(search_file(path, "RUN", True, 1, 0)) == [("match", 4, "    run()")]
+    assert search_file(os.path.join(repo, "data.bin"), "def", False, 100, 0) == []
+
+
+def test_matches_do_not_span_lines(repo):
+    _write(repo, "src/spans.txt", "a\nfoo\nx a  foo\n[\nb]\n")
+    path = os.path.join(repo, "src", "spans.txt")
+
+    assert _lines(search_file(path, r"a\s+foo", False, 100, 0)) == [("match", 3, "x a  foo")]
+    assert _lines(search_file(path, r"\[[^x]*\]", False, 100, 0)) == []
+    assert _lines(search_file(path, r"o$", False, 100, 0)) == [("match", 2, "foo"), ("match", 3, "x a  foo")]
+
+
+def test_pool_matches_in_process_search(repo, monkeypatch):
+    for index in range(40):
+        _write(repo, f"pkg/module_{index}.py", "x = 1\n" * index + f"def handler_{index}():\n    pass\n")
+    paths = search_paths(repo, "py")
+    expected = []
+    python_search(paths, r"def handler_\d+", lambda message: expected.append(message) or True)
+
+    monkeypatch.setattr(grep, "MIN_POOL_BYTES", 0)
+    monkeypatch.setattr(grep, "MAX_CHUNK_FILES", 5)
+    _warm_pool(monkeypatch)
+    pooled = []
+    python_search(paths, r"def handler_\d+", lambda message: pooled.append(message) or True)
+    stopped = []
+    python_search(paths, r"def handler_\d+", lambda message: stopped.append(message) or len(stopped) < 3)
+
+    assert len(expected) == 40
+    assert sorted(_lines(pooled)) == sorted(_lines(expected))
+    assert len(stopped) == 3
+
+
+def test_pool_is_not_slower_than_in_process_search(repo, monkeypatch):
+    line = "    value = compute(items, key=lambda item: item.name)  # noqa\n"
+    content = line * (1024 * 1024 // len(line))
+    for index in range(grep.MIN_POOL_BYTES // len(content) + 1):
+        _write(repo, f"big/module_{index}.py", content + f"def handler_{index}():\n")
+    paths = search_paths(os.path.join(repo, "big"))
+    _warm_pool(monkeypatch)
+
+    def timed():
+        messages = []
+        started = time.perf_counter()
+        python_search(paths, r"def handler_\d+", lambda message: messages.append(message) or True)
+        return time.perf_counter() - started, sorted(_lines(messages))
+
+    pooled, pooled_lines = min(timed() for _ in range(3))
+    monkeypatch.setattr(grep, "MIN_POOL_BYTES", float("inf"))
+    serial, serial_lines = min(timed() for _ in range(3))
+
+    assert pooled_lines == serial_lines and len(serial_lines) == len(paths)
+    # Margin for machines with fewer cores than workers, where the pool cannot win
+    assert pooled < serial * 1.5 + 0.05
+
+
+def test_ripgrep_search_without_ripgrep(repo, monkeypatch):
+    monkeypatch.setattr(search.shutil, "which", lambda name: None)
+
+    result = ripgrep_search.invoke({"pattern": "def \\w+", "path": repo, "file_type": "py"})
+
+    assert result.split("\n") == [
+        "Found 2 matches in 1 files",
+        f"File: {os.path.join(repo, 'src', 'app.py')}",
+        "3:def main():",
+        "6:def run():",
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,191 @@
+"""Test incremental generation manifest"""
+
+import os
+import tempfile
+import uuid
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from codeviewx.manifest import DocManifest, ManifestRecorder
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _call_tool(recorder, name, inputs, output):
+    run_id = uuid.uuid4()
+    recorder.on_tool_start({'name': name}, str(inputs), run_id=run_id, inputs=inputs)
+    recorder.on_tool_end(output, run_id=run_id)
+
+
+@pytest.fixture
+def project():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        work = os.path.join(tmpdir, "project")
+        out = os.path.join(work, "docs")
+        _write(os.path.join(work, "app.py"), "print('app')\n")
+        _write(os.path.join(work, "util.py"), "def helper(): pass\n")
+        yield work, out
+
+
+class TestManifestRecorder:
+    """Test source tracking from tool callbacks"""
+
+    def test_maps_docs_to_sources_read(self, project):
+        work, out = project
+        recorder = ManifestRecorder(work, out)
+
+        _call_tool(recorder, 'read_real_file', {'file_path': os.path.join(work, 'app.py')}, "File: app.py")
+        _call_tool(recorder, 'write_real_file', {'file_path': os.path.join(out, 'README.md')}, "✅ Successfully wrote file")
+        _call_tool(recorder, 'ripgrep_search', {'pattern': 'def'}, (
+            f"Found 1 matches in 1 files\nFile: {os.path.join(work, 'util.py')}\n1:def helper(): pass"
+        ))
+        _call_tool(recorder, 'write_real_file', {'file_path': os.path.join(out, '01-overview.md')}, "✅ Successfully wrote file")
+
+        assert recorder.doc_sources['README.md'] == {'app.py'}
+        assert recorder.doc_sources['01-overview.md'] == {'app.py', 'util.py'}
+
+    def test_batch_reads_record_every_file(self, project):
+        work, out = project
+        recorder = ManifestRecorder(work, out)
+
+        output = "Read 3 files (0.03 KB of 512.00 KB budget)\n\n" + "\n\n".join([
+            f"File: {os.path.join(work, 'app.py')} (0.01 KB, 2 lines)\n{'=' * 60}\nprint('app')\n",
+            f"File: {os.path.join(work, 'util.py')} (0.02 KB, 2 lines)\n{'=' * 60}\ndef helper(): pass\n",
+            f"❌ Error: File '{os.path.join(work, 'missing.py')}' does not exist",
+        ])
+        _call_tool(recorder, 'read_real_files', {'paths': [os.path.join(work, '*.py')]}, output)
+
+        assert recorder.sources_read == {'app.py', 'util.py'}
+
+    def test_batch_read_headers_with_parentheses(self, project):
+        work, out = project
+        recorder = ManifestRecorder(work, out)
+        path = os.path.join(work, 'notes (old).py')
+        _write(path, "x = 1\n")
+
+        _call_tool(recorder, 'read_real_files', {'paths': [path]}, f"File: {path} (0.01 KB, 1 lines)\n{'=' * 60}\nx = 1")
+
+        assert recorder.sources_read == {'notes (old).py'}
+
+    def test_records_directory_listings(self, project):
+        work, out = project
+        recorder = ManifestRecorder(work, out)
+        _write(os.path.join(work, 'pkg', 'core.py'), "x = 1\n")
+
+        _call_tool(recorder, 'list_real_directory', {'directory': work}, f"Directory: {work}")
+        _call_tool(recorder, 'list_real_tree', {'directory': os.path.join(work, 'pkg')}, "Tree: pkg")
+        _call_tool(recorder, 'list_real_tree', {'directory': out}, "Tree: docs")
+        _call_tool(recorder, 'list_real_directory', {'directory': os.path.join(work, 'gone')}, "❌ Error: Directory does not exist")
+        _call_tool(recorder, 'write_real_file', {'file_path': os.path.join(out, 'README.md')}, "✅ Successfully wrote file")
+
+        assert recorder.doc_sources['README.md'] == {'/', 'pkg/**'}
+
+    def test_ignores_failed_reads_and_outside_files(self, project):
+        work, out = project
+        recorder = ManifestRecorder(work, out)
+
+        _call_tool(recorder, 'read_real_file', {'file_path': os.path.join(work, 'missing.py')}, "❌ Error: File does not exist")
+        _call_tool(recorder, 'read_real_file', {'file_path': '/etc/hostname'}, "File: /etc/hostname")
+
+        assert recorder.sources_read == set()
+
+
+    def test_concurrent_callbacks_keep_a_consistent_state(self, project):
+        work, out = project
+        for index in range(40):
+            _write(os.path.join(work, 'pkg', f'module_{index}.py'), "x = 1\n")
+        state_path = os.path.join(out, '.codeviewx', 'runs', 'r1', 'recorder.json')
+        recorder = ManifestRecorder(work, out, state_path)
+
+        def call(index):
+            if index % 10 == 9:
+                _call_tool(recorder, 'write_real_file', {'file_path': os.path.join(out, f'{index}.md')}, "✅ Successfully wrote file")
+            else:
+                path = os.path.join(work, 'pkg', f'module_{index % 40}.py')
+                _call_tool(recorder, 'read_real_file', {'file_path': path}, "File: ...")
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(call, range(400)))
+
+        reloaded = ManifestRecorder(work, out, state_path)
+        assert len(reloaded.sources_read) == len({index % 40 for index in range(400) if index % 10 != 9})
+        assert len(reloaded.doc_sources) == 40
+        assert os.listdir(os.path.dirname(state_path)) == ['recorder.json']
+
+
+class TestDocManifest:
+    """Test staleness planning"""
+
+    def test_plan_detects_changed_sources(self, project):
+        work, out = project
+        _write(os.path.join(out, 'README.md'), "# Readme")
+        _write(os.path.join(out, '01-overview.md'), "# Overview")
+
+        manifest = DocManifest(work, out)
+        manifest.update({'README.md': {'app.py'}, '01-overview.md': {'util.py'}})
+        manifest.save()
+
+        loaded = DocManifest.load(work, out)
+        assert loaded.plan() == (['01-overview.md', 'README.md'], [])
+
+        _write(os.path.join(work, 'util.py'), "def helper(): return 1\n")
+        assert loaded.plan() == (['README.md'], ['01-overview.md'])
+
+    def test_new_files_make_docs_that_listed_them_stale(self, project):
+        work, out = project
+        _write(os.path.join(work, 'pkg', 'core.py'), "x = 1\n")
+        for doc in ('README.md', '02-quickstart.md', '03-architecture.md'):
+            _write(os.path.join(out, doc), "# Doc")
+        manifest = DocManifest(work, out)
+        manifest.update({
+            'README.md': {'app.py', '/'},
+            '02-quickstart.md': {'app.py', 'pkg/'},
+            '03-architecture.md': {'app.py', 'pkg/**'},
+        })
+        manifest.save()
+
+        _write(os.path.join(out, '04-core-mechanisms.md'), "# Core")
+        _write(os.path.join(work, 'pkg', 'core.py'), "x = 2\n")
+        assert DocManifest.load(work, out).plan() == (['02-quickstart.md', '03-architecture.md', 'README.md'], [])
+
+        _write(os.path.join(work, 'pkg', 'sub', 'new.py'), "x = 1\n")
+        assert DocManifest.load(work, out).plan() == (['README.md'], ['02-quickstart.md', '03-architecture.md'])
+
+        _write(os.path.join(work, 'setup.py'), "")
+        assert DocManifest.load(work, out).plan() == ([], ['02-quickstart.md', '03-architecture.md', 'README.md'])
+
+    def test_touched_but_identical_source_is_reused(self, project):
+        work, out = project
+        _write(os.path.join(out, 'README.md'), "# Readme")
+        manifest = DocManifest(work, out)
+        manifest.update({'README.md': {'app.py'}})
+
+        os.utime(os.path.join(work, 'app.py'), (0, 0))
+        assert manifest.plan() == (['README.md'], [])
+
+    def test_missing_doc_is_stale(self, project):
+        work, out = project
+        manifest = DocManifest(work, out)
+        manifest.update({'README.md': {'app.py'}})
+
+        assert manifest.plan() == ([], ['README.md'])
+
+    def test_restore_reverts_rewritten_docs(self, project):
+        work, out = project
+        doc_path = os.path.join(out, 'README.md')
+        _write(doc_path, "# Original")
+        manifest = DocManifest(work, out)
+
+        saved = manifest.snapshot(['README.md'])
+        _write(doc_path, "# Rewritten")
+        manifest.restore(saved)
+
+        with open(doc_path, encoding='utf-8') as f:
+            assert f.read() == "# Original"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,63 @@
+"""Test run-scoped tool memoization"""
+
+import os
+import tempfile
+import pytest
+from codeviewx.tools import ToolMemo, read_real_file, write_real_file, list_real_directory
+
+
+def test_repeated_reads_hit_until_written():
+    """Test identical reads are served from the memo and a write invalidates them"""
+    memo = ToolMemo()
+    read, write, listing = (memo.wrap(tool) for tool in (read_real_file, write_real_file, list_real_directory))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "README.md")
+        write.invoke({"file_path": path, "content": "first"})
+
+        first = read.invoke({"file_path": path})
+        again = read.invoke({"file_path": path})
+        listing.invoke({"directory": tmpdir})
+        listing.invoke({"directory": tmpdir})
+        # Same size, possibly same timestamp: only the write hook can tell
+        write.invoke({"file_path": path, "content": "again"})
+        after_write = read.invoke({"file_path": path})
+        write.invoke({"file_path": os.path.join(tmpdir, "new.md"), "content": "x"})
+        new_listing = listing.invoke({"directory": tmpdir})
+
+    assert again == first
+    assert "first" in first and "again" in after_write
+    assert "new.md" in new_listing
+    assert memo.tool_hits == {"read_real_file": 1, "list_real_directory": 1}
+    assert memo.tool_misses == {"read_real_file": 2, "list_real_directory": 2}
+    assert memo.hit_rate == pytest.approx(2 / 6)
+    assert read.name == "read_real_file" and read.args == read_real_file.args
+
+
+def test_external_change_and_tree_results():
+    """Test reads notice outside changes through mtimes and searches reset on commands"""
+    memo = ToolMemo()
+    calls = []
+
+    def search(pattern, path="."):
+        calls.append(pattern)
+        return f"{pattern} #{len(calls)}"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "app.py")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("a = 1\n")
+        read = memo.wrap(read_real_file)
+        read.invoke({"file_path": path})
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("a = 22\n")
+        changed = read.invoke({"file_path": path})
+
+    assert "a = 22" in changed
+    assert memo.call("ripgrep_search", search, {"pattern": "def", "path": "."}) == "def #1"
+    assert memo.call("ripgrep_search", search, {"pattern": "def", "path": "."}) == "def #1"
+    memo.call("execute_command", lambda command, working_dir=None: "", {"command": "touch x", "working_dir": None})
+    assert memo.call("ripgrep_search", search, {"pattern": "def", "path": "."}) == "def #2"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+"""Test the chat model's request hooks"""
+
+import asyncio
+import pytest
+from langchain_anthropic import ChatAnthropic
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, LLMResult
+from codeviewx.model import CodeViewXChatModel, add_cache_breakpoints
+from codeviewx.routing import ModelRouter
+from codeviewx.tools import read_real_file, write_real_file
+from codeviewx.usage import TokenUsageCounter
+
+
+MESSAGES = [
+    SystemMessage(content="You are a documentation engineer."),
+    HumanMessage(content="Document this project"),
+    AIMessage(content="", tool_calls=[{"name": "read_real_file", "args": {"file_path": "app.py"}, "id": "call_1"}]),
+    ToolMessage(content="print('hello')", tool_call_id="call_1"),
+]
+
+
+def _payload(prompt_caching):
+    model = CodeViewXChatModel(model_name="claude-sonnet-4-20250514", api_key="test", prompt_caching=prompt_caching)
+    bound = model.bind_tools([read_real_file, write_real_file])
+    return model._get_request_payload(MESSAGES, **bound.kwargs), bound.kwargs["tools"]
+
+
+def test_cache_breakpoints_on_prefix():
+    """Test tools, system prompt and the last message carry cache breakpoints"""
+    payload, bound_tools = _payload(prompt_caching=True)
+
+    assert [tool.get("cache_control") for tool in payload["tools"]] == [None, {"type": "ephemeral"}]
+    assert payload["system"] == [{
+        "type": "text",
+        "text": "You are a documentation engineer.",
+        "cache_control": {"type": "ephemeral"},
+    }]
+    assert payload["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in str(payload["messages"][:-1])
+    # The tool list bound to the model is shared by all calls and must stay untouched
+    assert all("cache_control" not in tool for tool in bound_tools)
+
+
+def test_no_breakpoints_without_prompt_caching():
+    """Test requests are unchanged when prompt caching is off"""
+    payload, _ = _payload(prompt_caching=False)
+    assert "cache_control" not in str(payload)
+
+
+def test_breakpoint_skips_empty_text():
+    """Test no breakpoint is put on an empty text block"""
+    payload = {"messages": [{"role": "user", "content": [{"type": "text", "text": ""}]}]}
+    assert add_cache_breakpoints(payload)["messages"][0]["content"] == [{"type": "text", "text": ""}]
+
+
+def test_usage_counts_prompt_cache_tokens():
+    """Test prompt cache reads and writes are totalled"""
+    usage = TokenUsageCounter()
+    message = AIMessage(content="done", usage_metadata={
+        "input_tokens": 5000,
+        "output_tokens": 40,
+        "total_tokens": 5040,
+        "input_token_details": {"cache_read": 4200, "cache_creation": 700},
+    })
+    usage.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+
+    assert (usage.input_tokens, usage.cache_read_tokens, usage.cache_write_tokens) == (5000, 4200, 700)
+
+
+
+def _scripted_stream(writes):
+    """Fake API stream: the exploration model writes when `writes`, the writing model always does"""
+    requests = []
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        requests.append((self.model, self.max_tokens))
+        yield ChatGenerationChunk(message=AIMessageChunk(content=f"{self.model} says", usage_metadata={
+            "input_tokens": 100, "output_tokens": 0, "total_tokens": 100,
+        }))
+        if writes or self.model == "strong":
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+                "name": "write_real_file", "args": '{"file_path": "docs/README.md"', "id": "call_9", "index": 1,
+            }]))
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+                "name": None, "args": ', "content": "# Demo"}', "id": None, "index": 1,
+            }]))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata={
+            "input_tokens": 0, "output_tokens": 20, "total_tokens": 20,
+        }))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in _stream(self, messages, stop, run_manager, **kwargs):
+            yield chunk
+
+    return requests, _stream, _astream
+
+
+def _routed_model():
+    router = ModelRouter("strong", write_max_tokens=64000)
+    return CodeViewXChatModel(model_name="fast", max_tokens=8192, api_key="test", router=router), router
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_router_keeps_exploration_on_fast_model(monkeypatch, use_async):
+    """Test turns that do not write stay on the exploration model"""
+    requests, stream, astream = _scripted_stream(writes=False)
+    monkeypatch.setattr(ChatAnthropic, "_stream", stream)
+    monkeypatch.setattr(ChatAnthropic, "_astream", astream)
+    model, router = _routed_model()
+
+    message = asyncio.run(model.ainvoke(MESSAGES)) if use_async else model.invoke(MESSAGES)
+
+    assert message.content == "fast says"
+    assert message.usage_metadata["output_tokens"] == 20
+    assert requests == [("fast", 8192)]
+    assert (router.calls, router.escalated) == (1, 0)
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_router_reports_exploration_tokens(monkeypatch, use_async):
+    """Test callbacks see the exploration model's tokens once the turn is known not to write"""
+    class TokenCollector(BaseCallbackHandler):
+        def __init__(self):
+            self.tokens = []
+
+        def on_llm_new_token(self, token, **kwargs):
+            self.tokens.append(token)
+
+    requests, stream, astream = _scripted_stream(writes=False)
+    monkeypatch.setattr(ChatAnthropic, "_stream", stream)
+    monkeypatch.setattr(ChatAnthropic, "_astream", astream)
+    model, router = _routed_model()
+    collector = TokenCollector()
+    config = {"callbacks": [collector]}
+
+    asyncio.run(model.ainvoke(MESSAGES, config=config)) if use_async else model.invoke(MESSAGES, config=config)
+
+    assert collector.tokens == ["fast says", ""]
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_router_hands_writing_turns_to_strong_model(monkeypatch, use_async):
+    """Test a turn that starts writing a document is redone by the writing model"""
+    requests, stream, astream = _scripted_stream(writes=True)
+    monkeypatch.setattr(ChatAnthropic, "_stream", stream)
+    monkeypatch.setattr(ChatAnthropic, "_astream", astream)
+    model, router = _routed_model()
+
+    message = asyncio.run(model.ainvoke(MESSAGES)) if use_async else model.invoke(MESSAGES)
+
+    assert message.content == "strong says"
+    assert message.tool_calls[0]["args"] == {"file_path": "docs/README.md", "content": "# Demo"}
+    assert requests == [("fast", 8192), ("strong", 64000)]
+    assert (router.calls, router.escalated) == (1, 1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -176,6 +176,21 @@ def test_verbose_mode():
     print()
 
 
+def test_progress_display_prefix(capsys):
+    """Test chapter-prefixed progress display prints doc writes"""
+    from codeviewx.events import DocWritten, TodosUpdated
+    from codeviewx.progress import ProgressDisplay
+    
+    display = ProgressDisplay(prefix='[03-architecture.md]')
+    display.handle(DocWritten('03-architecture.md', 2, 'docs/03-architecture.md', '03-architecture.md', 1))
+    display.handle(TodosUpdated('03-architecture.md', 3, []))
+    
+    output = capsys.readouterr().out
+    assert output.startswith('[03-architecture.md] ')
+    assert '(1): 03-architecture.md' in output
+    assert output.count('\n') == 1
+
+
 if __name__ == "__main__":
     print("\n" + "🧪 CodeViewX Progress Function Tests")
     print("=" * 60)
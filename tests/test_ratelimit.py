@@ -0,0 +1,220 @@
+"""Test the model call rate limiter"""
+
+import time
+import asyncio
+import threading
+import httpx
+import anthropic
+import pytest
+from unittest.mock import patch
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from codeviewx import ratelimit
+from codeviewx.model import CodeViewXChatModel
+from codeviewx.ratelimit import RateLimiter, TokenBucket, get_shared_rate_limiter
+
+
+def _api_error(status_code, retry_after=None):
+    headers = {'retry-after': retry_after} if retry_after is not None else {}
+    response = httpx.Response(status_code, headers=headers, request=httpx.Request("POST", "https://api.test"))
+    if status_code == 429:
+        return anthropic.RateLimitError("rate limited", response=response, body=None)
+    return anthropic.APIStatusError("error", response=response, body=None)
+
+
+def _result(input_tokens=100, output_tokens=20):
+    message = AIMessage(content="ok", usage_metadata={
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    })
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(ratelimit, "BASE_BACKOFF_SECONDS", 0.001)
+
+
+def test_retries_rate_limited_calls_and_halves_concurrency():
+    """Test 429/529 are retried with backoff and cut the concurrency limit once"""
+    limiter = RateLimiter(max_concurrency=8)
+    outcomes = [_api_error(429), _api_error(529), _result()]
+
+    def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert limiter.call(call, cost=100).generations[0].message.content == "ok"
+    assert limiter.retries == 2
+    assert limiter.in_flight == 0
+    # Second failure falls in the same decrease interval; the success then adds 1/4
+    assert limiter.concurrency == pytest.approx(4.25)
+
+
+def test_transient_errors_are_retried_without_cutting_concurrency():
+    """Test server and connection errors are retried, and only rate limits halve concurrency"""
+    limiter = RateLimiter(max_concurrency=8)
+    request = httpx.Request("POST", "https://api.test")
+    outcomes = [
+        _api_error(500), _api_error(503), _api_error(408),
+        anthropic.APIConnectionError(request=request), anthropic.APITimeoutError(request=request),
+        _result(),
+    ]
+
+    def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert limiter.call(call, cost=100).generations[0].message.content == "ok"
+    assert limiter.retries == 5
+    assert limiter.concurrency == 8
+
+
+def test_other_errors_and_exhausted_retries_propagate():
+    """Test non-retryable errors are raised at once, retryable ones after max_retries"""
+    limiter = RateLimiter(max_retries=2)
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise _api_error(400)
+
+    with pytest.raises(anthropic.APIStatusError):
+        limiter.call(bad_request, cost=10)
+    assert len(calls) == 1
+
+    def always_limited():
+        calls.append(1)
+        raise _api_error(429, retry_after="0")
+
+    with pytest.raises(anthropic.RateLimitError):
+        limiter.call(always_limited, cost=10)
+    assert len(calls) == 1 + 3
+    assert limiter.in_flight == 0
+
+
+def test_concurrency_limit_bounds_threads():
+    """Test no more calls than the concurrency limit run at once"""
+    limiter = RateLimiter(max_concurrency=2)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        return _result()
+
+    threads = [threading.Thread(target=limiter.call, args=(call, 10)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+
+
+def test_token_bucket_and_usage_reconciliation():
+    """Test budgets refill over time and actual usage replaces the estimate"""
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.consume(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == pytest.approx(0.0)
+    # Calls larger than the budget wait for a full bucket rather than forever
+    assert bucket.wait_time(1000, now + 1.0) == pytest.approx(59.0)
+
+    limiter = RateLimiter(tokens_per_minute=10000)
+    limiter.call(lambda: _result(input_tokens=3000, output_tokens=500), cost=1000)
+    assert limiter.tokens.level == pytest.approx(10000 - 3500, abs=5)
+
+
+def test_closed_streams_keep_their_charge():
+    """Test a stream dropped by its consumer is charged, not refunded"""
+    def chunks():
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata={
+            "input_tokens": 3000, "output_tokens": 1, "total_tokens": 3001,
+        }))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="more"))
+
+    async def achunks():
+        for chunk in chunks():
+            yield chunk
+
+    async def first(limiter):
+        stream = limiter.astream(achunks, cost=1000)
+        await stream.__anext__()
+        await stream.aclose()
+
+    limiter = RateLimiter(tokens_per_minute=10000)
+    stream = limiter.stream(chunks, cost=1000)
+    next(stream)
+    stream.close()
+    assert limiter.tokens.level == pytest.approx(10000 - 3001, abs=5)
+    assert limiter.in_flight == 0
+
+    limiter = RateLimiter(tokens_per_minute=10000)
+    asyncio.run(first(limiter))
+    assert limiter.tokens.level == pytest.approx(10000 - 3001, abs=5)
+
+    limiter = RateLimiter(tokens_per_minute=10000)
+    stream = limiter.stream(lambda: iter([ChatGenerationChunk(message=AIMessageChunk(content="a"))] * 2), cost=1000)
+    next(stream)
+    stream.close()
+    assert limiter.tokens.level == pytest.approx(10000 - 1000, abs=5)
+
+
+def test_async_call_and_shared_instances():
+    """Test the coroutine path and that equal limits share one limiter"""
+    limiter = RateLimiter()
+    outcomes = [_api_error(529), _result()]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    result = asyncio.run(limiter.acall(call, cost=10))
+    assert result.generations[0].message.content == "ok"
+    assert limiter.retries == 1
+
+    assert get_shared_rate_limiter(50, 0, 4) is get_shared_rate_limiter(50, 0, 4)
+    assert get_shared_rate_limiter(50, 0, 4) is not get_shared_rate_limiter(60, 0, 4)
+
+
+def test_model_calls_go_through_limiter():
+    """Test the chat model retries API calls through its limiter"""
+    limiter = RateLimiter()
+    model = CodeViewXChatModel(
+        model_name="claude-sonnet-4-20250514",
+        api_key="test",
+        limiter=limiter,
+        max_retries=0
+    )
+    outcomes = [_api_error(429), _result()]
+
+    def generate(self, messages, *args, **kwargs):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with patch.object(ChatAnthropic, "_generate", generate):
+        assert model.invoke([HumanMessage(content="hi")]).content == "ok"
+    assert limiter.retries == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
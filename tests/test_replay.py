@@ -0,0 +1,77 @@
+"""Test transcript recording and replay"""
+
+import os
+import tempfile
+import pytest
+from deepagents import create_deep_agent
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from codeviewx.tools import read_real_file, write_real_file
+from codeviewx.replay import TranscriptRecorder, ReplayChatModel, load_transcript
+
+
+def test_recorded_responses_are_grouped_by_conversation():
+    """Test the recorder keeps each conversation's responses in call order"""
+    recorder = TranscriptRecorder("project", "project/docs", doc_language="English", parallel=2)
+    model = GenericFakeChatModel(messages=iter([
+        AIMessage(content="analysis done"), AIMessage(content="chapter one"), AIMessage(content="main done"),
+    ]))
+    for thread_id in ("run:analysis", "run:01-overview.md", "run"):
+        model.invoke("hi", config={"callbacks": [recorder], "metadata": {"thread_id": thread_id}})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.transcript.jsonl")
+        recorder.save(path)
+        header, responses = load_transcript(path)
+
+    assert header["working_directory"] == os.path.abspath("project")
+    assert header["parallel"] == 2
+    assert {part: [message.content for message in messages] for part, messages in responses.items()} == {
+        "analysis": ["analysis done"], "01-overview.md": ["chapter one"], "main": ["main done"],
+    }
+
+
+def test_replay_drives_agent_with_remapped_paths():
+    """Test a replayed transcript runs the real tools against the replaying directories"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        recorded = os.path.join(tmpdir, "recorded")
+        project = os.path.join(tmpdir, "project")
+        output = os.path.join(tmpdir, "out")
+        os.makedirs(project)
+        with open(os.path.join(project, "app.py"), 'w', encoding='utf-8') as f:
+            f.write("print('hello')\n")
+
+        recorder = TranscriptRecorder(recorded, "docs")
+        recorder.responses = [
+            ("main", AIMessage(content="", tool_calls=[
+                {"name": "read_real_file", "args": {"file_path": os.path.join(recorded, "app.py")}, "id": "c1"},
+            ])),
+            ("main", AIMessage(content="", tool_calls=[
+                {"name": "write_real_file", "args": {"file_path": "docs/README.md", "content": "# App"}, "id": "c2"},
+            ])),
+            ("main", AIMessage(content="done")),
+        ]
+        path = os.path.join(tmpdir, "run.transcript.jsonl")
+        recorder.save(path)
+
+        model = ReplayChatModel.from_transcript(path, project, output)
+        agent = create_deep_agent([read_real_file, write_real_file], "Document the project", model=model)
+        state = agent.invoke(
+            {"messages": [{"role": "user", "content": "go"}]},
+            config={"configurable": {"thread_id": "run"}}
+        )
+
+        read_result = state["messages"][2].content
+        with open(os.path.join(output, "README.md"), 'r', encoding='utf-8') as f:
+            written = f.read()
+
+    assert "print('hello')" in read_result
+    assert written == "# App"
+    assert state["messages"][-1].content == "done"
+
+    with pytest.raises(ValueError, match="main"):
+        model.next_response("main")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
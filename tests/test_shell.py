@@ -0,0 +1,93 @@
+"""Test shell sessions and capped command output"""
+
+import os
+import sys
+import time
+import tempfile
+import pytest
+from codeviewx.tools import ShellSession, ShellSessions, execute_command
+from codeviewx.tools.shell import CappedOutput, find_session, register_sessions, run_command, unregister_sessions
+
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX shell")
+
+
+def test_capped_output_keeps_head_and_tail():
+    output = CappedOutput(10)
+    for chunk in (b"0123", b"456789ab", b"cdef"):
+        output.write(chunk)
+
+    assert output.text() == "01234\n... [6 bytes omitted] ...\nbcdef"
+    assert output.total == 16
+    small = CappedOutput(10)
+    small.write(b"short")
+    assert small.text() == "short"
+
+
+def test_run_command_caps_output_and_times_out():
+    stdout, stderr, timed_out = run_command("yes | head -c 1000000; echo oops >&2", None, 10, 1000)
+    assert len(stdout) < 1100 and "[999000 bytes omitted]" in stdout
+    assert stderr == "oops\n" and not timed_out
+
+    started = time.monotonic()
+    _, _, timed_out = run_command("sleep 10", None, 1, 1000)
+    assert timed_out and time.monotonic() - started < 5
+
+
+class TestShellSession:
+    """Test commands sharing one shell"""
+
+    @pytest.fixture
+    def session(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, "src"))
+            root = os.path.realpath(tmpdir)
+            session = ShellSession(root)
+            yield session
+            session.close()
+
+    def test_state_carries_over(self, session):
+        root = session.root
+        assert session.run("cd src && export GREETING=hi", None, 10, 1000) == ("", "", False)
+        assert session.run("pwd; echo $GREETING; printf tail", None, 10, 1000) == (
+            os.path.join(root, "src") + "\nhi\ntail", "", False
+        )
+        assert session.run("pwd; ls missing", root, 10, 1000)[0] == root + "\n"
+        assert "missing" in session.run("ls missing", None, 10, 1000)[1]
+        assert session.run("cat", None, 10, 1000) == ("", "", False)
+
+    def test_exit_and_timeout_restart_the_shell(self, session):
+        session.run("cd src", None, 10, 1000)
+        stdout, stderr, timed_out = session.run("echo bye; exit 3", None, 10, 1000)
+        assert stdout == "bye\n" and "Shell session ended" in stderr and not timed_out
+        assert session.run("pwd", None, 10, 1000)[0] == session.root + "\n"
+
+        session.run("cd src", None, 10, 1000)
+        assert session.run("echo start; sleep 10", None, 1, 1000) == ("start\n", "", True)
+        assert session.run("pwd", None, 10, 1000)[0] == session.root + "\n"
+
+    def test_execute_command_uses_the_conversation_session(self, session):
+        sessions = ShellSessions("run-1", session.root)
+        register_sessions(sessions)
+
+        def run(command, thread_id, **arguments):
+            return execute_command.invoke({"command": command, **arguments}, config={"configurable": {"thread_id": thread_id}})
+
+        try:
+            assert find_session("run-1") is find_session("run-1") is not find_session("run-1:intro")
+            assert find_session("run-2") is None and find_session(None) is None
+            run("cd src && export GREETING=hi", "run-1")
+            main = run("pwd; echo $GREETING", "run-1")
+            chapter = run("pwd; echo $GREETING", "run-1:intro")
+            timeout = run("sleep 5", "run-1", timeout=1)
+        finally:
+            unregister_sessions(sessions)
+            sessions.close()
+
+        assert main == os.path.join(session.root, "src") + "\nhi\n"
+        assert chapter == session.root + "\n\n"
+        assert timeout.startswith("❌ Error: Command execution timeout (1 seconds)")
+        assert find_session("run-1") is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
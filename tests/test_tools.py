@@ -1,15 +1,19 @@
 """Test tool functions"""
 
 import os
+import sys
 import tempfile
 import pytest
 from codeviewx.tools import (
     execute_command,
     read_real_file,
+    read_real_files,
     write_real_file,
     list_real_directory,
+    list_real_tree,
     ripgrep_search
 )
+from codeviewx.tools.search import _SearchResults
 
 
 class TestExecuteCommand:
@@ -76,6 +80,173 @@ class TestFileSystem:
             assert "subdir" in result
 
 
+class TestDirectoryTree:
+    """Test list_real_tree"""
+    
+    @pytest.fixture
+    def project(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = {
+                "README.md": 10, "src/app.py": 2048, "src/pkg/core.py": 1024,
+                "src/pkg/deep/inner/leaf.py": 100, "generated.txt": 5,
+                "node_modules/dep/index.js": 500, "build/out.bin": 500,
+            }
+            for name, size in files.items():
+                path = os.path.join(tmpdir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write("x" * size)
+            with open(os.path.join(tmpdir, ".gitignore"), 'w', encoding='utf-8') as f:
+                f.write("generated.txt\n")
+            yield tmpdir
+    
+    def test_tree_honors_ignore_rules_and_depth(self, project):
+        """Test the tree skips ignored entries, stops at max_depth and totals whole subtrees"""
+        result = list_real_tree.invoke({"directory": project, "max_depth": 3, "ignore_patterns": ["*.md"]})
+        
+        lines = result.splitlines()
+        assert lines[0] == f"Tree: {project} (4 files, 3.1 KB; depth 3)"
+        assert lines[1:] == [
+            "src/ (3 files, 3.1 KB)",
+            "  pkg/ (2 files, 1.1 KB)",
+            "    deep/ (1 files, 0.1 KB)",
+            "    core.py (1.0 KB)",
+            "  app.py (2.0 KB)",
+            ".gitignore (0.0 KB)",
+        ]
+    
+    def test_max_entries_shows_upper_levels_first(self, project):
+        """Test a capped tree keeps the top level and reports what was left out"""
+        result = list_real_tree.invoke({"directory": project, "max_entries": 4})
+        
+        assert "src/ (3 files" in result and "README.md" in result and ".gitignore" in result
+        assert "  ... +2 more entries" in result
+        assert "core.py" not in result
+        assert result.endswith("[3 entries not shown. List a subdirectory or raise max_entries]")
+        assert list_real_tree.invoke({"directory": os.path.join(project, "missing")}).startswith("❌")
+
+
+class TestReadWindows:
+    """Test line windows and size guards of read_real_file"""
+    
+    def test_large_file_is_read_in_windows(self):
+        """Test a file above max_bytes is cut at a line boundary with a continuation marker"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "generated.py")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(f"value_{index} = {index}\n" for index in range(1000))
+            
+            first = read_real_file.invoke({"file_path": path, "max_bytes": 200})
+            window = read_real_file.invoke({"file_path": path, "offset": 500, "limit": 2})
+            past_end = read_real_file.invoke({"file_path": path, "offset": 5000})
+        
+        assert "1001 lines, showing lines 1-15" in first
+        assert first.rstrip().endswith(f'Continue with read_real_file("{path}", offset=15)]')
+        assert "value_14 = 14\n" in first and "value_15" not in first
+        assert "showing lines 501-502" in window
+        assert window.endswith("value_500 = 500\nvalue_501 = 501\n")
+        assert "exceeds file length" in past_end
+    
+    def test_binary_file_is_not_returned(self):
+        """Test files with NUL bytes are reported as binary"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "image.png")
+            with open(path, 'wb') as f:
+                f.write(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+            
+            result = read_real_file.invoke({"file_path": path})
+        
+        assert result.startswith("❌") and "binary" in result
+    
+    def test_line_index_is_reused_until_file_changes(self):
+        """Test windowed reads share a line index that is rebuilt after a change"""
+        from codeviewx.tools.lineindex import line_index
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("a\nbb\nccc\n")
+            
+            index = line_index(path)
+            assert [index.start_of(line) for line in range(5)] == [0, 2, 5, 9, 9]
+            assert index.line_count == 4
+            assert line_index(path) is index
+            
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("dddd\n")
+            assert line_index(path) is not index
+            assert line_index(path).line_count == 5
+
+
+class TestReadBatch:
+    """Test batch reads of read_real_files"""
+    
+    def test_globs_are_expanded_and_errors_kept_per_file(self):
+        """Test globs expand in order, skip ignored directories, and failures get their own section"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("src/a.py", "src/b.py", "src/node_modules/dep.py"):
+                path = os.path.join(tmpdir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(f"# {name}\n")
+            readme = os.path.join(tmpdir, "README.md")
+            with open(readme, 'w', encoding='utf-8') as f:
+                f.write("# Project\n")
+            
+            result = read_real_files.invoke({"paths": [
+                readme, os.path.join(tmpdir, "src", "**", "*.py"), readme,
+                os.path.join(tmpdir, "missing.md"), os.path.join(tmpdir, "*.toml")
+            ]})
+        
+        headers = [line.split(" (")[0] for line in result.splitlines() if line.startswith("File: ")]
+        assert headers == [f"File: {readme}"] + [f"File: {os.path.join(tmpdir, 'src', name)}" for name in ("a.py", "b.py")]
+        assert result.startswith("Read 4 files")
+        assert "dep.py" not in result
+        assert "missing.md' does not exist" in result
+        assert "No files matched" in result and "*.toml" in result
+    
+    def test_budget_is_shared_and_large_files_truncated(self):
+        """Test small files are returned whole and the rest of the budget is split between large ones"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = [os.path.join(tmpdir, name) for name in ("small.txt", "large_1.txt", "large_2.txt")]
+            with open(paths[0], 'w', encoding='utf-8') as f:
+                f.write("tiny\n")
+            for path in paths[1:]:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.writelines(f"line {index:04d}\n" for index in range(1000))
+            
+            result = read_real_files.invoke({"paths": paths, "max_bytes": 1005})
+        
+        # small.txt takes 5 bytes, each large file gets 500 bytes: 50 lines of 10 bytes
+        assert "tiny\n" in result
+        assert result.count("showing lines 1-50)") == 2
+        assert "line 0049\n" in result and "line 0050" not in result
+        for path in paths[1:]:
+            assert f'Continue with read_real_file("{path}", offset=50)]' in result
+        assert "2 truncated" in result.splitlines()[0]
+    
+    def test_files_are_read_up_to_their_share(self, monkeypatch):
+        """Test a large batch never reads whole files only to cut them afterwards"""
+        from codeviewx.tools import filesystem
+        limits = []
+        read_for_batch = filesystem._read_for_batch
+        
+        def recording_read(path, max_bytes):
+            limits.append(max_bytes)
+            return read_for_batch(path, max_bytes)
+        
+        monkeypatch.setattr(filesystem, "_read_for_batch", recording_read)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for index in range(20):
+                with open(os.path.join(tmpdir, f"big_{index:02d}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(("x" * 99 + "\n") * 2000)
+            
+            result = read_real_files.invoke({"paths": [os.path.join(tmpdir, "*.txt")], "max_bytes": 20000})
+        
+        assert limits == [1001] * 20
+        assert "20 truncated" in result.splitlines()[0]
+
+
 class TestRipgrepSearch:
     """Test ripgrep search functionality"""
     
@@ -88,6 +259,55 @@ class TestRipgrepSearch:
         
         assert len(result) > 0
 
+    def test_results_are_grouped_per_file(self):
+        """Test matches and context are grouped under their file, up to the global cap"""
+        def message(kind, path, line_number, text):
+            return {"type": kind, "data": {
+                "path": {"text": path}, "lines": {"text": text + "\n"}, "line_number": line_number
+            }}
+
+        results = _SearchResults(max_count=2, context_lines=1)
+        for item in [
+            {"type": "begin", "data": {"path": {"text": "a.py"}}},
+            message("match", "a.py", 1, "def one():"),
+            message("context", "a.py", 2, "    pass"),
+            message("match", "a.py", 9, "def two():"),
+            message("context", "a.py", 10, "    " + "x" * 400),
+        ]:
+            assert results.add(item)
+        # Context leading to a match past the cap ends the search, in this file or another one
+        assert not results.add(message("context", "a.py", 11, "def three():"))
+        other = _SearchResults(max_count=1, context_lines=1)
+        assert other.add(message("match", "a.py", 1, "def one():"))
+        assert not other.add(message("context", "b.py", 1, "import os"))
+        assert other.truncated and results.truncated
+
+        lines = results.format("def").split("\n")
+        assert lines[0] == "Found 2 matches in 1 files (stopped at max_count=2; narrow the pattern or path to see the rest)"
+        assert lines[1:5] == ["File: a.py", "1:def one():", "2-    pass", "--"]
+        assert lines[5] == "9:def two():"
+        assert lines[6].endswith("x ...") and len(lines[6]) < 320
+        assert _SearchResults(max_count=5).format("def") == "No matches found for 'def'"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="uses a shell script as rg")
+    def test_search_stops_ripgrep_at_max_count(self, tmp_path, monkeypatch):
+        """Test the ripgrep process is stopped once enough matches are read"""
+        fake_rg = tmp_path / "rg"
+        fake_rg.write_text(
+            "#!/bin/sh\n"
+            "while true; do\n"
+            "  echo '{\"type\":\"match\",\"data\":{\"path\":{\"text\":\"big.log\"},"
+            "\"lines\":{\"text\":\"ERROR\\\\n\"},\"line_number\":1}}'\n"
+            "done\n"
+        )
+        fake_rg.chmod(0o755)
+        monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+        result = ripgrep_search.invoke({"pattern": "ERROR", "path": str(tmp_path), "max_count": 3})
+
+        assert result.startswith("Found 3 matches in 1 files (stopped at max_count=3")
+        assert result.count("1:ERROR") == 3
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,76 @@
+"""Test Chrome trace export"""
+
+import os
+import json
+import tempfile
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from codeviewx.tools import read_real_file
+from codeviewx.trace import TraceRecorder, thread_lane
+
+
+def _complete_events(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data, [event for event in data["traceEvents"] if event["ph"] == "X"]
+
+
+def test_records_tool_model_and_generator_spans():
+    """Test tool, model and generator spans are exported with their details"""
+    tracer = TraceRecorder()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, "app.py")
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write("print('hello')\n")
+
+        config = {"callbacks": [tracer], "metadata": {"thread_id": "run:README.md"}}
+        read_real_file.invoke({"file_path": source}, config=config)
+        model = GenericFakeChatModel(messages=iter([
+            AIMessage(content="done", usage_metadata={"input_tokens": 120, "output_tokens": 8, "total_tokens": 128})
+        ]))
+        model.invoke("hi", config=config)
+        with tracer.span("update manifest", docs=9):
+            pass
+
+        trace_path = os.path.join(tmpdir, "out", "trace.json")
+        tracer.save(trace_path)
+        data, events = _complete_events(trace_path)
+
+    by_name = {event["name"]: event for event in events}
+    tool = by_name["read_real_file"]
+    assert tool["cat"] == "tool"
+    assert tool["args"]["file_path"] == source
+    assert tool["args"]["result_chars"] > 0
+    assert tool["dur"] >= 0
+
+    assert by_name["model"]["args"]["input_tokens"] == 120
+    assert by_name["model"]["args"]["output_tokens"] == 8
+    assert by_name["update manifest"]["args"] == {"docs": 9}
+
+    thread_names = {
+        event["tid"]: event["args"]["name"]
+        for event in data["traceEvents"] if event["name"] == "thread_name"
+    }
+    assert thread_names[tool["tid"]] == "README.md"
+    assert thread_names[by_name["update manifest"]["tid"]] == "main"
+
+
+def test_overlapping_spans_use_separate_tracks():
+    """Test concurrent spans of one conversation do not share a track"""
+    tracer = TraceRecorder()
+    with tracer.span("outer"):
+        with tracer.span("inner"):
+            pass
+    with tracer.span("after"):
+        pass
+
+    tids = {event["name"]: event["tid"] for event in tracer.events}
+    assert tids["outer"] != tids["inner"]
+    assert tids["after"] == tids["outer"]
+    assert thread_lane("20250101-120000-1a2b3c") == "main"
+    assert thread_lane("20250101-120000-1a2b3c:analysis") == "analysis"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
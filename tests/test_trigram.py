@@ -0,0 +1,106 @@
+"""Test the trigram search index"""
+
+import os
+import shutil
+import tempfile
+import pytest
+from codeviewx.tools import FileIndex, ripgrep_search
+from codeviewx.tools import trigram
+from codeviewx.tools.fileindex import register_index, unregister_index
+from codeviewx.tools.trigram import TrigramIndex, pattern_query
+
+
+def _write(root, rel_path, content):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _trigrams(query):
+    return [sorted(value.to_bytes(3, 'big').decode() for value in alternative) for alternative in query]
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ("def main", [[" ma", "ain", "def", "ef ", "f m", "mai"]]),
+    ("class.*Ctl", [["cla", "ctl", "las", "ass"]]),
+    (r"\bHandler\b", [["and", "han", "ler", "dle", "ndl"]]),
+    ("import (os|sys)", [["imp", "mpo", "ort", "por", "rt "]]),
+    ("(?:foo|bar)_id", [["_id", "foo"], ["_id", "bar"]]),
+    ("(abc)+", [["abc"]]),
+])
+def test_pattern_query(pattern, expected):
+    assert sorted(map(sorted, _trigrams(pattern_query(pattern)))) == sorted(map(sorted, expected))
+
+
+@pytest.mark.parametrize("pattern", ["ab", "a.b.c", "fo|bar", "(abc)?", r"\w+", r"\p{Greek}", "["])
+def test_patterns_that_cannot_narrow(pattern):
+    assert pattern_query(pattern) is None
+
+
+class TestTrigramIndex:
+    """Test refreshing and querying the on-disk index"""
+
+    @pytest.fixture
+    def repo(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            work = os.path.join(tmpdir, "project")
+            _write(work, "src/app.py", "from util import helper\n\nhelper()\n")
+            _write(work, "src/util.py", "def helper():\n    return 42\n")
+            _write(work, "src/.hidden.py", "def helper(): pass\n")
+            _write(work, "README.md", "# Demo\n")
+            yield work, os.path.join(tmpdir, "state", "trigrams.sqlite3")
+
+    def test_refresh_is_incremental(self, repo):
+        work, database = repo
+        search_index = TrigramIndex(database, FileIndex.build(work))
+        assert search_index.refresh() == 4
+        search_index.close()
+
+        _write(work, "src/util.py", "def helper():\n    return 'changed'\n")
+        os.remove(os.path.join(work, "README.md"))
+        search_index = TrigramIndex(database, FileIndex.build(work))
+        assert search_index.refresh() == 1
+        assert search_index.candidates("Demo", work) == []
+        assert search_index.candidates("changed", work) == [os.path.join(work, "src", "util.py")]
+        search_index.close()
+
+    def test_candidates(self, repo, monkeypatch):
+        work, database = repo
+        _write(work, "big.txt", "x" * 64)
+        monkeypatch.setattr(trigram, "MAX_INDEXED_FILE_BYTES", 48)
+        file_index = FileIndex.build(work)
+        search_index = TrigramIndex(database, file_index)
+        search_index.refresh()
+
+        src = os.path.join(work, "src")
+        assert search_index.candidates("def helper", work) == [os.path.join(work, "big.txt"), os.path.join(src, "util.py")]
+        assert search_index.candidates("HELPER", src) == [os.path.join(src, "app.py"), os.path.join(src, "util.py")]
+        assert search_index.candidates(r"\w+", work) is None
+        _write(work, "src/new.py", "def helper(): pass\n")
+        file_index.mark_changed(os.path.join(src, "new.py"))
+        assert search_index.candidates("nothing like it", work) == [os.path.join(work, "big.txt"), os.path.join(src, "new.py")]
+        file_index.mark_commands_run()
+        _write(work, "lib/made.py", "def helper(): pass\n")
+        assert search_index.candidates("def helper", work) is None
+        search_index.close()
+
+    @pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep (rg) is not installed")
+    def test_search_results_match_a_full_scan(self, repo):
+        work, database = repo
+        file_index = FileIndex.build(work)
+        full = ripgrep_search.invoke({"pattern": "helper", "path": work})
+        file_index.search_index = TrigramIndex(database, file_index)
+        file_index.search_index.refresh()
+        register_index(file_index)
+        try:
+            narrowed = ripgrep_search.invoke({"pattern": "helper", "path": work})
+        finally:
+            unregister_index(file_index)
+            file_index.search_index.close()
+
+        assert sorted(narrowed.splitlines()) == sorted(full.splitlines())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])